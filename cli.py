@@ -0,0 +1,372 @@
+#cli.py is the command-line entry point for ingesting TikTok exports without the GUI.
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from processes.data_manager import DataManager
+from processes.file_handler import FileHandler, PROCESSED_STATUSES
+from processes.folder_watcher import FolderWatcher
+from processes.export_reader import EXPORT_EXTENSIONS
+from processes.ingest_ledger import IngestLedger, FILE_STAGES
+from processes.verifier import DataVerifier
+from processes.query_plans import build_synthetic_database, check_query_plans, SYNTHETIC_VIDEOS, SYNTHETIC_DAYS
+from processes.benchmark import benchmark_write_sizes, benchmark_history_length, BENCHMARK_SIZES, BENCHMARK_HISTORY_DAYS, BENCHMARK_VIDEOS
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FILE_ERRORS = 1
+EXIT_CONFLICT = 2
+EXIT_MISMATCH = 3
+EXIT_PLAN_REGRESSION = 4
+
+def positive_int(value):
+    """
+    Parse a command-line argument that must be a whole number of at least 1.
+
+    Args:
+        value (str): The argument as typed.
+
+    Returns:
+        int: The parsed number.
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def collect_export_files(paths):
+    """
+    Expand the file, glob and directory arguments into a list of export files.
+
+    Args:
+        paths (list): Files, glob patterns or directories.
+
+    Returns:
+        list: The export file paths, without duplicates, in argument order.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                # Skip the lock files Excel leaves next to open workbooks
+                if name.lower().endswith(EXPORT_EXTENSIONS) and not name.startswith('~$')
+            ))
+        elif glob.has_magic(path):
+            files.extend(sorted(glob.glob(path)))
+        else:
+            files.append(path)
+    return list(dict.fromkeys(os.path.abspath(file_path) for file_path in files))
+
+def ingest(args):
+    """
+    Ingest export files with a non-interactive conflict policy and print a report.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+
+    Returns:
+        int: The process exit code.
+    """
+    file_paths = collect_export_files(args.paths)
+    if not file_paths:
+        print("No export files found.", file=sys.stderr)
+        return EXIT_FILE_ERRORS
+
+    data_manager = DataManager()
+    file_handler = FileHandler(data_manager)
+
+    # With the fail policy, the first conflict stops the remaining files from being written
+    cancel_event = threading.Event()
+    conflicts = []
+    def confirm_replace(date):
+        if args.on_conflict == 'replace':
+            return True
+        if args.on_conflict == 'fail':
+            conflicts.append(date)
+            cancel_event.set()
+        return False
+
+    # Conflicts found before parsing are resolved with the same policy, so the fail policy stops before any file is written
+    def resolve_conflicts(found):
+        if args.on_conflict == 'fail':
+            conflicts.extend(conflict['file'] for conflict in found)
+            cancel_event.set()
+        return {conflict['file']: args.on_conflict == 'replace' for conflict in found}
+
+    start = time.perf_counter()
+    results = file_handler.process_files(file_paths, confirm_replace=confirm_replace, cancel_event=cancel_event,
+                                         backfill=args.backfill, resolve_conflicts=resolve_conflicts,
+                                         backup=not args.no_backup, source='cli')
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        busy_seconds = sum(result[f'{stage}_seconds'] for stage in FILE_STAGES)
+        result['rows_per_second'] = round(result['rows_read'] / busy_seconds, 1) if busy_seconds else 0.0
+    rows_read = sum(result['rows_read'] for result in results)
+    summary = {
+        'files': len(results),
+        'processed': sum(result['status'] in PROCESSED_STATUSES for result in results),
+        'skipped': sum(result['status'] in ('skipped', 'cancelled') for result in results),
+        'errors': sum(result['status'] == 'error' for result in results),
+        'rows_read': rows_read,
+        'rows_written': sum(result['rows_written'] for result in results),
+        'rows_inserted': sum(result['rows_inserted'] for result in results),
+        'rows_updated': sum(result['rows_updated'] for result in results),
+        'rows_unchanged': sum(result['rows_unchanged'] for result in results),
+        'rows_promoted': sum(result['rows_promoted'] for result in results),
+        'rows_dormant': sum(result['rows_dormant'] for result in results),
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rows_read / elapsed, 1) if elapsed else 0.0,
+    }
+    print_report(results, summary, args.format)
+
+    if conflicts:
+        return EXIT_CONFLICT
+    return EXIT_FILE_ERRORS if summary['errors'] else EXIT_OK
+
+def watch(args):
+    """
+    Watch a folder and ingest new or changed export files until interrupted.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+
+    Returns:
+        int: The process exit code.
+    """
+    data_manager = DataManager()
+    folder = args.folder or data_manager.watch_folder
+    if not folder or not os.path.isdir(folder):
+        print("No watch folder given and no valid watch_folder setting found.", file=sys.stderr)
+        return EXIT_FILE_ERRORS
+
+    watcher = FolderWatcher(data_manager, folder, settle_seconds=args.settle, on_conflict=args.on_conflict)
+    def report(results):
+        for result in results:
+            print(f"[{result['status']}] {os.path.basename(result['file'])}: {result['message']}", flush=True)
+
+    if args.once:
+        # Wait for the files to settle, then ingest them once
+        watcher.poll_once()
+        time.sleep(args.settle)
+        results = watcher.poll_once()
+        report(results)
+        return EXIT_FILE_ERRORS if any(result['status'] == 'error' for result in results) else EXIT_OK
+
+    try:
+        watcher.run_forever(interval=args.interval, on_results=report)
+    except KeyboardInterrupt:
+        pass
+    return EXIT_OK
+
+def verify(args):
+    """
+    Verify the stored data against export files and print only what differs.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+
+    Returns:
+        int: The process exit code.
+    """
+    file_paths = collect_export_files(args.paths)
+    if not file_paths:
+        print("No export files found.", file=sys.stderr)
+        return EXIT_FILE_ERRORS
+
+    start = time.perf_counter()
+    report = DataVerifier(DataManager()).verify_files(file_paths)
+    report['seconds'] = round(time.perf_counter() - start, 3)
+
+    if args.format == 'json':
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        for file in report['files']:
+            if file['error']:
+                print(f"[error] {os.path.basename(file['file'])}: {file['error']}")
+        for date in report['mismatched_dates']:
+            columns = f", sums differ in {', '.join(date['columns'])}" if date['columns'] else ''
+            print(f"[mismatch] {date['date']} ({os.path.basename(date['file'])}): {date['export_rows']} rows in the export, "
+                  f"{date['database_rows']} in the database{columns}")
+        for mismatch in report['mismatches']:
+            columns = f": {', '.join(mismatch['columns'])}" if mismatch['columns'] else ''
+            print(f"  {mismatch['performance_date']} {mismatch['video_id']} {mismatch['kind']}{columns}")
+        print(f"Checked {report['dates_checked']} dates and {report['rows_checked']} rows from {len(report['files'])} files "
+              f"in {report['seconds']}s. {len(report['mismatched_dates'])} dates and {len(report['mismatches'])} rows differ.")
+
+    if any(file['error'] for file in report['files']):
+        return EXIT_FILE_ERRORS
+    return EXIT_MISMATCH if report['mismatched_dates'] else EXIT_OK
+
+def check_plans(args):
+    """
+    Build a synthetic database and check that the frequent queries still use indexes.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+
+    Returns:
+        int: The process exit code.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        data_manager, sample = build_synthetic_database(os.path.join(directory, 'query_plans.db'), args.videos, args.days)
+        try:
+            results = check_query_plans(data_manager, sample)
+        finally:
+            data_manager.close()
+
+    for result in results:
+        print(f"[{'fail' if result['problems'] else 'ok'}] {result['name']}")
+        if result['problems'] or args.verbose:
+            for detail in result['plan']:
+                print(f"    {detail}")
+    failed = [result['name'] for result in results if result['problems']]
+    print(f"{len(results) - len(failed)} of {len(results)} query plans use indexes.")
+    return EXIT_PLAN_REGRESSION if failed else EXIT_OK
+
+def benchmark(args):
+    """
+    Time the bulk write path against the per-row path it replaced, on synthetic uploads of several sizes
+    and on databases with several lengths of history.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+
+    Returns:
+        int: The process exit code.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        sizes = benchmark_write_sizes(directory, args.sizes, legacy=not args.no_legacy)
+        history = benchmark_history_length(directory, args.history_days, args.videos, legacy=not args.no_legacy)
+
+    if args.format == 'json':
+        print(json.dumps({'sizes': sizes, 'history': history}, indent=2))
+        return EXIT_OK
+
+    for result in sizes:
+        print(f"{result['rows']:>9} rows  {result['path']:<8} {result['seconds']:>9.3f}s  {result['rows_per_second']:>11.1f} rows/s")
+    for result in history:
+        totals = f"  totals {result['totals_seconds']:.3f}s" if result['totals_seconds'] is not None else ''
+        print(f"{result['history_days']:>5} days of history  {result['rows']} rows  {result['path']:<8} "
+              f"{result['seconds']:>9.3f}s{totals}")
+    return EXIT_OK
+
+def history(args):
+    """
+    Print the most recent ingestion runs from the run ledger.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+
+    Returns:
+        int: The process exit code.
+    """
+    runs = IngestLedger(DataManager()).get_runs(args.limit)
+    if args.format == 'json':
+        print(runs.to_json(orient='records', indent=2))
+        return EXIT_OK
+
+    for _, run in runs.iterrows():
+        print(f"#{run['run_id']} {run['started_at']} [{run['source']}] {run['files']} file(s), {run['rows_read']} rows read, "
+              f"{run['rows_written']} written in {run['total_seconds']:.2f}s ({run['rows_per_second']:.0f} rows/s), "
+              f"slowest stage: {run['slowest_stage']}")
+    return EXIT_OK
+
+def print_report(results, summary, output_format):
+    """
+    Print the per-file results and the run summary.
+
+    Args:
+        results (list): The per-file results from FileHandler.process_files.
+        summary (dict): Totals for the whole run.
+        output_format (str): 'json' for a single JSON document, 'text' for one line per file.
+    """
+    if output_format == 'json':
+        print(json.dumps({'files': results, 'summary': summary}, indent=2, default=str))
+        return
+
+    for result in results:
+        print(f"[{result['status']}] {os.path.basename(result['file'])}: {result['message']} "
+              f"({result['rows_read']} rows read, {result['rows_inserted']} inserted, {result['rows_updated']} updated, "
+              f"{result['rows_unchanged']} unchanged, {result['rows_dormant']} dormant, "
+              f"parse {result['parse_seconds']:.2f}s, write {result['write_seconds']:.2f}s, "
+              f"{result['rows_per_second']} rows/s)")
+    print(f"{summary['processed']} of {summary['files']} files processed, {summary['skipped']} skipped, "
+          f"{summary['errors']} errors. {summary['rows_inserted']} rows inserted, {summary['rows_updated']} updated, "
+          f"{summary['rows_unchanged']} unchanged, {summary['rows_promoted']} promoted from the shadow store, {summary['rows_dormant']} skipped as dormant. {summary['rows_read']} rows in {summary['seconds']}s "
+          f"({summary['rows_per_second']} rows/s)")
+
+def build_parser():
+    """
+    Build the command-line argument parser.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    parser = argparse.ArgumentParser(description="TikTok Video Tracker command-line tools.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = subparsers.add_parser('ingest', help="Ingest TikTok export files into the database.")
+    ingest_parser.add_argument('paths', nargs='+', help="Export files, glob patterns or directories.")
+    ingest_parser.add_argument('--on-conflict', choices=['skip', 'replace', 'fail'], default='skip',
+                               help="What to do when data for a file's date already exists (default: skip).")
+    ingest_parser.add_argument('--format', choices=['text', 'json'], default='text', help="Output format (default: text).")
+    ingest_parser.add_argument('--no-backup', action='store_true', help="Do not back up the database before ingesting.")
+    ingest_parser.add_argument('--backfill', action='store_true',
+                               help="Accept exports covering several days with a per-day date column, and write each in one transaction.")
+    ingest_parser.set_defaults(handler=ingest)
+
+    watch_parser = subparsers.add_parser('watch', help="Watch a folder and ingest new or changed export files.")
+    watch_parser.add_argument('folder', nargs='?', help="The folder to watch (default: the watch_folder setting).")
+    watch_parser.add_argument('--interval', type=float, default=10.0, help="Seconds between folder scans (default: 10).")
+    watch_parser.add_argument('--settle', type=float, default=5.0,
+                              help="Seconds a file must stay unchanged before it is ingested (default: 5).")
+    watch_parser.add_argument('--on-conflict', choices=['skip', 'replace'], default='replace',
+                              help="What to do when data for a file's date already exists (default: replace).")
+    watch_parser.add_argument('--once', action='store_true', help="Ingest the files that are ready and exit.")
+    watch_parser.set_defaults(handler=watch)
+
+    verify_parser = subparsers.add_parser('verify', help="Check the stored data against export files.")
+    verify_parser.add_argument('paths', nargs='+', help="Export files, glob patterns or directories.")
+    verify_parser.add_argument('--format', choices=['text', 'json'], default='text', help="Output format (default: text).")
+    verify_parser.set_defaults(handler=verify)
+
+    plans_parser = subparsers.add_parser('check-plans', help="Check that the frequent queries use indexes on a large synthetic database.")
+    plans_parser.add_argument('--videos', type=positive_int, default=SYNTHETIC_VIDEOS,
+                              help=f"Videos in the synthetic database (default: {SYNTHETIC_VIDEOS}).")
+    plans_parser.add_argument('--days', type=positive_int, default=SYNTHETIC_DAYS,
+                              help=f"Days of data per video (default: {SYNTHETIC_DAYS}).")
+    plans_parser.add_argument('--verbose', action='store_true', help="Print every plan, not only the failing ones.")
+    plans_parser.set_defaults(handler=check_plans)
+
+    benchmark_parser = subparsers.add_parser('benchmark', help="Time the bulk write path against the per-row path on synthetic uploads.")
+    benchmark_parser.add_argument('--sizes', type=positive_int, nargs='*', default=BENCHMARK_SIZES,
+                                  help=f"Rows per upload into an empty database, none to skip "
+                                       f"(default: {' '.join(str(size) for size in BENCHMARK_SIZES)}).")
+    benchmark_parser.add_argument('--history-days', type=positive_int, nargs='*', default=BENCHMARK_HISTORY_DAYS,
+                                  help=f"Days of history stored before a one-day upload, none to skip "
+                                       f"(default: {' '.join(str(days) for days in BENCHMARK_HISTORY_DAYS)}).")
+    benchmark_parser.add_argument('--videos', type=positive_int, default=BENCHMARK_VIDEOS,
+                                  help=f"Videos in the history databases, one row each per day (default: {BENCHMARK_VIDEOS}).")
+    benchmark_parser.add_argument('--no-legacy', action='store_true', help="Only time the bulk path.")
+    benchmark_parser.add_argument('--format', choices=['text', 'json'], default='text', help="Output format (default: text).")
+    benchmark_parser.set_defaults(handler=benchmark)
+
+    history_parser = subparsers.add_parser('history', help="Show recent ingestion runs and their throughput.")
+    history_parser.add_argument('--limit', type=int, default=20, help="Number of runs to show (default: 20).")
+    history_parser.add_argument('--format', choices=['text', 'json'], default='text', help="Output format (default: text).")
+    history_parser.set_defaults(handler=history)
+
+    return parser
+
+def main():
+    args = build_parser().parse_args()
+    sys.exit(args.handler(args))
+
+if __name__ == "__main__":
+    main()
@@ -19,4 +19,10 @@ DATABASE_FILE = os.path.join(DATA_DIR, 'tiktok_tracker.db')
 DB_BACKUP_DIR = os.path.join(DATA_DIR, 'db_backup')
 
 # Ensure the backup directory exists
-os.makedirs(DB_BACKUP_DIR, exist_ok=True)
\ No newline at end of file
+os.makedirs(DB_BACKUP_DIR, exist_ok=True)
+
+# Define the parsed export cache directory
+PARSE_CACHE_DIR = os.path.join(DATA_DIR, 'parse_cache')
+
+# Ensure the parsed export cache directory exists
+os.makedirs(PARSE_CACHE_DIR, exist_ok=True)
\ No newline at end of file
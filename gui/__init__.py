@@ -5,7 +5,9 @@ from .home_view import HomeView
 from .trending_page import TrendingPage
 from .settings_window import SettingsWindow
 from .context_menu import ContextMenuManager
+from .upload_progress_window import UploadProgressWindow
+from .ingest_history_window import IngestHistoryWindow
 
 # Define what should be imported when using "from gui import *"
-__all__ = ['TikTokTrackerGUI', 'HomeView', 'TrendingPage', 'SettingsWindow', 'ContextMenuManager']
+__all__ = ['TikTokTrackerGUI', 'HomeView', 'TrendingPage', 'SettingsWindow', 'ContextMenuManager', 'UploadProgressWindow', 'IngestHistoryWindow']
 __version__ = "1.0.0"
@@ -3,6 +3,8 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import webbrowser
 import logging
+from processes.ingestion_worker import IngestionWorker
+from .upload_progress_window import UploadProgressWindow
 
 # logging configuration
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -29,7 +31,7 @@ class HomeView:
         self.upload_button = ttk.Button(self.top_frame, text="Upload Excel File", command=self.update_video_performance)
         self.upload_button.pack(side=tk.LEFT, padx=5)
 
-        self.clear_data_button = ttk.Button(self.top_frame, text="Clear Video Performance", command=lambda: self.data_manager.clear_video_performance(self.master))
+        self.clear_data_button = ttk.Button(self.top_frame, text="Clear Video Performance", command=lambda: self.file_handler.clear_video_performance(self.master))
         self.clear_data_button.pack(side=tk.LEFT, padx=5)
 
         self.restore_button = ttk.Button(self.top_frame, text="Restore Database", command=self.update_restore_database)
@@ -119,21 +121,37 @@ class HomeView:
     ## Home Page Functions ##
     def update_video_performance(self):
         """
-        Calls the file handler to upload one or more Excel files containing video performance data.
-        Updates the last performance date.
-        Updates the UI upon completion.
+        Upload one or more Excel files containing video performance data in a background worker.
+        A progress window follows the upload so the main window stays responsive.
+        """
+        file_paths = self.file_handler.select_video_performance_files(self.master)
+        if not file_paths:
+            return
 
+        # Only one upload can run at a time
+        self.upload_button.configure(state=tk.DISABLED)
+        worker = IngestionWorker(file_paths)
+        UploadProgressWindow(self.master, worker, self.on_video_performance_uploaded)
+        worker.start()
+
+    def on_video_performance_uploaded(self, results):
         """
-        success = self.file_handler.upload_video_performance_file(self.master)
-        if success:
-            # Update the last performance date
-            latest_date = self.data_manager.get_latest_performance_date()
-            self.last_performance_date.set(f"Last Performance Date: {latest_date}")
-            # Refresh the video list
-            self.load_and_display_all_videos()
-        else:
-            # The file handler will display an error message if the upload fails.
-            pass
+        Show the upload summary, then update the last performance date and the video list.
+
+        Args:
+            results (list): The per-file results, or None if the upload failed.
+        """
+        self.upload_button.configure(state=tk.NORMAL)
+        if results is None:
+            # The progress window already displayed the error message.
+            return
+        self.file_handler.show_upload_result(results, self.master)
+
+        # Update the last performance date
+        latest_date = self.data_manager.get_latest_performance_date()
+        self.last_performance_date.set(f"Last Performance Date: {latest_date}")
+        # Refresh the video list
+        self.load_and_display_all_videos()
 
     def update_restore_database(self):
         """
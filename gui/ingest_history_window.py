@@ -0,0 +1,144 @@
+#ingest_history_window.py is the file that handles the window showing past ingestion runs and their throughput.
+import tkinter as tk
+from tkinter import ttk
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from processes.ingest_ledger import IngestLedger, RUN_STAGES, FILE_STAGES
+
+# Runs listed in the window and days shown in the trend chart
+MAX_LISTED_RUNS = 100
+TREND_DAYS = 90
+
+class IngestHistoryWindow(tk.Toplevel):
+    def __init__(self, parent, data_manager):
+        """
+        Initialize the IngestHistoryWindow, which lists recent ingestion runs, the files of the selected
+        run, and a chart of the time spent in each stage per day.
+
+        Args:
+            parent (tk.Tk): The parent window.
+            data_manager (DataManager): An instance of DataManager for reading the ledger.
+        """
+        super().__init__(parent)
+        self.title("Ingestion History")
+        self.ingest_ledger = IngestLedger(data_manager)
+        self.create_widgets_history()
+
+        # Make this window transient for the parent window
+        self.transient(parent)
+
+        # Set the window position relative to the parent window
+        self.geometry(f"+{parent.winfo_x() + 50}+{parent.winfo_y() + 50}")
+
+        self.load_runs()
+        self.plot_trends()
+
+    def create_widgets_history(self):
+        """
+        Create the runs table, the files table and the trend chart.
+        """
+        run_columns = ('Run', 'Started', 'Source', 'Files', 'Rows Read', 'Rows Written', 'Seconds', 'Rows/s', 'Slowest Stage')
+        self.runs_tree = self.create_table(run_columns, height=8)
+        self.runs_tree.bind('<<TreeviewSelect>>', self.show_run_files)
+
+        file_columns = ('File', 'Date', 'Status', 'Rows Read', 'Rows Kept', 'Inserted', 'Updated',
+                        *(stage.capitalize() for stage in FILE_STAGES))
+        self.files_tree = self.create_table(file_columns, height=5)
+
+        self.figure = Figure(figsize=(9, 3))
+        self.ax = self.figure.add_subplot(111)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self)
+        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1, padx=10, pady=(0, 10))
+
+    def create_table(self, columns, height):
+        """
+        Create a Treeview with a vertical scrollbar.
+
+        Args:
+            columns (tuple): The column headings.
+            height (int): The number of visible rows.
+
+        Returns:
+            ttk.Treeview: The table.
+        """
+        frame = ttk.Frame(self)
+        frame.pack(side=tk.TOP, fill=tk.BOTH, expand=1, padx=10, pady=(10, 5))
+        tree = ttk.Treeview(frame, columns=columns, show='headings', height=height)
+        for column in columns:
+            tree.heading(column, text=column)
+            tree.column(column, width=90, anchor='e')
+        tree.column(columns[0], width=160, anchor='w')
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=1)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        return tree
+
+    def load_runs(self):
+        """
+        Fill the runs table with the most recent runs, newest first.
+        """
+        runs = self.ingest_ledger.get_runs(MAX_LISTED_RUNS)
+        for _, run in runs.iterrows():
+            self.runs_tree.insert('', tk.END, iid=str(run['run_id']), values=(
+                run['run_id'],
+                run['started_at'],
+                run['source'],
+                run['files'],
+                run['rows_read'],
+                run['rows_written'],
+                f"{run['total_seconds']:.2f}",
+                f"{run['rows_per_second']:.0f}",
+                run['slowest_stage'],
+            ))
+
+    def show_run_files(self, event=None):
+        """
+        Show the files of the selected run.
+        """
+        self.files_tree.delete(*self.files_tree.get_children())
+        selection = self.runs_tree.selection()
+        if not selection:
+            return
+        files = self.ingest_ledger.get_run_files(int(selection[0]))
+        for _, file in files.iterrows():
+            self.files_tree.insert('', tk.END, values=(
+                file['file_name'],
+                file['performance_date'] or '',
+                file['status'],
+                file['rows_read'],
+                file['rows_filtered'],
+                file['rows_inserted'],
+                file['rows_updated'],
+                *(f"{file[f'{stage}_seconds']:.2f}" for stage in FILE_STAGES),
+            ))
+
+    def plot_trends(self):
+        """
+        Plot the seconds spent in each stage per day as stacked bars, with the rows per second on a second axis,
+        so a stage that slows down as the database grows stands out.
+        """
+        trends = self.ingest_ledger.get_daily_trends(TREND_DAYS)
+        self.ax.clear()
+        if trends.empty:
+            self.ax.text(0.5, 0.5, "No ingestion runs recorded yet", ha='center', va='center', transform=self.ax.transAxes)
+            self.canvas.draw()
+            return
+
+        positions = range(len(trends))
+        bottom = [0.0] * len(trends)
+        for stage in RUN_STAGES + FILE_STAGES:
+            seconds = trends[f'{stage}_seconds'].fillna(0.0).tolist()
+            self.ax.bar(positions, seconds, bottom=bottom, label=stage.capitalize())
+            bottom = [total + value for total, value in zip(bottom, seconds)]
+        self.ax.set_ylabel("Seconds")
+        self.ax.set_xticks(list(positions))
+        self.ax.set_xticklabels(trends['day'], rotation=45, ha='right', fontsize=8)
+        self.ax.legend(loc='upper left', fontsize=8, ncol=4)
+
+        throughput_ax = self.ax.twinx()
+        throughput_ax.plot(list(positions), trends['rows_per_second'], color='black', marker='o', label='Rows/s')
+        throughput_ax.set_ylabel("Rows/s")
+
+        self.figure.tight_layout()
+        self.canvas.draw()
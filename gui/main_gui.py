@@ -6,6 +6,7 @@ from plotter import Plotter
 from processes import SettingsManager
 from processes import FileHandler
 from .settings_window import SettingsWindow 
+from .ingest_history_window import IngestHistoryWindow
 from .trending_page import TrendingPage
 from .context_menu import ContextMenuManager
 from .home_view import HomeView
@@ -56,6 +57,7 @@ class TikTokTrackerGUI:
         settings_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Settings", menu=settings_menu)
         settings_menu.add_command(label="Open Settings", command=self.open_settings_window)
+        settings_menu.add_command(label="Ingestion History", command=self.open_ingest_history_window)
 
     def open_settings_window(self):
         """
@@ -63,6 +65,12 @@ class TikTokTrackerGUI:
         """
         SettingsWindow(self.master, self.data_manager, self.settings_manager)
 
+    def open_ingest_history_window(self):
+        """
+        Open the ingestion history window.
+        """
+        IngestHistoryWindow(self.master, self.data_manager)
+
     def setup_context_menu(self):
         """Set up the context menu after widgets are created."""
         # We need to create the context menu after the widgets are created because the context menu needs to know about the treeview widget.
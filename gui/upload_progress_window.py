@@ -0,0 +1,221 @@
+#upload_progress_window.py is the file that handles the progress window shown while files are uploaded.
+import os
+import queue
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+# How often the worker's event queue is polled, in milliseconds
+POLL_INTERVAL_MS = 100
+
+# Conflicting files listed by name in the conflict summary before the rest are counted
+MAX_LISTED_CONFLICTS = 10
+
+class ConflictResolutionDialog(tk.Toplevel):
+    # Button labels and the choice each one stands for
+    CHOICES = [
+        ("Replace all", 'replace'),
+        ("Skip all", 'skip'),
+        ("Decide per file", 'per_file'),
+        ("Cancel upload", 'cancel'),
+    ]
+
+    def __init__(self, parent, message):
+        """
+        Initialize the ConflictResolutionDialog, which asks once how to handle all the conflicting files.
+
+        Closing the dialog or pressing Escape cancels the upload. The answer is in self.choice once the
+        dialog is destroyed: 'replace', 'skip', 'per_file' or 'cancel'.
+
+        Args:
+            parent (tk.Toplevel): The upload progress window.
+            message (str): The description of the conflicts.
+        """
+        super().__init__(parent)
+        self.title("Data Already Exists")
+        self.choice = 'cancel'
+
+        ttk.Label(self, text=message, justify=tk.LEFT, wraplength=500).grid(row=0, column=0, columnspan=len(self.CHOICES), padx=10, pady=10, sticky='w')
+        for column, (label, choice) in enumerate(self.CHOICES):
+            ttk.Button(self, text=label, command=lambda choice=choice: self.choose(choice)).grid(row=1, column=column, padx=5, pady=(0, 10))
+
+        # Make this window transient for the parent window
+        self.transient(parent)
+
+        # Set the window position relative to the parent window
+        self.geometry(f"+{parent.winfo_x() + 50}+{parent.winfo_y() + 50}")
+
+        self.protocol("WM_DELETE_WINDOW", lambda: self.choose('cancel'))
+        self.bind('<Escape>', lambda event: self.choose('cancel'))
+
+        # Make the window modal
+        self.grab_set()
+
+    def choose(self, choice):
+        """Record the choice and close the dialog."""
+        self.choice = choice
+        self.destroy()
+
+class UploadProgressWindow(tk.Toplevel):
+    def __init__(self, parent, worker, on_complete):
+        """
+        Initialize the UploadProgressWindow, which follows an IngestionWorker until it finishes.
+
+        Args:
+            parent (tk.Tk): The parent window.
+            worker (IngestionWorker): The running upload worker.
+            on_complete (function): Called with the per-file results, or None if the upload failed.
+        """
+        super().__init__(parent)
+        self.title("Uploading Files")
+        self.parent = parent
+        self.worker = worker
+        self.on_complete = on_complete
+        self.create_widgets_progress()
+
+        # Make this window transient for the parent window
+        self.transient(parent)
+
+        # Set the window position relative to the parent window
+        self.geometry(f"+{parent.winfo_x() + 50}+{parent.winfo_y() + 50}")
+
+        # Closing the window cancels the upload instead of leaving it running unseen
+        self.protocol("WM_DELETE_WINDOW", self.cancel_upload)
+
+        self.after(POLL_INTERVAL_MS, self.poll_worker_events)
+
+    def create_widgets_progress(self):
+        """
+        Create the status labels, progress bars and cancel button.
+        """
+        self.status_var = tk.StringVar(value="Preparing upload...")
+        ttk.Label(self, textvariable=self.status_var, width=60).grid(row=0, column=0, padx=10, pady=(10, 5), sticky='w')
+
+        ttk.Label(self, text="Files:").grid(row=1, column=0, padx=10, sticky='w')
+        self.file_progress = ttk.Progressbar(self, length=400, mode='determinate')
+        self.file_progress.grid(row=2, column=0, padx=10, pady=(0, 5))
+
+        ttk.Label(self, text="Rows in current file:").grid(row=3, column=0, padx=10, sticky='w')
+        self.row_progress = ttk.Progressbar(self, length=400, mode='determinate')
+        self.row_progress.grid(row=4, column=0, padx=10, pady=(0, 5))
+
+        self.cancel_button = ttk.Button(self, text="Cancel", command=self.cancel_upload)
+        self.cancel_button.grid(row=5, column=0, pady=10)
+
+    def poll_worker_events(self):
+        """
+        Handle every event the worker has queued since the last poll, then schedule the next poll.
+        """
+        try:
+            while True:
+                event = self.worker.events.get_nowait()
+                if event[0] == 'progress':
+                    self.show_progress(*event[1:])
+                elif event[0] == 'conflicts':
+                    self.resolve_conflicts(event[1])
+                elif event[0] == 'confirm':
+                    self.confirm_replace(event[1])
+                elif event[0] == 'done':
+                    self.finish(event[1])
+                    return
+                elif event[0] == 'error':
+                    messagebox.showerror("Error", f"An unexpected error occurred: {event[1]}\n\nPlease check the log for more details.", parent=self)
+                    self.finish(None)
+                    return
+        except queue.Empty:
+            pass
+        self.after(POLL_INTERVAL_MS, self.poll_worker_events)
+
+    def show_progress(self, stage, done, total, detail):
+        """
+        Update the status label and progress bars.
+
+        Args:
+            stage (str): 'preflight', 'parse', 'file' or 'rows'.
+            done (int): Units completed so far.
+            total (int): Total units in the stage.
+            detail (str): The current file name, if any.
+        """
+        if stage == 'preflight':
+            self.status_var.set(f"Checking {total} file(s)...")
+        elif stage == 'parse':
+            self.status_var.set(f"Reading {total} file(s)...")
+            self.file_progress.configure(mode='indeterminate')
+            self.file_progress.start()
+        elif stage == 'file':
+            self.file_progress.stop()
+            self.file_progress.configure(mode='determinate', maximum=max(total, 1), value=done)
+            self.row_progress.configure(value=0)
+            if detail:
+                self.status_var.set(f"Writing file {done + 1} of {total}: {detail}")
+        elif stage == 'rows':
+            self.row_progress.configure(maximum=max(total, 1), value=done)
+
+    def resolve_conflicts(self, conflicts):
+        """
+        Ask once how to handle every file whose dates already have data or overlap another selected file,
+        and pass the answers back to the worker.
+
+        Args:
+            conflicts (list): The conflicts found by FileHandler.find_conflicts.
+        """
+        lines = [f"- {self.describe_conflict(conflict)}" for conflict in conflicts[:MAX_LISTED_CONFLICTS]]
+        if len(conflicts) > MAX_LISTED_CONFLICTS:
+            lines.append(f"- and {len(conflicts) - MAX_LISTED_CONFLICTS} more file(s)")
+        dialog = ConflictResolutionDialog(self,
+            f"{len(conflicts)} of the selected files contain dates that already have data:\n\n" + "\n".join(lines))
+        self.wait_window(dialog)
+
+        if dialog.choice == 'cancel':
+            # The worker still waits for an answer, and stops before parsing once it has it
+            self.cancel_upload()
+            decisions = {conflict['file']: False for conflict in conflicts}
+        elif dialog.choice == 'per_file':
+            decisions = {
+                conflict['file']: messagebox.askyesno("Data Already Exists",
+                    f"{self.describe_conflict(conflict)}.\n\nDo you want to replace the existing data?", parent=self)
+                for conflict in conflicts
+            }
+        else:
+            decisions = {conflict['file']: dialog.choice == 'replace' for conflict in conflicts}
+        self.worker.answer_confirmation(decisions)
+
+    def describe_conflict(self, conflict):
+        """Describe a file's conflict in one line."""
+        reasons = []
+        if conflict['existing_dates']:
+            dates = conflict['existing_dates']
+            reasons.append(f"data for {dates[0]} already exists" if len(dates) == 1 else
+                           f"data for {len(dates)} days between {dates[0]} and {dates[-1]} already exists")
+        if conflict['duplicate_files']:
+            reasons.append(f"same dates as {', '.join(os.path.basename(other) for other in conflict['duplicate_files'])}")
+        return f"{os.path.basename(conflict['file'])}: {'; '.join(reasons)}"
+
+    def confirm_replace(self, date):
+        """
+        Ask the user whether existing data should be replaced and pass the answer back to the worker.
+
+        Args:
+            date (str): The performance date that already has data.
+        """
+        response = messagebox.askyesno("Data Already Exists",
+            f"Data for {date} already exists in the database. Do you want to replace it?", parent=self)
+        self.worker.answer_confirmation(response)
+
+    def cancel_upload(self):
+        """
+        Ask the worker to stop before the next file. The window closes once the worker reports back.
+        """
+        self.worker.cancel()
+        self.cancel_button.configure(state=tk.DISABLED)
+        self.status_var.set("Cancelling after the current file...")
+
+    def finish(self, results):
+        """
+        Close the window and hand the results to the completion callback.
+
+        Args:
+            results (list): The per-file results, or None if the upload failed.
+        """
+        self.file_progress.stop()
+        self.destroy()
+        self.on_complete(results)
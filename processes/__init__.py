@@ -3,6 +3,12 @@
 from .data_manager import DataManager
 from .file_handler import FileHandler
 from .settings_manager import SettingsManager
+from .export_reader import ExportReader
+from .ingestion_worker import IngestionWorker
+from .parse_cache import ParseCache
+from .folder_watcher import FolderWatcher
+from .ingest_ledger import IngestLedger
+from .connection_manager import ConnectionManager
 # Define what should be imported when using "from processes import *"
-__all__ = ['DataManager', 'FileHandler', 'SettingsManager']
+__all__ = ['DataManager', 'FileHandler', 'SettingsManager', 'ExportReader', 'IngestionWorker', 'ParseCache', 'FolderWatcher', 'IngestLedger', 'ConnectionManager']
 __version__ = "1.0.0"
@@ -0,0 +1,189 @@
+#backup_manager.py is the file that handles creating, compressing, pruning and restoring database backups.
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime
+
+# zstandard is optional. Without it, zstd compression falls back to gzip.
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# logging configuration
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+
+BACKUP_PREFIX = "tiktok_tracker_backup_"
+# Backups are named with microseconds, so two snapshots taken in the same second don't overwrite each other.
+# Names with only seconds, from before, are still recognised.
+BACKUP_TIME_FORMAT = "%Y%m%d_%H%M%S_%f"
+BACKUP_PATTERN = re.compile(r'^tiktok_tracker_backup_(\d{8}_\d{6}(?:_\d{6})?)\.db(\.gz|\.zst)?$')
+MANIFEST_FILENAME = "backup_manifest.json"
+
+class BackupManager:
+    def __init__(self, backup_dir, compression='gzip', keep_last=10, keep_daily=7, keep_weekly=4):
+        """
+        Initialize the BackupManager.
+
+        Args:
+            backup_dir (str): The directory the backups are stored in.
+            compression (str): 'gzip', 'zstd' or 'none'.
+            keep_last (int): Number of most recent backups to always keep.
+            keep_daily (int): Number of most recent days for which the last backup of the day is kept.
+            keep_weekly (int): Number of most recent weeks for which the last backup of the week is kept.
+        """
+        self.backup_dir = backup_dir
+        self.compression = compression
+        self.keep_last = keep_last
+        self.keep_daily = keep_daily
+        self.keep_weekly = keep_weekly
+
+    def snapshot(self, conn):
+        """
+        Take a compressed snapshot of the database, unless it is identical to the previous snapshot.
+
+        Args:
+            conn (sqlite3.Connection): A connection to the database to back up.
+
+        Returns:
+            str: The path of the new backup, or None if the snapshot was skipped.
+        """
+        fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=self.backup_dir)
+        os.close(fd)
+        try:
+            # Use the sqlite backup API so the snapshot is consistent even while the database is open
+            backup_conn = sqlite3.connect(temp_path)
+            with backup_conn:
+                conn.backup(backup_conn)
+            backup_conn.close()
+
+            content_hash = self.hash_file(temp_path)
+            manifest = self.load_manifest()
+            if content_hash == manifest.get('last_hash') and os.path.exists(os.path.join(self.backup_dir, manifest.get('last_backup', ''))):
+                logging.info(f"Database unchanged since {manifest['last_backup']}. Skipping backup.")
+                return None
+
+            # Some clocks tick slower than a microsecond, so an existing name is never reused
+            backup_path = None
+            while backup_path is None or os.path.exists(backup_path):
+                timestamp = datetime.now().strftime(BACKUP_TIME_FORMAT)
+                backup_path = os.path.join(self.backup_dir, f"{BACKUP_PREFIX}{timestamp}.db{self.compressed_extension()}")
+            self.compress_file(temp_path, backup_path)
+            self.save_manifest({'last_hash': content_hash, 'last_backup': os.path.basename(backup_path)})
+            logging.info(f"Database backed up to {backup_path}")
+
+            self.prune()
+            return backup_path
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def restore(self, backup_path, database_file):
+        """
+        Replace the database file with the contents of a backup, decompressing it if needed.
+        All connections to the database must be closed first.
+
+        Args:
+            backup_path (str): The backup to restore.
+            database_file (str): The database file to overwrite.
+        """
+        if backup_path.endswith('.gz'):
+            with gzip.open(backup_path, 'rb') as source, open(database_file, 'wb') as target:
+                shutil.copyfileobj(source, target)
+        elif backup_path.endswith('.zst'):
+            if zstandard is None:
+                raise ValueError("Restoring a .zst backup requires the zstandard package")
+            with open(backup_path, 'rb') as source, open(database_file, 'wb') as target:
+                zstandard.ZstdDecompressor().copy_stream(source, target)
+        else:
+            shutil.copy2(backup_path, database_file)
+
+    def prune(self):
+        """
+        Delete the backups that are not kept by any of the retention rules.
+        """
+        backups = self.list_backups()
+        keep = set(backups[:max(self.keep_last, 1)])
+
+        for bucket_format, bucket_count in (("%Y-%m-%d", self.keep_daily), ("%G-W%V", self.keep_weekly)):
+            buckets = {}
+            # Backups are ordered newest first, so the first backup seen in a bucket is the one to keep
+            for backup in backups:
+                bucket = self.backup_time(backup).strftime(bucket_format)
+                if bucket not in buckets and len(buckets) < bucket_count:
+                    buckets[bucket] = backup
+            keep.update(buckets.values())
+
+        for backup in backups:
+            if backup not in keep:
+                os.remove(os.path.join(self.backup_dir, backup))
+                logging.info(f"Deleted old backup {backup}")
+
+    def list_backups(self):
+        """
+        List the backup files in the backup directory, newest first.
+
+        Returns:
+            list: The backup file names.
+        """
+        backups = [name for name in os.listdir(self.backup_dir) if BACKUP_PATTERN.match(name)]
+        return sorted(backups, key=self.backup_time, reverse=True)
+
+    def backup_time(self, backup):
+        """Return the time a backup was taken, based on its file name."""
+        timestamp = BACKUP_PATTERN.match(backup).group(1)
+        return datetime.strptime(timestamp, BACKUP_TIME_FORMAT if timestamp.count('_') == 2 else "%Y%m%d_%H%M%S")
+
+    def compressed_extension(self):
+        """Return the file extension for the configured compression."""
+        if self.compression == 'zstd' and zstandard is not None:
+            return '.zst'
+        if self.compression == 'none':
+            return ''
+        return '.gz'
+
+    def compress_file(self, source_path, target_path):
+        """
+        Write a compressed copy of a file, using the compression implied by the target extension.
+
+        Args:
+            source_path (str): The file to compress.
+            target_path (str): The compressed file to create.
+        """
+        with open(source_path, 'rb') as source:
+            if target_path.endswith('.zst'):
+                with open(target_path, 'wb') as target:
+                    zstandard.ZstdCompressor().copy_stream(source, target)
+            elif target_path.endswith('.gz'):
+                with gzip.open(target_path, 'wb', compresslevel=6) as target:
+                    shutil.copyfileobj(source, target)
+            else:
+                with open(target_path, 'wb') as target:
+                    shutil.copyfileobj(source, target)
+
+    def hash_file(self, path):
+        """Return the SHA-256 hex digest of a file's contents."""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def load_manifest(self):
+        """Load the record of the previous snapshot."""
+        try:
+            with open(os.path.join(self.backup_dir, MANIFEST_FILENAME), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_manifest(self, manifest):
+        """Save the record of the latest snapshot."""
+        with open(os.path.join(self.backup_dir, MANIFEST_FILENAME), 'w') as f:
+            json.dump(manifest, f)
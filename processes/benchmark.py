@@ -0,0 +1,179 @@
+#benchmark.py is the file that handles timing the ingestion write path on synthetic data.
+import logging
+import os
+import time
+from datetime import date, timedelta
+import pandas as pd
+from . import data_manager as dm
+from .query_plans import build_synthetic_database
+
+# logging configuration
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Rows per upload for the write benchmark, and days of stored history for the history benchmark
+BENCHMARK_SIZES = [10000, 100000, 1000000]
+BENCHMARK_HISTORY_DAYS = [10, 100, 1000]
+BENCHMARK_VIDEOS = 1000
+
+# The per-video totals update the per-row path ran after every row
+LEGACY_TOTALS_QUERY = '''
+    UPDATE videos
+    SET
+        total_vv = (SELECT SUM(vv) FROM daily_performance WHERE video_id = ?1),
+        total_likes = (SELECT SUM(likes) FROM daily_performance WHERE video_id = ?1),
+        total_shares = (SELECT SUM(shares) FROM daily_performance WHERE video_id = ?1),
+        total_video_revenue = (SELECT SUM(video_revenue) FROM daily_performance WHERE video_id = ?1)
+    WHERE video_id = ?1
+'''
+
+def synthetic_export(video_ids, performance_date):
+    """
+    Build a cleaned export frame with one row per video, as insert_or_update_records receives it.
+
+    Args:
+        video_ids (list): The video IDs, one row each.
+        performance_date (str): The export date in 'YYYY-MM-DD' format.
+
+    Returns:
+        DataFrame: The export rows.
+    """
+    index = pd.RangeIndex(len(video_ids))
+    return pd.DataFrame({
+        'Video ID': video_ids,
+        'Video Info': [f"Video {video_id}" for video_id in video_ids],
+        'Time': f"{performance_date} 10:00",
+        'Creator name': [f"creator{i % 50}" for i in index],
+        'Products': [f"product{i % 20}" for i in index],
+        'performance_date': performance_date,
+        'VV': 1000 + index % 9000,
+        'Likes': index % 500,
+        'Comments': index % 70,
+        'Shares': index % 50,
+        'New followers': index % 10,
+        'V-to-L clicks': index % 30,
+        'Product Impressions': index % 800,
+        'Product Clicks': index % 80,
+        'Customers': index % 8,
+        'Orders': index % 9,
+        'Unit Sales': index % 12,
+        'Video Revenue ($)': (index % 13) * 1.5,
+        'GPM ($)': (index % 7) * 0.5,
+        'Shoppable video attributed GMV ($)': (index % 11) * 2.0,
+        'CTR': (index % 100) / 1000,
+        'V-to-L rate': (index % 100) / 1000,
+        'Video Finish Rate': (index % 100) / 100,
+        'CTOR': (index % 100) / 1000,
+    })
+
+def legacy_insert_or_update_records(data_manager, df):
+    """
+    Write the rows the way insert_or_update_records did before the bulk path: one SELECT, one videos write,
+    one daily_performance write and one totals update per row, each committed. Kept only for comparison.
+
+    Args:
+        data_manager (DataManager): The DataManager connected to the database to write to.
+        df (DataFrame): The export rows.
+    """
+    cursor = data_manager.conn.cursor()
+    daily_columns = data_manager.daily_performance_export_columns(df)
+    for row in df.to_dict('records'):
+        cursor.execute("SELECT 1 FROM videos WHERE video_id = ?", (row['Video ID'],))
+        video_exists = cursor.fetchone() is not None
+        metadata = (row['Video Info'], row['Time'], row['Creator name'], row['Products'], row['Video ID'])
+        if video_exists:
+            cursor.execute("UPDATE videos SET video_info = ?, time = ?, creator_name = ?, products = ? WHERE video_id = ?", metadata)
+        elif row['VV'] >= data_manager.vv_threshold:
+            cursor.execute("INSERT INTO videos (video_info, time, creator_name, products, video_id) VALUES (?, ?, ?, ?, ?)", metadata)
+        else:
+            continue
+        cursor.execute(f'''
+            INSERT OR REPLACE INTO daily_performance (performance_day, {dm.DAILY_PERFORMANCE_COLUMN_LIST})
+            VALUES ({dm.day_from_date('?2')}, {', '.join(f'?{i + 1}' for i in range(len(daily_columns)))})
+        ''', [row[column] for column in daily_columns])
+        cursor.execute(LEGACY_TOTALS_QUERY, (row['Video ID'],))
+        data_manager.conn.commit()
+
+def time_write(data_manager, df, legacy):
+    """
+    Time one write of the rows with the bulk or the per-row path.
+
+    Args:
+        data_manager (DataManager): The DataManager connected to the database to write to.
+        df (DataFrame): The export rows.
+        legacy (bool): Use the per-row path instead of insert_or_update_records.
+
+    Returns:
+        dict: The path, the seconds taken, the rows per second and, for the bulk path, the totals refresh seconds.
+    """
+    # Every synthetic row is written, whatever the VV threshold setting
+    data_manager.vv_threshold = 0
+    start = time.perf_counter()
+    if legacy:
+        legacy_insert_or_update_records(data_manager, df)
+        totals_seconds = None
+    else:
+        totals_seconds = data_manager.insert_or_update_records(df)['totals_seconds']
+    seconds = time.perf_counter() - start
+    return {
+        'path': 'per-row' if legacy else 'bulk',
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(len(df) / seconds, 1) if seconds else 0.0,
+        'totals_seconds': None if totals_seconds is None else round(totals_seconds, 3),
+    }
+
+def benchmark_write_sizes(directory, sizes=BENCHMARK_SIZES, legacy=True):
+    """
+    Time the bulk and the per-row write of uploads of each size into an empty database.
+
+    Args:
+        directory (str): The directory to create the benchmark databases in.
+        sizes (list): The numbers of rows per upload.
+        legacy (bool): Also time the per-row path.
+
+    Returns:
+        list: A result dictionary per size and path, as returned by time_write with the row count.
+    """
+    results = []
+    for rows in sizes:
+        df = synthetic_export([f"{7000000000000000000 + index}" for index in range(rows)], '2024-01-01')
+        for use_legacy in ([True, False] if legacy else [False]):
+            database_file = os.path.join(directory, f"write_{rows}_{'legacy' if use_legacy else 'bulk'}.db")
+            data_manager = dm.DataManager(database_file)
+            try:
+                result = time_write(data_manager, df, use_legacy)
+            finally:
+                data_manager.close()
+            logging.info(f"Wrote {rows} rows with the {result['path']} path in {result['seconds']}s")
+            results.append({'rows': rows, **result})
+    return results
+
+def benchmark_history_length(directory, history_days=BENCHMARK_HISTORY_DAYS, videos=BENCHMARK_VIDEOS, legacy=True):
+    """
+    Time one day's upload of every video into databases holding more and more days of history.
+
+    Args:
+        directory (str): The directory to create the benchmark databases in.
+        history_days (list): The days of history stored before the upload.
+        videos (int): The number of videos, each with a row on every day.
+        legacy (bool): Also time the per-row path.
+
+    Returns:
+        list: A result dictionary per history length and path, as returned by time_write with the history days.
+    """
+    results = []
+    for days in history_days:
+        for use_legacy in ([True, False] if legacy else [False]):
+            database_file = os.path.join(directory, f"history_{days}_{'legacy' if use_legacy else 'bulk'}.db")
+            data_manager, _ = build_synthetic_database(database_file, videos, days)
+            try:
+                # The synthetic database leaves days staged for its plan checks, which the upload must not refresh
+                data_manager.conn.execute("DELETE FROM temp.changed_days")
+                next_date = (date(2024, 1, 1) + timedelta(days=days)).isoformat()
+                df = synthetic_export([f"{7000000000000000000 + index}" for index in range(videos)], next_date)
+                result = time_write(data_manager, df, use_legacy)
+            finally:
+                data_manager.close()
+            logging.info(f"Wrote one day of {videos} videos over {days} days of history with the {result['path']} path "
+                         f"in {result['seconds']}s")
+            results.append({'history_days': days, 'rows': videos, **result})
+    return results
@@ -0,0 +1,117 @@
+#connection_manager.py is the file that handles the SQLite connections: one writer and a pool of read-only readers.
+import logging
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from urllib.request import pathname2url
+
+# logging configuration
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Read-only connections kept open for queries
+READER_POOL_SIZE = 4
+
+# Pragmas set on every connection. cache_size is negative to give it in KiB, so each connection caches up to 64 MiB.
+CONNECTION_PRAGMAS = {
+    'busy_timeout': 5000,
+    'cache_size': -65536,
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+}
+# In WAL mode a commit only needs the log to be synced at checkpoints, so NORMAL is still safe against corruption
+WRITER_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+}
+
+class ConnectionManager:
+    def __init__(self, database_file, pool_size=READER_POOL_SIZE):
+        """
+        Initialize the ConnectionManager and open the writer connection.
+
+        The database is switched to WAL mode, so readers see the last committed data and are never blocked by
+        a write in progress. The writer connection belongs to the thread that created the manager. The reader
+        connections are opened on first use, are read-only and can be used from any thread, one at a time.
+
+        Args:
+            database_file (str): The path to the database file.
+            pool_size (int): The maximum number of reader connections.
+        """
+        self.database_file = database_file
+        self.pool_size = pool_size
+        self.readers = queue.LifoQueue()
+        self.reader_count = 0
+        self.reader_lock = threading.Lock()
+        self.writer = self.connect()
+        for pragma, value in WRITER_PRAGMAS.items():
+            self.writer.execute(f"PRAGMA {pragma} = {value}")
+
+    def connect(self, read_only=False):
+        """
+        Open a connection with the tuned pragmas.
+
+        Args:
+            read_only (bool): Open the database read-only, for use from any thread.
+
+        Returns:
+            sqlite3.Connection: The new connection.
+        """
+        if read_only:
+            conn = sqlite3.connect(f"file:{pathname2url(self.database_file)}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.database_file)
+        for pragma, value in CONNECTION_PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        return conn
+
+    @contextmanager
+    def reader(self):
+        """
+        Borrow a read-only connection from the pool, opening one if none is free and the pool is not full.
+        Waits for a connection to be returned otherwise.
+
+        Yields:
+            sqlite3.Connection: The reader connection, returned to the pool on exit.
+        """
+        try:
+            conn = self.readers.get_nowait()
+        except queue.Empty:
+            with self.reader_lock:
+                open_new = self.reader_count < self.pool_size
+                if open_new:
+                    self.reader_count += 1
+            conn = self.connect(read_only=True) if open_new else self.readers.get()
+        try:
+            yield conn
+        finally:
+            # End any read transaction so the connection doesn't hold an old snapshot while pooled
+            if conn.in_transaction:
+                conn.rollback()
+            self.readers.put(conn)
+
+    def checkpoint(self):
+        """
+        Copy the write-ahead log into the database file and truncate it.
+        """
+        self.writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        """
+        Checkpoint the log and close the reader connections and the writer connection. Uncommitted
+        changes on the writer are rolled back.
+        """
+        while True:
+            try:
+                self.readers.get_nowait().close()
+            except queue.Empty:
+                break
+        self.reader_count = 0
+        try:
+            # A checkpoint can't run inside a transaction. Closing discards uncommitted work anyway.
+            if self.writer.in_transaction:
+                self.writer.rollback()
+            self.checkpoint()
+        except sqlite3.Error as e:
+            logging.warning(f"Could not checkpoint the database before closing: {str(e)}")
+        self.writer.close()
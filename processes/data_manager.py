@@ -2,47 +2,575 @@
 import pandas as pd
 import sqlite3
 import logging
-from datetime import datetime
-import os
-import shutil
 import json
 import re
+import time
 import numpy as np
-import tkinter as tk
-from tkinter import messagebox
-from config import DATABASE_FILE, SETTINGS_FILE, DB_BACKUP_DIR
+from config import DATABASE_FILE, SETTINGS_FILE, DB_BACKUP_DIR, PARSE_CACHE_DIR
+from .export_reader import extract_date_from_range
+from .parse_cache import ParseCache
+from .backup_manager import BackupManager
+from .connection_manager import ConnectionManager
 
 
 # logging configuration
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Number of rows sent to the database per executemany call during bulk ingestion
+BULK_CHUNK_SIZE = 5000
+
+# Export columns written to the videos table, in parameter order
+VIDEO_METADATA_COLUMNS = ['Video ID', 'Video Info', 'Time', 'Creator name', 'Products']
+
+# daily_performance columns written on ingestion and the export column each one is read from.
+# The customers column is resolved at ingestion time since TikTok renamed "Buyers" to "Customers".
+DAILY_PERFORMANCE_COLUMNS = [
+    ('video_id', 'Video ID'),
+    ('performance_date', 'performance_date'),
+    ('vv', 'VV'),
+    ('likes', 'Likes'),
+    ('comments', 'Comments'),
+    ('shares', 'Shares'),
+    ('new_followers', 'New followers'),
+    ('v_to_l_clicks', 'V-to-L clicks'),
+    ('product_impressions', 'Product Impressions'),
+    ('product_clicks', 'Product Clicks'),
+    ('customers', None),
+    ('orders', 'Orders'),
+    ('unit_sales', 'Unit Sales'),
+    ('video_revenue', 'Video Revenue ($)'),
+    ('gpm', 'GPM ($)'),
+    ('shoppable_video_attributed_gmv', 'Shoppable video attributed GMV ($)'),
+    ('ctr', 'CTR'),
+    ('v_to_l_rate', 'V-to-L rate'),
+    ('video_finish_rate', 'Video Finish Rate'),
+    ('ctor', 'CTOR'),
+]
+
+# Each videos row stores a hash of its metadata, so unchanged metadata is not rewritten on re-ingest
+UPSERT_VIDEO_QUERY = '''
+    INSERT INTO videos (video_id, video_info, time, creator_name, products, meta_hash)
+    VALUES (?1, ?2, ?3, ?4, ?5, ?6)
+    ON CONFLICT(video_id) DO UPDATE SET
+        video_info = excluded.video_info,
+        time = excluded.time,
+        creator_name = excluded.creator_name,
+        products = excluded.products,
+        meta_hash = excluded.meta_hash
+'''
+
+UPDATE_VIDEO_QUERY = '''
+    UPDATE videos
+    SET video_info = ?2, time = ?3, creator_name = ?4, products = ?5, meta_hash = ?6
+    WHERE video_id = ?1
+'''
+
+DAILY_PERFORMANCE_COLUMN_LIST = ', '.join(column for column, _ in DAILY_PERFORMANCE_COLUMNS)
+
+# Julian day number of 1970-01-01. Dates are keyed by their day number since then: performance_day in
+# daily_performance and the rollups, and day in the shadow store. The ISO date strings are kept for display.
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+def day_from_date(date_sql):
+    """
+    Return the SQL expression converting a 'YYYY-MM-DD' date to its day number.
+
+    Args:
+        date_sql (str): The SQL expression or parameter holding the date, such as '?'.
+
+    Returns:
+        str: The SQL expression.
+    """
+    return f"CAST(julianday({date_sql}) - {UNIX_EPOCH_JULIAN_DAY} AS INTEGER)"
+
+def date_from_day(day_sql):
+    """
+    Return the SQL expression converting a day number back to a 'YYYY-MM-DD' date.
+
+    Args:
+        day_sql (str): The SQL expression holding the day number.
+
+    Returns:
+        str: The SQL expression.
+    """
+    return f"date({day_sql} + {UNIX_EPOCH_JULIAN_DAY})"
+
+# Formatted with the table name, so migrate_database can rebuild the table with the same definition
+CREATE_DAILY_PERFORMANCE_QUERY = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        video_id TEXT,
+        performance_day INTEGER NOT NULL,
+        performance_date TEXT,
+        vv INTEGER,
+        likes INTEGER,
+        comments INTEGER,
+        shares INTEGER,
+        new_followers INTEGER,
+        v_to_l_clicks INTEGER,
+        product_impressions INTEGER,
+        product_clicks INTEGER,
+        customers INTEGER,
+        orders INTEGER,
+        unit_sales INTEGER,
+        video_revenue REAL,
+        gpm REAL,
+        shoppable_video_attributed_gmv REAL,
+        ctr REAL,
+        v_to_l_rate REAL,
+        video_finish_rate REAL,
+        ctor REAL,
+        dgr REAL,
+        er REAL,
+        egr REAL,
+        trending_score REAL,
+        momentum REAL,
+        row_hash INTEGER,
+        PRIMARY KEY (video_id, performance_day),
+        FOREIGN KEY (video_id) REFERENCES videos(video_id)
+    )
+'''
+
+# Staging table incoming daily rows are loaded into before they are written to daily_performance.
+# Each row carries a hash of its values, so rows that are already stored unchanged can be dropped.
+# Duplicate Video IDs in an export keep the last row.
+CREATE_STAGED_DAILY_PERFORMANCE_QUERY = f'''
+    CREATE TEMP TABLE IF NOT EXISTS staged_daily_performance (
+        {DAILY_PERFORMANCE_COLUMN_LIST},
+        performance_day INTEGER,
+        row_hash INTEGER,
+        PRIMARY KEY (video_id, performance_day)
+    )
+'''
+
+# The day number is computed from the performance_date parameter, so it is set once on ingestion
+STAGE_DAILY_PERFORMANCE_QUERY = f'''
+    INSERT OR REPLACE INTO temp.staged_daily_performance ({DAILY_PERFORMANCE_COLUMN_LIST}, row_hash, performance_day)
+    VALUES ({', '.join(f'?{i}' for i in range(1, len(DAILY_PERFORMANCE_COLUMNS) + 2))}, {day_from_date('?2')})
+'''
+
+DROP_UNCHANGED_STAGED_ROWS_QUERY = '''
+    DELETE FROM temp.staged_daily_performance
+    WHERE EXISTS (
+        SELECT 1 FROM daily_performance dp
+        WHERE dp.video_id = staged_daily_performance.video_id
+          AND dp.performance_day = staged_daily_performance.performance_day
+          AND dp.row_hash = staged_daily_performance.row_hash
+    )
+'''
+
+# Only staged rows whose video is tracked in the videos table are written
+UPSERT_STAGED_DAILY_PERFORMANCE_QUERY = f'''
+    INSERT INTO daily_performance ({DAILY_PERFORMANCE_COLUMN_LIST}, performance_day, row_hash)
+    SELECT {DAILY_PERFORMANCE_COLUMN_LIST}, performance_day, row_hash FROM temp.staged_daily_performance s
+    WHERE EXISTS (SELECT 1 FROM videos v WHERE v.video_id = s.video_id)
+    ON CONFLICT(video_id, performance_day) DO UPDATE SET
+        {', '.join(f'{column} = excluded.{column}' for column, _ in DAILY_PERFORMANCE_COLUMNS[2:])},
+        row_hash = excluded.row_hash
+'''
+
+# Shadow store for rows below the VV threshold, kept compact so it can hold every low-view video:
+# integer video keys, days since 1970-01-01 instead of date strings, and currency and percentage
+# values as integers scaled by SHADOW_SCALE. Rows older than the TTL are pruned.
+SHADOW_METRIC_COLUMNS = [column for column, _ in DAILY_PERFORMANCE_COLUMNS[2:]]
+SHADOW_SCALED_COLUMNS = ['video_revenue', 'gpm', 'shoppable_video_attributed_gmv', 'ctr', 'v_to_l_rate', 'video_finish_rate', 'ctor']
+SHADOW_SCALE = 100
+
+CREATE_SHADOW_DAILY_PERFORMANCE_QUERY = f'''
+    CREATE TABLE IF NOT EXISTS shadow_daily_performance (
+        video_key INTEGER NOT NULL,
+        day INTEGER NOT NULL,
+        {', '.join(f'{column} INTEGER' for column in SHADOW_METRIC_COLUMNS)},
+        row_hash INTEGER,
+        PRIMARY KEY (video_key, day)
+    ) WITHOUT ROWID
+'''
+
+# The row hash is that of the export row, as computed by stage_daily_performance, not of the scaled values,
+# so a promoted row matches the same export row when it is ingested again
+UPSERT_SHADOW_DAILY_PERFORMANCE_QUERY = f'''
+    INSERT INTO shadow_daily_performance (video_key, day, {', '.join(SHADOW_METRIC_COLUMNS)}, row_hash)
+    VALUES (
+        (SELECT video_key FROM shadow_videos WHERE video_id = ?1),
+        {day_from_date('?2')},
+        {', '.join(f'CAST(ROUND(?{i} * {SHADOW_SCALE}) AS INTEGER)' if column in SHADOW_SCALED_COLUMNS else f'?{i}'
+                   for i, column in enumerate(SHADOW_METRIC_COLUMNS, start=3))},
+        ?{len(SHADOW_METRIC_COLUMNS) + 3}
+    )
+    ON CONFLICT(video_key, day) DO UPDATE SET
+        {', '.join(f'{column} = excluded.{column}' for column in SHADOW_METRIC_COLUMNS)},
+        row_hash = excluded.row_hash
+'''
+
+# Rows already in daily_performance, such as the current file's rows, take precedence over shadow rows
+PROMOTE_SHADOW_HISTORY_QUERY = f'''
+    INSERT INTO daily_performance ({DAILY_PERFORMANCE_COLUMN_LIST}, performance_day, row_hash)
+    SELECT sv.video_id, {date_from_day('sd.day')},
+        {', '.join(f'sd.{column} / {SHADOW_SCALE}.0' if column in SHADOW_SCALED_COLUMNS else f'sd.{column}'
+                   for column in SHADOW_METRIC_COLUMNS)},
+        sd.day, sd.row_hash
+    FROM shadow_daily_performance sd
+    JOIN shadow_videos sv ON sv.video_key = sd.video_key
+    WHERE sv.video_id IN (SELECT video_id FROM temp.staged_video_ids)
+    ON CONFLICT(video_id, performance_day) DO NOTHING
+'''
+
+# Daily performance rows written, replaced or deleted in the current transaction, so refresh_rollups only
+# recomputes the periods they fall in
+CREATE_CHANGED_DAYS_QUERY = '''
+    CREATE TEMP TABLE IF NOT EXISTS changed_days (
+        video_id TEXT,
+        performance_day INTEGER,
+        PRIMARY KEY (video_id, performance_day)
+    ) WITHOUT ROWID
+'''
+
+# Weekly and monthly rollups of daily_performance, one row per video and period, keyed by the day number of
+# the period's first day. Each metric column holds the sum over the period, so CTR and CTOR are derived exactly from the summed
+# clicks, views and orders. The averaged rate metrics also store the number of days that had a value.
+ROLLUP_METRIC_COLUMNS = [column for column, _ in DAILY_PERFORMANCE_COLUMNS[2:]]
+AVERAGED_METRICS = ['v_to_l_rate', 'video_finish_rate']
+# Metrics computed as numerator / denominator * 100 over each period
+RATIO_METRICS = {'ctr': ('product_clicks', 'vv'), 'ctor': ('orders', 'product_clicks')}
+
+# Rollup tables with SQL templates for the first day of the period containing day {day}, and the last day of
+# the period starting on day {period}. Day 0, 1970-01-01, was a Thursday, so weeks are bucketed with integer math.
+ROLLUP_TABLES = {
+    'daily_performance_weekly_sun': ('{day} - ({day} + 4) % 7', '{period} + 6'),
+    'daily_performance_weekly_mon': ('{day} - ({day} + 3) % 7', '{period} + 6'),
+    'daily_performance_monthly': (day_from_date(f"{date_from_day('{day}')}, 'start of month'"),
+                                  day_from_date(f"{date_from_day('{period}')}, '+1 month'") + ' - 1'),
+}
+
+ROLLUP_COLUMN_LIST = ', '.join(ROLLUP_METRIC_COLUMNS + [f'{metric}_days' for metric in AVERAGED_METRICS])
+ROLLUP_AGGREGATES = ', '.join([f'SUM(dp.{column})' for column in ROLLUP_METRIC_COLUMNS] +
+                              [f'COUNT(dp.{metric})' for metric in AVERAGED_METRICS])
+
+# Rollup query templates, formatted by rollup_query
+CREATE_ROLLUP_QUERY = f'''
+    CREATE TABLE IF NOT EXISTS {{table}} (
+        video_id TEXT NOT NULL,
+        period_day INTEGER NOT NULL,
+        days INTEGER NOT NULL,
+        {', '.join(f'{column} REAL' if column in SHADOW_SCALED_COLUMNS else f'{column} INTEGER' for column in ROLLUP_METRIC_COLUMNS)},
+        {', '.join(f'{metric}_days INTEGER' for metric in AVERAGED_METRICS)},
+        PRIMARY KEY (video_id, period_day)
+    ) WITHOUT ROWID
+'''
+
+FILL_ROLLUP_QUERY = f'''
+    INSERT INTO {{table}} (video_id, period_day, days, {ROLLUP_COLUMN_LIST})
+    SELECT dp.video_id, {{period}} AS period_day, COUNT(*), {ROLLUP_AGGREGATES}
+    FROM daily_performance dp
+    GROUP BY dp.video_id, period_day
+'''
+
+DELETE_CHANGED_ROLLUP_QUERY = '''
+    DELETE FROM {table}
+    WHERE (video_id, period_day) IN (SELECT DISTINCT video_id, {period} FROM temp.changed_days)
+'''
+
+# Periods left without any daily rows were deleted above and are not inserted again
+REFRESH_ROLLUP_QUERY = f'''
+    INSERT INTO {{table}} (video_id, period_day, days, {ROLLUP_COLUMN_LIST})
+    SELECT dp.video_id, c.period_day, COUNT(*), {ROLLUP_AGGREGATES}
+    FROM (SELECT DISTINCT video_id, {{period}} AS period_day FROM temp.changed_days) c
+    CROSS JOIN daily_performance dp
+    WHERE dp.video_id = c.video_id AND dp.performance_day BETWEEN c.period_day AND {{period_end}}
+    GROUP BY dp.video_id, c.period_day
+'''
+
+# Sums the monthly rollup rows of the staged videos, about 30 times fewer rows than their daily history
+REFRESH_VIDEO_TOTALS_QUERY = '''
+    UPDATE videos
+    SET 
+        total_vv = totals.total_vv,
+        total_likes = totals.total_likes,
+        total_shares = totals.total_shares,
+        total_video_revenue = totals.total_video_revenue
+    FROM (
+        SELECT video_id, SUM(vv) AS total_vv, SUM(likes) AS total_likes,
+            SUM(shares) AS total_shares, SUM(video_revenue) AS total_video_revenue
+        FROM daily_performance_monthly
+        WHERE video_id IN (SELECT video_id FROM temp.staged_video_ids)
+        GROUP BY video_id
+    ) AS totals
+    WHERE videos.video_id = totals.video_id
+'''
+
+# Indexes managed by ensure_indexes, by name. The performance_day index covers the daily views,
+# likes, comments and shares read by the virality calculator, so date range reads never touch the table.
+INDEXES = {
+    'idx_daily_performance_day': 'daily_performance (performance_day, video_id, vv, likes, comments, shares)',
+    'idx_videos_time': 'videos (time)',
+    'idx_shadow_daily_performance_day': 'shadow_daily_performance (day)',
+}
+
+# Full-text index over the searchable text of videos. It reads its content from the videos table by rowid
+# and is kept in step by the triggers below, so it never has to be rebuilt after an upload. Prefixes of
+# two and three characters are indexed so search-as-you-type prefix queries stay cheap.
+VIDEO_SEARCH_COLUMNS = ['video_id', 'video_info', 'creator_name', 'products']
+
+CREATE_VIDEO_SEARCH_QUERY = f'''
+    CREATE VIRTUAL TABLE video_search USING fts5(
+        {', '.join(VIDEO_SEARCH_COLUMNS)},
+        content='videos', content_rowid='rowid', prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+    )
+'''
+
+VIDEO_SEARCH_TRIGGERS = {
+    'videos_search_insert': f'''
+        CREATE TRIGGER IF NOT EXISTS videos_search_insert AFTER INSERT ON videos BEGIN
+            INSERT INTO video_search (rowid, {', '.join(VIDEO_SEARCH_COLUMNS)})
+            VALUES (new.rowid, {', '.join(f'new.{column}' for column in VIDEO_SEARCH_COLUMNS)});
+        END
+    ''',
+    'videos_search_delete': f'''
+        CREATE TRIGGER IF NOT EXISTS videos_search_delete AFTER DELETE ON videos BEGIN
+            INSERT INTO video_search (video_search, rowid, {', '.join(VIDEO_SEARCH_COLUMNS)})
+            VALUES ('delete', old.rowid, {', '.join(f'old.{column}' for column in VIDEO_SEARCH_COLUMNS)});
+        END
+    ''',
+    # Totals, virality and dormancy updates don't touch the indexed text, so they don't fire this trigger
+    'videos_search_update': f'''
+        CREATE TRIGGER IF NOT EXISTS videos_search_update AFTER UPDATE OF {', '.join(VIDEO_SEARCH_COLUMNS)} ON videos
+        WHEN {' OR '.join(f'old.{column} IS NOT new.{column}' for column in VIDEO_SEARCH_COLUMNS)}
+        BEGIN
+            INSERT INTO video_search (video_search, rowid, {', '.join(VIDEO_SEARCH_COLUMNS)})
+            VALUES ('delete', old.rowid, {', '.join(f'old.{column}' for column in VIDEO_SEARCH_COLUMNS)});
+            INSERT INTO video_search (rowid, {', '.join(VIDEO_SEARCH_COLUMNS)})
+            VALUES (new.rowid, {', '.join(f'new.{column}' for column in VIDEO_SEARCH_COLUMNS)});
+        END
+    ''',
+}
+
+# Frequent read queries. They are checked against EXPLAIN QUERY PLAN by query_plans.py, so they must
+# keep using an index as the tables grow.
+CHECK_EXISTING_DATA_QUERY = f"SELECT EXISTS (SELECT 1 FROM daily_performance WHERE performance_day = {day_from_date('?')})"
+
+EXISTING_DATES_QUERY = '''
+    SELECT s.performance_date FROM temp.staged_dates s
+    WHERE EXISTS (SELECT 1 FROM daily_performance dp WHERE dp.performance_day = s.performance_day)
+    ORDER BY s.performance_day
+'''
+
+DATE_VIDEO_IDS_QUERY = f"SELECT video_id FROM daily_performance WHERE performance_day = {day_from_date('?')}"
+
+LATEST_PERFORMANCE_DATE_QUERY = f"SELECT {date_from_day('MAX(performance_day)')} FROM daily_performance"
+
+# Temp tables have no statistics, so CROSS JOIN keeps the staged batch as the outer loop
+# instead of letting the planner scan the whole videos table
+TRACKED_VIDEOS_QUERY = '''
+    SELECT s.video_id, v.dormant FROM temp.staged_video_ids s
+    CROSS JOIN videos v ON v.video_id = s.video_id
+'''
+
+UNCHANGED_VIDEOS_QUERY = '''
+    SELECT s.video_id FROM temp.staged_video_hashes s
+    CROSS JOIN videos v ON v.video_id = s.video_id AND v.meta_hash = s.meta_hash
+'''
+
+STAGED_ROW_OUTCOMES_QUERY = '''
+    SELECT s.video_id, dp.video_id IS NOT NULL
+    FROM temp.staged_daily_performance s
+    LEFT JOIN daily_performance dp ON dp.video_id = s.video_id AND dp.performance_day = s.performance_day
+    WHERE EXISTS (SELECT 1 FROM videos v WHERE v.video_id = s.video_id)
+'''
+
+# The totals are kept up to date by refresh_video_totals, so listing the videos doesn't aggregate daily_performance
+ALL_VIDEOS_QUERY = '''
+    SELECT v.video_id, v.video_info, v.time, v.creator_name, v.products,
+        v.total_vv, v.total_shares, ROUND(v.total_video_revenue, 2) as total_video_revenue
+    FROM videos v
+    ORDER BY v.time DESC
+'''
+
+# Matches come from the full-text index, best bm25 score first, and only the matching videos are read
+SEARCH_VIDEOS_QUERY = '''
+    SELECT v.video_id, v.video_info, v.time, v.creator_name, v.products,
+        v.total_vv, v.total_shares, ROUND(v.total_video_revenue, 2) as total_video_revenue
+    FROM video_search s
+    CROSS JOIN videos v ON v.rowid = s.rowid
+    WHERE video_search MATCH ?
+    ORDER BY bm25(video_search), v.total_vv DESC
+'''
+
+# Used when the sqlite build has no FTS5
+SEARCH_VIDEOS_LIKE_QUERY = '''
+    SELECT v.video_id, v.video_info, v.time, v.creator_name, v.products,
+        v.total_vv, v.total_shares, ROUND(v.total_video_revenue, 2) as total_video_revenue
+    FROM videos v
+    WHERE v.video_info LIKE ?1 OR v.video_id LIKE ?1 OR v.creator_name LIKE ?1 OR v.products LIKE ?1
+    ORDER BY v.total_vv DESC
+'''
+
+VIDEO_DETAILS_QUERY = f'''
+    SELECT v.video_id, v.video_info, v.time, v.creator_name, v.products,
+        SUM(dp.vv) as total_vv, SUM(dp.likes) as total_likes,
+        SUM(dp.comments) as total_comments, SUM(dp.shares) as total_shares,
+        SUM(dp.new_followers) as total_new_followers,
+        SUM(dp.video_revenue) as total_video_revenue,
+        {date_from_day('MAX(dp.performance_day)')} as latest_performance_date
+    FROM videos v
+    LEFT JOIN daily_performance dp ON v.video_id = dp.video_id
+    WHERE v.video_id = ?
+    GROUP BY v.video_id
+'''
+
+# Formatted by time_series_query with the table, its period column and the metric's value expression
+TIME_SERIES_QUERY = '''
+    SELECT {period}, {value}
+    FROM {table}
+    WHERE video_id = ?
+    ORDER BY {period}
+'''
+
+VIDEOS_BY_DATE_QUERY = f'''
+    SELECT
+        video_id,
+        vv as views,
+        shares,
+        comments,
+        video_revenue as gmv,
+        ctr,
+        ctor,
+        video_finish_rate as finish_rate
+    FROM daily_performance
+    WHERE performance_day = {day_from_date('?')}
+    ORDER BY views DESC
+'''
+
+def rollup_query(template, table):
+    """
+    Fill in a rollup query template for one of the ROLLUP_TABLES.
+
+    Args:
+        template (str): The query template, with {table}, {period} and {period_end} fields.
+        table (str): The rollup table.
+
+    Returns:
+        str: The query.
+    """
+    period, period_end = ROLLUP_TABLES[table]
+    return template.format(table=table, period=period.format(day='performance_day'),
+                           period_end=period_end.format(period='c.period_day'))
+
+def rollup_table(timeframe, week_start='Sunday'):
+    """
+    Return the rollup table holding a timeframe.
+
+    Args:
+        timeframe (str): 'Daily', 'Weekly' or 'Monthly'.
+        week_start (str): 'Sunday' or 'Monday', for weekly periods.
+
+    Returns:
+        str: The rollup table, or None for daily data, which is read from daily_performance.
+    """
+    if timeframe == 'Weekly':
+        return 'daily_performance_weekly_sun' if week_start == 'Sunday' else 'daily_performance_weekly_mon'
+    if timeframe == 'Monthly':
+        return 'daily_performance_monthly'
+    return None
+
+def time_series_query(metric, timeframe='Daily', week_start='Sunday'):
+    """
+    Build the query reading a metric of a video per period. Ratio metrics are computed from the summed
+    numerator and denominator, the averaged rate metrics as the mean of the days that have a value, and
+    every other metric as the sum over the period.
+
+    Args:
+        metric (str): The daily_performance metric column.
+        timeframe (str): 'Daily', 'Weekly' or 'Monthly'.
+        week_start (str): 'Sunday' or 'Monday', for weekly periods.
+
+    Returns:
+        str: The query, taking the video ID as its parameter and returning (day number, value) rows in period order.
+    """
+    table = rollup_table(timeframe, week_start)
+    if metric in RATIO_METRICS:
+        numerator, denominator = RATIO_METRICS[metric]
+        value = f"CASE WHEN {denominator} != 0 THEN COALESCE({numerator}, 0) * 100.0 / {denominator} END"
+    elif metric in AVERAGED_METRICS:
+        value = f"{metric} * 1.0 / {metric}_days" if table else metric
+    elif metric in ROLLUP_METRIC_COLUMNS:
+        value = f"COALESCE({metric}, 0)"
+    else:
+        raise ValueError(f"Unknown metric: {metric}")
+    return TIME_SERIES_QUERY.format(period='period_day' if table else 'performance_day', value=value,
+                                    table=table or 'daily_performance')
+
+def search_expression(query):
+    """
+    Turn a search box query into an FTS5 match expression. Text in double quotes is matched as a phrase,
+    and every other word as a prefix, so partial words and IDs match while typing. All parts must match.
+
+    Args:
+        query (str): The text typed by the user.
+
+    Returns:
+        str: The match expression, or an empty string if the query has no words.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+        # Quotes inside a term are doubled so user input can't change the expression's syntax
+        if phrase.strip():
+            terms.append('"' + phrase.replace('"', '""') + '"')
+        elif word.strip('"'):
+            terms.append('"' + word.strip('"').replace('"', '""') + '"*')
+    return ' '.join(terms)
+
 class DataManager:
-    def __init__(self):
-        self.conn = sqlite3.connect(DATABASE_FILE)
+    def __init__(self, database_file=DATABASE_FILE):
+        self.database_file = database_file
+        # Writes go through the writer connection. Queries for the GUI borrow a reader connection, so they
+        # keep working while an ingestion or virality job writes from another DataManager.
+        self.connections = ConnectionManager(self.database_file)
+        self.conn = self.connections.writer
         self.create_tables()
         self.migrate_database()
+        self.ensure_indexes()
+        self.ensure_search_index()
+        self.ensure_rollups()
         self.load_settings() # Load all settings
+        self.ensure_dormancy()
         # Add column mapping dictionary. Needed to address changes in the TikTok export file.
         self.column_mapping = {
             'Buyers': 'customers',  # Old name to new database column
             'Customers': 'customers',  # New name to new database column
         }
+        self.parse_cache = ParseCache(PARSE_CACHE_DIR, self.column_mapping)
 
     def load_settings(self):
         try:
             with open(SETTINGS_FILE, 'r') as f:
                 settings = json.load(f)
-                self.vv_threshold = settings.get('vv_threshold', 4000)
-                self.week_start = settings.get('week_start', 'Sunday')
         except FileNotFoundError:
-            # If the file doesn't exist, return default settings
-            self.vv_threshold = 4000
-            self.week_start = 'Sunday'
+            # If the file doesn't exist, use default settings
+            settings = {}
+        self.vv_threshold = settings.get('vv_threshold', 4000)
+        self.week_start = settings.get('week_start', 'Sunday')
+        self.backup_compression = settings.get('backup_compression', 'gzip')
+        self.backup_keep_last = settings.get('backup_keep_last', 10)
+        self.backup_keep_daily = settings.get('backup_keep_daily', 7)
+        self.backup_keep_weekly = settings.get('backup_keep_weekly', 4)
+        self.watch_folder = settings.get('watch_folder', None)
+        self.shadow_ttl_days = settings.get('shadow_ttl_days', 90)
+        self.dormancy_vv = settings.get('dormancy_vv', 4000)
+        self.dormancy_days = settings.get('dormancy_days', 14)
+        self.backup_manager = BackupManager(DB_BACKUP_DIR, self.backup_compression, self.backup_keep_last,
+                                            self.backup_keep_daily, self.backup_keep_weekly)
 
     def save_settings(self):
         settings = {
             'vv_threshold': self.vv_threshold,
-            'week_start': self.week_start
+            'week_start': self.week_start,
+            'backup_compression': self.backup_compression,
+            'backup_keep_last': self.backup_keep_last,
+            'backup_keep_daily': self.backup_keep_daily,
+            'backup_keep_weekly': self.backup_keep_weekly,
+            'watch_folder': self.watch_folder,
+            'shadow_ttl_days': self.shadow_ttl_days,
+            'dormancy_vv': self.dormancy_vv,
+            'dormancy_days': self.dormancy_days
         }
         with open(SETTINGS_FILE, 'w') as f:
             json.dump(settings, f)
@@ -58,18 +586,18 @@ class DataManager:
         self.save_settings()
 
     def backup_database(self):
-        # Generate backup filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_filename = f"tiktok_tracker_backup_{timestamp}.db"
-        backup_path = os.path.join(DB_BACKUP_DIR, backup_filename)
+        """
+        Take a compressed snapshot of the database. The snapshot is skipped if nothing changed
+        since the previous one, and old backups are pruned according to the retention settings.
+        Call this once per user operation that modifies data.
 
+        Returns:
+            str: The path of the new backup, or None if the snapshot was skipped.
+        """
         try:
-            # Create a new connection to the backup database
-            backup_conn = sqlite3.connect(backup_path)
-            with backup_conn:
-                self.conn.backup(backup_conn)
-            backup_conn.close()
-            logging.info(f"Database backed up to {backup_path}")
+            # Snapshot from a reader so the backup sees the last committed data without holding the writer
+            with self.connections.reader() as conn:
+                return self.backup_manager.snapshot(conn)
         except Exception as e:
             logging.error(f"Error backing up database: {str(e)}")
             raise
@@ -91,38 +619,90 @@ class DataManager:
                 total_vv INTEGER DEFAULT 0,
                 total_likes INTEGER DEFAULT 0,
                 total_shares INTEGER DEFAULT 0,
-                total_video_revenue REAL DEFAULT 0
+                total_video_revenue REAL DEFAULT 0,
+                meta_hash INTEGER,
+                dormant INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute(CREATE_DAILY_PERFORMANCE_QUERY.format(table='daily_performance'))
+        # Shadow store for sub-threshold rows, promoted into daily_performance when a video is first tracked
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS shadow_videos (
+                video_key INTEGER PRIMARY KEY,
+                video_id TEXT NOT NULL UNIQUE
+            )
+        ''')
+        cursor.execute(CREATE_SHADOW_DAILY_PERFORMANCE_QUERY)
+        # The dormancy settings the dormant flags were last computed with, so ensure_dormancy can tell when they change
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS dormancy_settings (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                dormancy_days INTEGER,
+                dormancy_vv INTEGER
             )
         ''')
+        # Ledger of export files ingested by the folder watcher, so restarts don't re-ingest them
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS daily_performance (
+            CREATE TABLE IF NOT EXISTS ingested_files (
+                file_path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime_ns INTEGER,
+                performance_date TEXT,
+                status TEXT,
+                ingested_at TEXT
+            )
+        ''')
+        # Ingestion run ledger: one row per upload batch and one per file in it, with the time spent in each stage
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ingest_runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at TEXT,
+                source TEXT,
+                files INTEGER,
+                files_processed INTEGER,
+                files_failed INTEGER,
+                rows_read INTEGER,
+                rows_written INTEGER,
+                backup_seconds REAL,
+                preflight_seconds REAL,
+                virality_seconds REAL,
+                total_seconds REAL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ingest_run_files (
+                run_id INTEGER,
+                file_path TEXT,
+                file_size INTEGER,
+                file_mtime_ns INTEGER,
+                file_sha256 TEXT,
+                performance_date TEXT,
+                status TEXT,
+                rows_read INTEGER,
+                rows_filtered INTEGER,
+                rows_inserted INTEGER,
+                rows_updated INTEGER,
+                rows_unchanged INTEGER,
+                rows_deleted INTEGER,
+                rows_dormant INTEGER,
+                parse_seconds REAL,
+                clean_seconds REAL,
+                filter_seconds REAL,
+                write_seconds REAL,
+                totals_seconds REAL,
+                PRIMARY KEY (run_id, file_path),
+                FOREIGN KEY (run_id) REFERENCES ingest_runs(run_id)
+            )
+        ''')
+        # The rows each file had skipped as dormant, so verification doesn't depend on the current dormant flags
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ingest_run_dormant_rows (
+                run_id INTEGER,
+                file_path TEXT,
                 video_id TEXT,
                 performance_date TEXT,
-                vv INTEGER,
-                likes INTEGER,
-                comments INTEGER,
-                shares INTEGER,
-                new_followers INTEGER,
-                v_to_l_clicks INTEGER,
-                product_impressions INTEGER,
-                product_clicks INTEGER,
-                customers INTEGER,
-                orders INTEGER,
-                unit_sales INTEGER,
-                video_revenue REAL,
-                gpm REAL,
-                shoppable_video_attributed_gmv REAL,
-                ctr REAL,
-                v_to_l_rate REAL,
-                video_finish_rate REAL,
-                ctor REAL,
-                dgr REAL,
-                er REAL,
-                egr REAL,
-                trending_score REAL,
-                momentum REAL,
-                PRIMARY KEY (video_id, performance_date),
-                FOREIGN KEY (video_id) REFERENCES videos(video_id)
+                PRIMARY KEY (run_id, file_path, video_id, performance_date),
+                FOREIGN KEY (run_id, file_path) REFERENCES ingest_run_files(run_id, file_path)
             )
         ''')
         self.conn.commit()
@@ -138,21 +718,167 @@ class DataManager:
                 # Add video_info column
                 cursor.execute("ALTER TABLE videos ADD COLUMN video_info TEXT")
                 logging.info("Added video_info column to videos table")
+
+            # Content hashes used to skip unchanged rows on re-ingest
+            if 'meta_hash' not in columns:
+                cursor.execute("ALTER TABLE videos ADD COLUMN meta_hash INTEGER")
+                logging.info("Added meta_hash column to videos table")
+            # Dormancy flag used to stop ingesting videos that have stopped performing
+            if 'dormant' not in columns:
+                cursor.execute("ALTER TABLE videos ADD COLUMN dormant INTEGER NOT NULL DEFAULT 0")
+                logging.info("Added dormant column to videos table")
+            cursor.execute("PRAGMA table_info(daily_performance)")
+            if 'row_hash' not in [column[1] for column in cursor.fetchall()]:
+                cursor.execute("ALTER TABLE daily_performance ADD COLUMN row_hash INTEGER")
+                logging.info("Added row_hash column to daily_performance table")
+            cursor.execute("PRAGMA table_info(shadow_daily_performance)")
+            if 'row_hash' not in [column[1] for column in cursor.fetchall()]:
+                cursor.execute("ALTER TABLE shadow_daily_performance ADD COLUMN row_hash INTEGER")
+                logging.info("Added row_hash column to shadow_daily_performance table")
+            cursor.execute("PRAGMA table_info(ingest_run_files)")
+            if 'rows_dormant' not in [column[1] for column in cursor.fetchall()]:
+                cursor.execute("ALTER TABLE ingest_run_files ADD COLUMN rows_dormant INTEGER")
+                logging.info("Added rows_dormant column to ingest_run_files table")
+            # Day numbers replace the date strings as the key. The primary key changes with them, so the table
+            # is rebuilt once, and ensure_indexes recreates its indexes afterwards.
+            cursor.execute("PRAGMA table_info(daily_performance)")
+            daily_columns = [column[1] for column in cursor.fetchall()]
+            if 'performance_day' not in daily_columns:
+                if not self.conn.in_transaction:
+                    cursor.execute("BEGIN TRANSACTION")
+                cursor.execute("DROP TABLE IF EXISTS daily_performance_new")
+                cursor.execute(CREATE_DAILY_PERFORMANCE_QUERY.format(table='daily_performance_new'))
+                # Rows whose date can't be converted to a day number are moved to daily_performance_unmigrated
+                # instead of failing the whole copy, so they can be inspected and fixed by hand
+                cursor.execute("SELECT COUNT(*) FROM daily_performance WHERE julianday(performance_date) IS NULL")
+                invalid = cursor.fetchone()[0]
+                if invalid:
+                    cursor.execute("DROP TABLE IF EXISTS daily_performance_unmigrated")
+                    cursor.execute('''
+                        CREATE TABLE daily_performance_unmigrated AS
+                        SELECT * FROM daily_performance WHERE julianday(performance_date) IS NULL
+                    ''')
+                    logging.warning(f"Moved {invalid} daily_performance rows with a missing or invalid performance_date "
+                                    f"to the daily_performance_unmigrated table")
+                cursor.execute(f'''
+                    INSERT INTO daily_performance_new ({', '.join(daily_columns)}, performance_day)
+                    SELECT {', '.join(daily_columns)}, {day_from_date('performance_date')}
+                    FROM daily_performance
+                    WHERE julianday(performance_date) IS NOT NULL
+                ''')
+                migrated = cursor.rowcount
+                cursor.execute("DROP TABLE daily_performance")
+                cursor.execute("ALTER TABLE daily_performance_new RENAME TO daily_performance")
+                logging.info(f"Added performance_day column to daily_performance table for {migrated} rows")
             
             self.conn.commit()
         except Exception as e:
+            # The rest of the app expects the migrated schema, so a failed migration stops it from starting
             logging.error(f"Error migrating database: {str(e)}")
             self.conn.rollback()
+            raise
 
-    def read_video_performance_excel(self, file_path):
+    def ensure_indexes(self):
+        """
+        Create the indexes in INDEXES that are missing, rebuild the ones whose definition changed and drop
+        managed indexes that are no longer listed. The tables are analysed after any change so the query
+        planner has statistics for the new indexes.
+        """
+        cursor = self.conn.cursor()
         try:
-            # Read the date range from cell A1
-            date_range = pd.read_excel(file_path, header=None, nrows=1).iloc[0, 0]
-            performance_date = self.extract_date_from_range(date_range)
+            cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx\\_%' ESCAPE '\\'")
+            existing = dict(cursor.fetchall())
+            changed = False
+            for name in existing.keys() - INDEXES.keys():
+                cursor.execute(f"DROP INDEX {name}")
+                logging.info(f"Dropped index {name}")
+                changed = True
+            for name, definition in INDEXES.items():
+                create_query = f"CREATE INDEX {name} ON {definition}"
+                if existing.get(name) == create_query:
+                    continue
+                if name in existing:
+                    cursor.execute(f"DROP INDEX {name}")
+                cursor.execute(create_query)
+                logging.info(f"{'Rebuilt' if name in existing else 'Created'} index {name}")
+                changed = True
+            if changed:
+                cursor.execute("ANALYZE")
+            self.conn.commit()
+        except Exception as e:
+            logging.error(f"Error updating indexes: {str(e)}")
+            self.conn.rollback()
 
-            # Read the actual data starting from row 3
-            df = pd.read_excel(file_path, header=2)
-            df['performance_date'] = performance_date
+    def ensure_search_index(self):
+        """
+        Create the video_search full-text index and its triggers if they don't exist, filling the index from
+        the videos table when it is new. If the sqlite build has no FTS5, searches fall back to LIKE matching.
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'video_search'")
+            if not cursor.fetchone():
+                cursor.execute(CREATE_VIDEO_SEARCH_QUERY)
+                cursor.execute("INSERT INTO video_search (video_search) VALUES ('rebuild')")
+                logging.info("Created the video search index")
+            for trigger in VIDEO_SEARCH_TRIGGERS.values():
+                cursor.execute(trigger)
+            self.conn.commit()
+            self.search_index = True
+        except sqlite3.OperationalError as e:
+            logging.warning(f"Full-text search is unavailable, searches will use LIKE matching: {str(e)}")
+            self.conn.rollback()
+            self.search_index = False
+
+    def ensure_rollups(self):
+        """
+        Create the weekly and monthly rollup tables that don't exist yet and fill them from daily_performance.
+        Tables from an older layout, keyed by period strings, are rebuilt. After that they are kept up to date
+        by refresh_rollups on every write.
+        """
+        cursor = self.conn.cursor()
+        try:
+            for table in ROLLUP_TABLES:
+                cursor.execute(f"PRAGMA table_info({table})")
+                columns = [column[1] for column in cursor.fetchall()]
+                if 'period_day' in columns:
+                    continue
+                if columns:
+                    cursor.execute(f"DROP TABLE {table}")
+                cursor.execute(rollup_query(CREATE_ROLLUP_QUERY, table))
+                cursor.execute(rollup_query(FILL_ROLLUP_QUERY, table))
+                logging.info(f"Built rollup table {table} with {cursor.rowcount} rows")
+            self.conn.commit()
+        except Exception as e:
+            logging.error(f"Error building rollup tables: {str(e)}")
+            self.conn.rollback()
+            raise
+
+    def ensure_dormancy(self):
+        """
+        Recompute the dormant flag of every video when dormancy_days or dormancy_vv differ from the settings
+        the flags were last computed with, so changing or disabling dormancy takes effect at the next start.
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SELECT dormancy_days, dormancy_vv FROM dormancy_settings")
+            if cursor.fetchone() == (self.dormancy_days, self.dormancy_vv):
+                return
+            self.stage_video_ids(cursor, [])
+            cursor.execute("INSERT INTO temp.staged_video_ids (video_id) SELECT video_id FROM videos")
+            self.refresh_dormancy(cursor)
+            cursor.execute("INSERT OR REPLACE INTO dormancy_settings (id, dormancy_days, dormancy_vv) VALUES (1, ?, ?)",
+                           (self.dormancy_days, self.dormancy_vv))
+            self.conn.commit()
+            logging.info(f"Recomputed the dormant flags for dormancy_days={self.dormancy_days}, dormancy_vv={self.dormancy_vv}")
+        except sqlite3.Error as e:
+            logging.error(f"Error recomputing dormant flags: {str(e)}")
+            self.conn.rollback()
+            raise
+    def read_video_performance_excel(self, file_path):
+        try:
+            # Read the date range, header and data in a single pass, or load them from the parse cache
+            df = self.parse_cache.read(file_path)
             logging.info(f"Successfully read Excel file: {file_path}")
             logging.debug(f"Columns in the Excel file: {df.columns.tolist()}")
             return df
@@ -164,158 +890,406 @@ class DataManager:
             raise
 
     def extract_date_from_range(self, date_range):
-        match = re.search(r'\[Date Range\]: (\d{4}-\d{2}-\d{2}) ~ (\d{4}-\d{2}-\d{2})', date_range)
-        if match:
-            start_date, end_date = match.groups()
-            if start_date != end_date:
-                raise ValueError("Data spans more than one day. Please provide data for a single day only.")
-            return start_date
-        else:
-            raise ValueError("Could not extract date from range string")
+        return extract_date_from_range(date_range)
 
     def filter_videos(self, df):
+        """
+        Keep the rows that reach the VV threshold or belong to a video that is already tracked.
+
+        Only the IDs of the rows below the threshold are checked against the database, by staging
+        them in a temp table and joining it to the videos primary key, so the cost grows with the
+        file rather than with the catalogue. The dormant flag is read in the same lookup: rows of
+        dormant videos are skipped unless they reach dormancy_vv again, which reactivates the video.
+
+        Args:
+            df (DataFrame): The export data.
+
+        Returns:
+            DataFrame: The rows to ingest, with the number of rows skipped as dormant in
+                       attrs['dormant_rows_skipped'] and their (video_id, performance_date) pairs
+                       in attrs['dormant_rows'].
+        """
         # Ensure 'Video ID's in df are strings and stripped of whitespace
         df['Video ID'] = df['Video ID'].astype(str).str.strip()
 
-        # Get all existing video IDs from the database as strings and strip whitespace
-        existing_video_ids = [str(vid).strip() for vid in self.get_existing_video_ids()]
+        above_threshold = (df['VV'] >= self.vv_threshold).fillna(False).astype(bool)
+        cursor = self.conn.cursor()
+        self.stage_video_ids(cursor, df.loc[~above_threshold, 'Video ID'].unique().tolist())
+        cursor.execute(TRACKED_VIDEOS_QUERY)
+        tracked = cursor.fetchall()
+        tracked_video_ids = [video_id for video_id, _ in tracked]
+        # A dormancy_days of 0 disables dormancy, whatever flags are stored
+        dormant_video_ids = [video_id for video_id, dormant in tracked if dormant] if self.dormancy_days else []
+
+        # In multi-day exports, a video that reaches the threshold is tracked from that day on,
+        # just as if the days had been uploaded one at a time
+        first_tracked_date = df['Video ID'].map(df.loc[above_threshold].groupby('Video ID')['performance_date'].min())
+        tracked_in_file = first_tracked_date.notna() & (df['performance_date'] >= first_tracked_date.fillna(df['performance_date']))
+
+        # Dormant videos are only ingested again once they are back above the dormancy VV
+        dormant = (df['Video ID'].isin(dormant_video_ids) & ~tracked_in_file
+                   & ~(df['VV'] >= self.dormancy_vv).fillna(False).astype(bool))
 
         # Filter videos based on VV threshold or if they already exist in the database
-        filtered_df = df[
-            (df['VV'] >= self.vv_threshold) | (df['Video ID'].isin(existing_video_ids))
-        ]
+        filtered_df = df[above_threshold | tracked_in_file | (df['Video ID'].isin(tracked_video_ids) & ~dormant)]
+        filtered_df.attrs['dormant_rows_skipped'] = int(dormant.sum())
+        filtered_df.attrs['dormant_rows'] = list(df.loc[dormant, ['Video ID', 'performance_date']].itertuples(index=False, name=None))
 
-        # Log the filtered video IDs
-        logging.info(f"Filtered Video IDs: {filtered_df['Video ID'].tolist()}")
+        logging.info(f"Kept {len(filtered_df)} of {len(df)} rows: {int(above_threshold.sum())} above the VV threshold, "
+                     f"{len(filtered_df) - int(above_threshold.sum())} for tracked videos, {int(dormant.sum())} skipped as dormant")
 
         return filtered_df
 
-    def get_existing_video_ids(self):
-        cursor = self.conn.cursor()
-        try:
-            cursor.execute("SELECT video_id FROM videos")
-            video_ids = [str(row[0]).strip() for row in cursor.fetchall()]
-            return video_ids
-        except Exception as e:
-            logging.error(f"Error getting existing video IDs: {str(e)}")
-            return []
-
-    def insert_or_update_records(self, df):
-        cursor = self.conn.cursor()
-        try:
-            # Clean the percentage fields
-            df = self.clean_percentage_fields(df)
+    def insert_or_update_records(self, df, progress_callback=None, shadow_df=None):
+        """
+        Insert or update video and daily performance records in bulk.
 
-            # Map column names if they exist
-            buyers_column = next((col for col in ['Customers', 'Buyers'] if col in df.columns), None)
-            if not buyers_column:
-                raise ValueError("Neither 'Customers' nor 'Buyers' column found in the data")
+        The rows are staged and compared with the stored rows by content hash, so only new and
+        changed rows are written, with batched UPSERTs inside a single transaction.
+        New videos are only inserted if they meet the VV threshold, while videos that
+        already exist are always updated.
 
-            for _, row in df.iterrows():
-                # Check if the video already exists
-                cursor.execute("SELECT 1 FROM videos WHERE video_id = ?", (row['Video ID'],))
-                video_exists = cursor.fetchone() is not None
+        Args:
+            df (DataFrame): The filtered video performance data.
+            progress_callback (callable): Called as progress_callback(rows_staged, total_rows)
+                                          after each chunk of daily performance rows.
+            shadow_df (DataFrame): The rows below the threshold that filter_videos left out, for the shadow store.
 
-                if video_exists:
-                    # Update existing video
-                    cursor.execute('''
-                        UPDATE videos 
-                        SET video_info = ?, time = ?, creator_name = ?, products = ?
-                        WHERE video_id = ?
-                    ''', (row['Video Info'], row['Time'], row['Creator name'], row['Products'], row['Video ID']))
-                else:
-                    # Insert new video only if VV >= Settings VV threshold
-                    if row['VV'] >= self.vv_threshold:
-                        cursor.execute('''
-                            INSERT INTO videos (video_id, video_info, time, creator_name, products)
-                            VALUES (?, ?, ?, ?, ?)
-                        ''', (row['Video ID'], row['Video Info'], row['Time'], row['Creator name'], row['Products']))
-                    else:
-                        continue  # Skip this video if it's new and has less than Settings VV threshold
-
-                # Always insert or update daily performance for existing videos
-                if video_exists or row['VV'] >= self.vv_threshold:
-                    cursor.execute('''
-                        INSERT OR REPLACE INTO daily_performance 
-                        (video_id, performance_date, vv, likes, comments, shares, new_followers, 
-                        v_to_l_clicks, product_impressions, product_clicks, customers, orders, 
-                        unit_sales, video_revenue, gpm, shoppable_video_attributed_gmv, ctr, 
-                        v_to_l_rate, video_finish_rate, ctor)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (row['Video ID'], row['performance_date'], row['VV'], row['Likes'], 
-                          row['Comments'], row['Shares'], row['New followers'], row['V-to-L clicks'],
-                          row['Product Impressions'], row['Product Clicks'], row[buyers_column], 
-                          row['Orders'], row['Unit Sales'], row['Video Revenue ($)'], 
-                          row['GPM ($)'], row['Shoppable video attributed GMV ($)'], 
-                          row['CTR'], row['V-to-L rate'], row['Video Finish Rate'], row['CTOR']))
-                    
-                    # Update the video totals metrics in the videos table after inserting/updating daily performance
-                    self.update_video_table_totals(row['Video ID'])
+        Returns:
+            dict: The write summary, as described in apply_staged_daily_performance.
+        """
+        cursor = self.conn.cursor()
+        try:
+            promoted = self.write_videos(cursor, df, shadow_df)
+            self.stage_daily_performance(cursor, df, progress_callback)
+            summary = self.apply_staged_daily_performance(cursor, promoted=promoted)
 
+            # Update the video totals metrics for the videos whose data changed
+            totals_start = time.perf_counter()
+            self.refresh_video_totals(summary['video_ids'])
+            summary['totals_seconds'] = time.perf_counter() - totals_start
             self.conn.commit()
-            logging.info(f"Successfully inserted or updated {len(df)} records")
-            self.backup_database()
-            logging.info("Data backed up successfully")
+
+            logging.info(f"Successfully wrote {len(df)} records: {summary['inserted']} inserted, "
+                         f"{summary['updated']} updated, {summary['unchanged']} unchanged")
+            return summary
         except Exception as e:
             logging.error(f"Error inserting or updating records: {str(e)}")
             self.conn.rollback()
             raise
 
+    def daily_performance_export_columns(self, df):
+        """
+        Return the export column each daily_performance column is read from, in DAILY_PERFORMANCE_COLUMNS order.
+
+        Args:
+            df (DataFrame): The video performance data.
+
+        Returns:
+            list: The export column names.
+        """
+        # Map column names if they exist
+        buyers_column = next((col for col in ['Customers', 'Buyers'] if col in df.columns), None)
+        if not buyers_column:
+            raise ValueError("Neither 'Customers' nor 'Buyers' column found in the data")
+        return [export_column or buyers_column for _, export_column in DAILY_PERFORMANCE_COLUMNS]
+
+    def write_video_metadata(self, cursor, df):
+        """
+        Insert or update the videos table rows for a batch of performance data. Does not commit.
+
+        Videos whose stored metadata hash matches the incoming metadata are not rewritten.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor to execute on.
+            df (DataFrame): The filtered video performance data.
+
+        Returns:
+            list: The IDs of the videos that were not tracked before and are inserted now.
+        """
+        # A video qualifies for insertion if any of its rows reaches the threshold. In multi-day
+        # exports, the metadata of its latest row is kept.
+        above_threshold = (df['VV'] >= self.vv_threshold).fillna(False).astype(bool)
+        videos = df[VIDEO_METADATA_COLUMNS].assign(
+            qualifies=above_threshold.groupby(df['Video ID']).transform('any')
+        ).drop_duplicates('Video ID', keep='last')
+        videos['meta_hash'] = self.content_hash(videos, VIDEO_METADATA_COLUMNS)
+
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS staged_video_hashes (video_id TEXT PRIMARY KEY, meta_hash INTEGER)")
+        cursor.execute("DELETE FROM temp.staged_video_hashes")
+        self.executemany_in_chunks(cursor, "INSERT INTO temp.staged_video_hashes (video_id, meta_hash) VALUES (?, ?)",
+                                   self.frame_to_records(videos, ['Video ID', 'meta_hash']))
+        cursor.execute(UNCHANGED_VIDEOS_QUERY)
+        unchanged_video_ids = [row[0] for row in cursor.fetchall()]
+        videos = videos[~videos['Video ID'].isin(unchanged_video_ids)]
+        cursor.execute('''
+            SELECT s.video_id FROM temp.staged_video_hashes s
+            WHERE NOT EXISTS (SELECT 1 FROM videos v WHERE v.video_id = s.video_id)
+        ''')
+        untracked_video_ids = [row[0] for row in cursor.fetchall()]
+
+        columns = VIDEO_METADATA_COLUMNS + ['meta_hash']
+        # Videos at or above the threshold are inserted, or updated if they already exist
+        self.executemany_in_chunks(cursor, UPSERT_VIDEO_QUERY, self.frame_to_records(videos[videos['qualifies']], columns))
+        # Videos below the threshold are only updated if they are already tracked
+        self.executemany_in_chunks(cursor, UPDATE_VIDEO_QUERY, self.frame_to_records(videos[~videos['qualifies']], columns))
+        return videos.loc[videos['qualifies'] & videos['Video ID'].isin(untracked_video_ids), 'Video ID'].tolist()
+
+    def write_videos(self, cursor, df, shadow_df=None, replace_dates=()):
+        """
+        Write the sub-threshold rows to the shadow store, then the videos metadata, then promote the
+        shadow history of the videos that are tracked for the first time. Does not commit.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor to execute on.
+            df (DataFrame): The filtered video performance data.
+            shadow_df (DataFrame): The rows filter_videos left out, if any.
+            replace_dates (list): Dates whose stored shadow rows are replaced by the new ones.
+
+        Returns:
+            int: The number of shadow rows promoted into daily_performance.
+        """
+        if shadow_df is not None:
+            self.write_shadow_rows(cursor, shadow_df, replace_dates)
+        new_video_ids = self.write_video_metadata(cursor, df)
+        return self.promote_shadow_history(cursor, new_video_ids)
+
+    def write_shadow_rows(self, cursor, shadow_df, replace_dates=()):
+        """
+        Store sub-threshold rows in the shadow store and prune the rows older than the TTL. Does not commit.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor to execute on.
+            shadow_df (DataFrame): The rows filter_videos left out.
+            replace_dates (list): Dates whose stored shadow rows are deleted first.
+        """
+        for date in replace_dates:
+            cursor.execute(f"DELETE FROM shadow_daily_performance WHERE day = {day_from_date('?')}",
+                           (date,))
+        # Rows of tracked videos, such as those skipped as dormant, are not shadowed
+        self.stage_video_ids(cursor, shadow_df['Video ID'].unique().tolist())
+        cursor.execute("SELECT video_id FROM videos WHERE video_id IN (SELECT video_id FROM temp.staged_video_ids)")
+        shadow_df = shadow_df[~shadow_df['Video ID'].isin([row[0] for row in cursor.fetchall()])]
+        if shadow_df.empty:
+            return
+
+        self.executemany_in_chunks(cursor, "INSERT OR IGNORE INTO shadow_videos (video_id) VALUES (?)",
+                                   [(video_id,) for video_id in shadow_df['Video ID'].unique().tolist()])
+        daily_columns = self.daily_performance_export_columns(shadow_df)
+        shadow_df = shadow_df.assign(row_hash=self.content_hash(shadow_df, daily_columns[2:]))
+        self.executemany_in_chunks(cursor, UPSERT_SHADOW_DAILY_PERFORMANCE_QUERY,
+                                   self.frame_to_records(shadow_df, daily_columns + ['row_hash']))
+
+        # Rows are kept for shadow_ttl_days before the newest shadow day, so backfilled history is not pruned on arrival
+        cursor.execute("SELECT MAX(day) FROM shadow_daily_performance")
+        cutoff = cursor.fetchone()[0] - self.shadow_ttl_days
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS pruned_shadow_keys (video_key INTEGER PRIMARY KEY)")
+        cursor.execute("DELETE FROM temp.pruned_shadow_keys")
+        cursor.execute("INSERT OR IGNORE INTO temp.pruned_shadow_keys SELECT video_key FROM shadow_daily_performance WHERE day < ?", (cutoff,))
+        cursor.execute("DELETE FROM shadow_daily_performance WHERE day < ?", (cutoff,))
+        cursor.execute('''
+            DELETE FROM shadow_videos
+            WHERE video_key IN (SELECT video_key FROM temp.pruned_shadow_keys)
+              AND NOT EXISTS (SELECT 1 FROM shadow_daily_performance sd WHERE sd.video_key = shadow_videos.video_key)
+        ''')
+
+    def promote_shadow_history(self, cursor, video_ids):
+        """
+        Move the shadow history of newly tracked videos into daily_performance in bulk. Does not commit.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor to execute on.
+            video_ids (list): The IDs of the videos that are tracked for the first time.
+
+        Returns:
+            int: The number of rows promoted.
+        """
+        if not video_ids:
+            return 0
+        self.stage_video_ids(cursor, video_ids)
+        cursor.execute(PROMOTE_SHADOW_HISTORY_QUERY)
+        promoted = cursor.rowcount
+        if promoted:
+            self.track_changed_days(cursor, '''
+                SELECT video_id, performance_day FROM daily_performance
+                WHERE video_id IN (SELECT video_id FROM temp.staged_video_ids)
+            ''')
+        cursor.execute('''
+            DELETE FROM shadow_daily_performance
+            WHERE video_key IN (
+                SELECT video_key FROM shadow_videos WHERE video_id IN (SELECT video_id FROM temp.staged_video_ids)
+            )
+        ''')
+        cursor.execute("DELETE FROM shadow_videos WHERE video_id IN (SELECT video_id FROM temp.staged_video_ids)")
+        if promoted:
+            logging.info(f"Promoted {promoted} shadow rows for {len(video_ids)} newly tracked videos")
+        return promoted
+
+    def stage_daily_performance(self, cursor, df, progress_callback=None):
+        """
+        Load daily performance rows and their content hashes into temp.staged_daily_performance.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor to execute on.
+            df (DataFrame): The filtered video performance data.
+            progress_callback (callable): Called as progress_callback(rows_staged, total_rows) after each chunk.
+        """
+        daily_columns = self.daily_performance_export_columns(df)
+        staged = df.assign(row_hash=self.content_hash(df, daily_columns[2:]))
+        cursor.execute(CREATE_STAGED_DAILY_PERFORMANCE_QUERY)
+        cursor.execute("DELETE FROM temp.staged_daily_performance")
+        self.executemany_in_chunks(cursor, STAGE_DAILY_PERFORMANCE_QUERY,
+                                   self.frame_to_records(staged, daily_columns + ['row_hash']),
+                                   progress_callback=progress_callback)
+
+    def apply_staged_daily_performance(self, cursor, replace_dates=(), promoted=0):
+        """
+        Write the staged daily performance rows that are new or changed. Does not commit.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor to execute on.
+            replace_dates (list): Dates whose stored rows are replaced by the staged ones. Stored rows
+                                  on these dates that are missing from the staged data are deleted.
+            promoted (int): The number of shadow rows promoted for this write, reported in the summary.
+
+        Returns:
+            dict: The write summary:
+                inserted, updated, unchanged, deleted: Daily performance row counts.
+                promoted: Rows moved from the shadow store for newly tracked videos.
+                video_ids: The IDs of the videos whose daily performance changed.
+                totals_seconds: Time spent refreshing the video totals, set by the write methods.
+        """
+        summary = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0, 'promoted': promoted}
+        changed_video_ids = set()
+        if replace_dates:
+            placeholders = ', '.join(day_from_date('?') for _ in replace_dates)
+            missing_rows = f'''
+                FROM daily_performance
+                WHERE performance_day IN ({placeholders})
+                  AND NOT EXISTS (
+                      SELECT 1 FROM temp.staged_daily_performance s
+                      WHERE s.video_id = daily_performance.video_id AND s.performance_day = daily_performance.performance_day
+                  )
+            '''
+            cursor.execute(f"SELECT DISTINCT video_id {missing_rows}", list(replace_dates))
+            changed_video_ids.update(row[0] for row in cursor.fetchall())
+            self.track_changed_days(cursor, f"SELECT video_id, performance_day {missing_rows}", list(replace_dates))
+            cursor.execute(f"DELETE {missing_rows}", list(replace_dates))
+            summary['deleted'] = cursor.rowcount
+
+        # Rows already stored with the same content are dropped before the write
+        cursor.execute(DROP_UNCHANGED_STAGED_ROWS_QUERY)
+        summary['unchanged'] = cursor.rowcount
+        self.track_changed_days(cursor, "SELECT video_id, performance_day FROM temp.staged_daily_performance")
+
+        cursor.execute(STAGED_ROW_OUTCOMES_QUERY)
+        for video_id, stored in cursor.fetchall():
+            changed_video_ids.add(video_id)
+            summary['updated' if stored else 'inserted'] += 1
+
+        cursor.execute(UPSERT_STAGED_DAILY_PERFORMANCE_QUERY)
+        cursor.execute("DELETE FROM temp.staged_daily_performance")
+        summary['video_ids'] = list(changed_video_ids)
+        return summary
+
+    def content_hash(self, df, columns):
+        """
+        Hash the values of each row in the given columns.
+
+        Args:
+            df (DataFrame): The data to hash.
+            columns (list): The columns to include.
+
+        Returns:
+            ndarray: One 64-bit hash per row, as signed integers so SQLite can store them.
+        """
+        return pd.util.hash_pandas_object(df[columns], index=False).values.view(np.int64)
+
+    def frame_to_records(self, df, columns):
+        """
+        Convert DataFrame columns into a list of row tuples that sqlite3 can bind.
+
+        Values are converted to native Python types and missing values to None.
+
+        Args:
+            df (DataFrame): The data to convert.
+            columns (list): The columns to extract, in parameter order.
+
+        Returns:
+            list: One list of values per row.
+        """
+        frame = df[columns].astype(object)
+        return frame.where(frame.notna(), None).values.tolist()
+
+    def executemany_in_chunks(self, cursor, query, records, chunk_size=BULK_CHUNK_SIZE, progress_callback=None):
+        """
+        Run executemany over the records in fixed-size chunks.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor to execute on.
+            query (str): The parameterised query.
+            records (list): The parameter rows.
+            chunk_size (int): Number of rows per executemany call.
+            progress_callback (callable): Called as progress_callback(rows_done, total_rows) after each chunk.
+        """
+        for start in range(0, len(records), chunk_size):
+            cursor.executemany(query, records[start:start + chunk_size])
+            if progress_callback:
+                progress_callback(min(start + chunk_size, len(records)), len(records))
+
     def search_videos(self, query):
-        cursor = self.conn.cursor()
+        """
+        Search the videos by ID, info, creator and products.
+
+        Words match as prefixes and text in double quotes as a phrase. Results are ranked by relevance,
+        then by total views, with the stored totals of each video.
+
+        Args:
+            query (str): The text typed by the user.
+
+        Returns:
+            list: The matching rows, with the same columns as get_all_videos. Every video for an empty query.
+        """
         try:
-            cursor.execute('''
-                SELECT v.video_id, v.video_info, v.time, v.creator_name, v.products, 
-                    SUM(dp.vv) as total_vv, SUM(dp.shares) as total_shares, 
-                    ROUND(SUM(dp.video_revenue), 2) as total_video_revenue
-                FROM videos v
-                LEFT JOIN daily_performance dp ON v.video_id = dp.video_id
-                WHERE v.video_info LIKE ? OR v.video_id LIKE ? OR v.creator_name LIKE ? OR v.products LIKE ?
-                GROUP BY v.video_id
-                ORDER BY total_vv DESC
-            ''', (f'%{query}%', f'%{query}%', f'%{query}%', f'%{query}%'))
-            return cursor.fetchall()
+            if not self.search_index:
+                with self.connections.reader() as conn:
+                    return conn.execute(SEARCH_VIDEOS_LIKE_QUERY, (f'%{query}%',)).fetchall()
+            expression = search_expression(query)
+            if not expression:
+                return self.get_all_videos()
+            with self.connections.reader() as conn:
+                return conn.execute(SEARCH_VIDEOS_QUERY, (expression,)).fetchall()
         except Exception as e:
             logging.error(f"Error searching videos: {str(e)}")
             raise
 
     def get_video_details(self, video_id):
-        cursor = self.conn.cursor()
         try:
-            cursor.execute('''
-                SELECT v.video_id, v.video_info, v.time, v.creator_name, v.products, 
-                    SUM(dp.vv) as total_vv, SUM(dp.likes) as total_likes, 
-                    SUM(dp.comments) as total_comments, SUM(dp.shares) as total_shares, 
-                    SUM(dp.new_followers) as total_new_followers, 
-                    SUM(dp.video_revenue) as total_video_revenue,
-                    MAX(dp.performance_date) as latest_performance_date
-                FROM videos v
-                LEFT JOIN daily_performance dp ON v.video_id = dp.video_id
-                WHERE v.video_id = ?
-                GROUP BY v.video_id
-            ''', (video_id,))
-            return cursor.fetchone()
+            with self.connections.reader() as conn:
+                return conn.execute(VIDEO_DETAILS_QUERY, (video_id,)).fetchone()
         except Exception as e:
             logging.error(f"Error getting video details: {str(e)}")
             raise
 
     def get_time_series_data(self, video_id, metric, timeframe='Daily', week_start='Sunday'):
-        cursor = self.conn.cursor()
+        """
+        Retrieve a metric of a video per day, week or month. Weekly and monthly data is read from the
+        rollup tables, so every timeframe is a single indexed read.
+
+        Args:
+            video_id (str): The video to read.
+            metric (str): The daily_performance metric column.
+            timeframe (str): 'Daily', 'Weekly' or 'Monthly'.
+            week_start (str): 'Sunday' or 'Monday', for weekly periods.
+
+        Returns:
+            list: (period, value) tuples in period order, with each period as a Timestamp of its first day.
+        """
         try:
-            # Check if the metric is one that requires custom aggregation
-            if metric == 'ctr':
-                return self.aggregate_ctr(video_id, timeframe, week_start)
-            elif metric == 'ctor':
-                return self.aggregate_ctor(video_id, timeframe, week_start)
-            elif metric in ['v_to_l_rate', 'video_finish_rate']:
-                return self.aggregate_simple_average(video_id, metric, timeframe, week_start)
-            
-            # For non-percentage metrics, proceed with standard aggregation
-            df = self.get_aggregation_data(video_id, [metric], timeframe, week_start)
-            
-            # Group by period and sum the metric
-            result = df.groupby('period')[metric].sum().reset_index()
-            return list(result.itertuples(index=False, name=None))
+            with self.connections.reader() as conn:
+                rows = conn.execute(time_series_query(metric, timeframe, week_start), (video_id,)).fetchall()
+            periods = pd.to_datetime([row[0] for row in rows], unit='D')
+            return [(period, np.nan if value is None else value) for period, (_, value) in zip(periods, rows)]
         except Exception as e:
             logging.error(f"Error getting time series data: {str(e)}")
             raise
@@ -326,17 +1300,22 @@ class DataManager:
         try:
             cursor = self.conn.cursor()
             # Check if there's data for the given date
-            cursor.execute("SELECT COUNT(*) FROM daily_performance WHERE performance_date = ?", (date,))
-            count = cursor.fetchone()[0]
-            
-            if count == 0:
+            cursor.execute(CHECK_EXISTING_DATA_QUERY, (date,))
+            if not cursor.fetchone()[0]:
                 return False  # No data for this date
             
             # Perform backup before clearing data
             self.backup_database()
             
-            # Clear data for the given date
-            cursor.execute("DELETE FROM daily_performance WHERE performance_date = ?", (date,))
+            # Clear data for the given date and update the totals of the affected videos
+            cursor.execute(DATE_VIDEO_IDS_QUERY, (date,))
+            affected_video_ids = [row[0] for row in cursor.fetchall()]
+            self.track_changed_days(cursor, f"SELECT video_id, performance_day FROM daily_performance WHERE performance_day = {day_from_date('?')}",
+                                    (date,))
+            cursor.execute(f"DELETE FROM daily_performance WHERE performance_day = {day_from_date('?')}", (date,))
+            cursor.execute(f"DELETE FROM shadow_daily_performance WHERE day = {day_from_date('?')}",
+                           (date,))
+            self.refresh_video_totals(affected_video_ids)
             self.conn.commit()
             logging.info(f"Cleared data for date: {date}")
             return True
@@ -360,19 +1339,38 @@ class DataManager:
             # Try executing a simple query to check if the connection is open
             self.conn.execute('SELECT 1')
         except (AttributeError, sqlite3.ProgrammingError):
-            # If self.conn is None or closed, create a new connection
-            self.conn = sqlite3.connect(DATABASE_FILE)
+            # If self.conn is None or closed, close what is left of the old connections, such as pooled
+            # readers, and open new ones
+            if getattr(self, 'connections', None) is not None:
+                self.connections.close()
+            self.connections = ConnectionManager(self.database_file)
+            self.conn = self.connections.writer
+
+    def close(self):
+        """
+        Close the writer and reader connections, folding the write-ahead log back into the database file.
+        """
+        self.connections.close()
 
     def restore_database(self, backup_path):
         try:
-            # Close the current connection
-            self.conn.close()
+            # Close the current connections. This checkpoints the write-ahead log, so no stale log pages
+            # are applied on top of the restored file.
+            self.close()
             
             # Replace the current database with the backup
-            shutil.copy2(backup_path, DATABASE_FILE)
+            self.backup_manager.restore(backup_path, self.database_file)
             
-            # Reopen the connection
-            self.conn = sqlite3.connect(DATABASE_FILE)
+            # Reopen the connections
+            self.connections = ConnectionManager(self.database_file)
+            self.conn = self.connections.writer
+            # Backups taken before a schema change are brought up to date, like the database at startup
+            self.create_tables()
+            self.migrate_database()
+            self.ensure_indexes()
+            self.ensure_search_index()
+            self.ensure_rollups()
+            self.ensure_dormancy()
             
             logging.info(f"Database restored from {backup_path}")
             return True
@@ -382,173 +1380,157 @@ class DataManager:
 
     def check_existing_data(self, date):
         cursor = self.conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM daily_performance WHERE performance_date = ?", (date,))
-        count = cursor.fetchone()[0]
-        return count > 0
+        cursor.execute(CHECK_EXISTING_DATA_QUERY, (date,))
+        return bool(cursor.fetchone()[0])
+
+    def get_existing_dates(self, dates):
+        """
+        Return which of the given dates already have performance data.
+
+        Args:
+            dates (list): Performance dates as 'YYYY-MM-DD' strings.
 
-    def replace_data_for_date(self, df, date):
+        Returns:
+            list: The dates that have data, in ascending order.
+        """
+        cursor = self.conn.cursor()
+        self.stage_dates(cursor, dates)
+        cursor.execute(EXISTING_DATES_QUERY)
+        return [row[0] for row in cursor.fetchall()]
+
+    def backfill_records(self, df, replace_dates=(), progress_callback=None, shadow_df=None):
+        """
+        Write performance data spanning many days in one transaction.
+
+        All days are staged and written together like a single day, followed by one video totals
+        refresh and one commit for the whole file.
+
+        Args:
+            df (DataFrame): The filtered video performance data, with one performance_date per row.
+            replace_dates (list): Dates whose stored data is replaced by the new rows.
+            progress_callback (callable): Called as progress_callback(rows_staged, total_rows)
+                                          after each chunk of daily performance rows.
+            shadow_df (DataFrame): The rows below the threshold that filter_videos left out, for the shadow store.
+
+        Returns:
+            dict: The write summary, as described in apply_staged_daily_performance.
+        """
         cursor = self.conn.cursor()
         try:
-            # Delete existing data for the given date
-            cursor.execute("DELETE FROM daily_performance WHERE performance_date = ?", (date,))
-            
-            # Insert new data
-            self.insert_or_update_records(df)
-            
+            # Rows are staged oldest day first so the latest metadata of each video wins
+            df = df.sort_values('performance_date', kind='stable')
+            promoted = self.write_videos(cursor, df, shadow_df, replace_dates)
+            self.stage_daily_performance(cursor, df, progress_callback)
+            summary = self.apply_staged_daily_performance(cursor, replace_dates, promoted)
+
+            totals_start = time.perf_counter()
+            self.refresh_video_totals(summary['video_ids'])
+            summary['totals_seconds'] = time.perf_counter() - totals_start
+            self.conn.commit()
+            logging.info(f"Successfully backfilled {len(df)} records over {df['performance_date'].nunique()} days: "
+                         f"{summary['inserted']} inserted, {summary['updated']} updated, {summary['unchanged']} unchanged")
+            return summary
+        except Exception as e:
+            logging.error(f"Error backfilling records: {str(e)}")
+            self.conn.rollback()
+            raise
+
+    def replace_data_for_date(self, df, date, progress_callback=None, shadow_df=None):
+        """
+        Atomically replace the performance data for a date.
+
+        The new day is bulk loaded into a staging table and checked against the DataFrame before
+        anything is written. Stored rows missing from the new day are then deleted with one DELETE
+        and the new and changed rows written with one INSERT ... SELECT, in a single transaction
+        with the video totals, so a failure leaves the old day intact.
+
+        Args:
+            df (DataFrame): The filtered video performance data for the date.
+            date (str): The performance date to replace, as 'YYYY-MM-DD'.
+            progress_callback (callable): Called as progress_callback(rows_staged, total_rows)
+                                          after each chunk of staged rows.
+            shadow_df (DataFrame): The rows below the threshold that filter_videos left out, for the shadow store.
+
+        Returns:
+            dict: The write summary, as described in apply_staged_daily_performance.
+        """
+        cursor = self.conn.cursor()
+        try:
+            if (df['performance_date'] != date).any():
+                raise ValueError(f"Replacement data contains rows for dates other than {date}")
+
+            self.stage_daily_performance(cursor, df, progress_callback)
+
+            # The staged rows must match the data they were loaded from before anything is deleted
+            expected = df.drop_duplicates('Video ID', keep='last')
+            cursor.execute("SELECT COUNT(*), COALESCE(SUM(vv), 0) FROM temp.staged_daily_performance")
+            staged_rows, staged_vv = cursor.fetchone()
+            if staged_rows != len(expected) or staged_vv != int(expected['VV'].sum()):
+                raise ValueError(f"Staged data for {date} does not match the file: {staged_rows} rows and {staged_vv} VV "
+                                 f"staged, {len(expected)} rows and {int(expected['VV'].sum())} VV expected")
+
+            promoted = self.write_videos(cursor, df, shadow_df, [date])
+            summary = self.apply_staged_daily_performance(cursor, [date], promoted)
+
+            totals_start = time.perf_counter()
+            self.refresh_video_totals(summary['video_ids'])
+            summary['totals_seconds'] = time.perf_counter() - totals_start
             self.conn.commit()
-            logging.info(f"Successfully replaced data for {date}")
+            logging.info(f"Successfully replaced data for {date}: {summary['inserted']} inserted, {summary['updated']} updated, "
+                         f"{summary['unchanged']} unchanged, {summary['deleted']} deleted")
+            return summary
         except Exception as e:
             logging.error(f"Error replacing data for {date}: {str(e)}")
             self.conn.rollback()
             raise
 
     def get_all_videos(self):
-        cursor = self.conn.cursor()
         try:
-            cursor.execute('''
-                SELECT v.video_id, v.video_info, v.time, v.creator_name, v.products, 
-                    SUM(dp.vv) as total_vv, SUM(dp.shares) as total_shares, 
-                    ROUND(SUM(dp.video_revenue), 2) as total_video_revenue
-                FROM videos v
-                LEFT JOIN daily_performance dp ON v.video_id = dp.video_id
-                GROUP BY v.video_id
-                ORDER BY v.time DESC
-            ''')
-            return cursor.fetchall()
+            with self.connections.reader() as conn:
+                return conn.execute(ALL_VIDEOS_QUERY).fetchall()
         except Exception as e:
             logging.error(f"Error getting all videos: {str(e)}")
             raise
     
     def get_latest_performance_date(self):
-        cursor = self.conn.cursor()
         try:
-            cursor.execute("SELECT MAX(performance_date) FROM daily_performance")
-            latest_date = cursor.fetchone()[0]
+            with self.connections.reader() as conn:
+                latest_date = conn.execute(LATEST_PERFORMANCE_DATE_QUERY).fetchone()[0]
             return latest_date if latest_date else "N/A"
         except Exception as e:
             logging.error(f"Error getting latest performance date: {str(e)}")
             return "N/A"
         
-    def clean_percentage_fields(self, df):
-        """
-        Converts percentage strings to floats in the DataFrame.
-        """
-        percentage_fields = ['CTR', 'CTOR', 'V-to-L rate', 'Video Finish Rate']
-        for field in percentage_fields:
-            df[field] = df[field].replace('--', np.nan)
-            df[field] = df[field].str.rstrip('%').astype('float')
-        return df
-
-    def aggregate_ctr(self, video_id, timeframe, week_start):
-        """
-        Calculates CTR as (Sum of Product Clicks) / (Sum of VV) * 100 over the specified timeframe.
-        """
-        data = self.get_aggregation_data(video_id, ['product_clicks', 'vv'], timeframe, week_start)
-        result = []
-        for period, group in data.groupby('period'):
-            total_clicks = group['product_clicks'].sum()
-            total_vv = group['vv'].sum()
-            # Calculate CTR and multiply by 100 to get percentage
-            ctr = (total_clicks / total_vv) * 100 if total_vv else np.nan
-            result.append((period, ctr))
-        return result
-
-    def aggregate_ctor(self, video_id, timeframe, week_start):
-        """
-        Calculates CTOR as (Sum of Orders) / (Sum of Product Clicks) over the specified timeframe.
-        """
-        data = self.get_aggregation_data(video_id, ['orders', 'product_clicks'], timeframe, week_start)
-        result = []
-        for period, group in data.groupby('period'):
-            total_orders = group['orders'].sum()
-            total_clicks = group['product_clicks'].sum()
-            # Calculate CTR and multiply by 100 to get percentage
-            ctor = (total_orders / total_clicks) * 100 if total_clicks else np.nan
-            result.append((period, ctor))
-        return result
-
-    def aggregate_simple_average(self, video_id, metric, timeframe, week_start):
-        """
-        Calculates the simple average of the given metric over the specified timeframe.
-        """
-        data = self.get_aggregation_data(video_id, [metric], timeframe, week_start)
-        result = []
-        for period, group in data.groupby('period'):
-            # Convert values to decimals for calculation
-            values_in_decimal = group[metric] / 100.0
-            # Calculate the mean on decimal values
-            avg_metric_decimal = values_in_decimal.mean()
-            # Convert the mean back to percentage
-            avg_metric = avg_metric_decimal * 100
-            result.append((period, avg_metric))
-            logging.info(f"Aggregated {metric} for {period}: {avg_metric}")
-        return result
-
-    def get_aggregation_data(self, video_id, columns, timeframe, week_start):
-        """
-        Retrieves data and prepares it for aggregation.
-        """
-        logging.info(f"Week start: {week_start}")
+    def get_ingested_files(self):
+        """
+        Retrieve the ledger of export files ingested by the folder watcher, including those that failed.
+
+        Returns:
+            dict: File path to a (size, mtime_ns) tuple.
+        """
         cursor = self.conn.cursor()
-        columns_str = ', '.join(columns)
-        cursor.execute(f'''
-            SELECT performance_date, {columns_str}
-            FROM daily_performance
-            WHERE video_id = ?
-            ORDER BY performance_date
-        ''', (video_id,))
-        rows = cursor.fetchall()
-        df = pd.DataFrame(rows, columns=['performance_date'] + columns)
-        df['performance_date'] = pd.to_datetime(df['performance_date'])
-
-        if timeframe == 'Weekly':
-            # Map week_start to numerical day of week (Monday=0, Sunday=6)
-            day_map = {'Monday': 0, 'Sunday': 6}
-
-            week_start_num = day_map.get(week_start, 0)  # Defaults to Monday if invalid
-
-            # Compute the start of the week
-            df['period'] = df['performance_date'] - pd.to_timedelta(
-                (df['performance_date'].dt.dayofweek - week_start_num) % 7,
-                unit='d'
-            )
-            df['period'] = df['period'].dt.normalize()  # Ensure time component is set to midnight
-            
-        elif timeframe == 'Monthly':
-            df['period'] = df['performance_date'].values.astype('datetime64[M]')
-            
-        else:
-            df['period'] = df['performance_date']
+        cursor.execute("SELECT file_path, size, mtime_ns FROM ingested_files")
+        return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
 
-        return df
-    
-    def clear_video_performance(self, master):
+    def record_ingested_files(self, records):
         """
-        Clear video performance data for a specified date after user confirmation.
-        Ensures data integrity by creating a backup before deletion.
+        Add or update entries in the ingested files ledger.
+
+        Args:
+            records (list): (file_path, size, mtime_ns, performance_date, status) tuples.
         """
-        # Create a simple dialog to get the date, specifying the parent window
-        date = tk.simpledialog.askstring("Clear Video Performance", "Enter date to clear (YYYY-MM-DD):", parent=master)
-        if not date:
-            return
         try:
-            # Validate date format
-            datetime.strptime(date, "%Y-%m-%d")
-        except ValueError:
-            messagebox.showerror("Error", "Invalid date format. Please use YYYY-MM-DD.", parent=master)
-            return
+            cursor = self.conn.cursor()
+            cursor.executemany('''
+                INSERT OR REPLACE INTO ingested_files (file_path, size, mtime_ns, performance_date, status, ingested_at)
+                VALUES (?, ?, ?, ?, ?, datetime('now'))
+            ''', records)
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logging.error(f"Error recording ingested files: {str(e)}")
+            self.conn.rollback()
+            raise
 
-        try:
-            result = self.clear_data_for_date(date)
-            if result:
-                messagebox.showinfo("Success", f"Data for {date} has been cleared. A backup was created before clearing.", parent=master)
-            else:
-                messagebox.showinfo("Info", f"No data found for {date}.", parent=master)
-        except Exception as e:
-            error_message = f"An error occurred while clearing data: {str(e)}\n\nPlease check the log for more details."
-            messagebox.showerror("Error", error_message, parent=master)
-            logging.error(f"Error in clear_video_performance: {str(e)}", exc_info=True)
-    
     def get_videos_by_date(self, date):
         """
         Retrieve video performance data for a specific date.
@@ -559,129 +1541,159 @@ class DataManager:
         Returns:
             list: List of tuples containing video performance data
         """
-        query = """
-            SELECT 
-                video_id,
-                vv as views,
-                shares,
-                comments,
-                video_revenue as gmv,
-                ctr,
-                ctor,
-                video_finish_rate as finish_rate
-            FROM daily_performance
-            WHERE date(performance_date) = date(?)
-            ORDER BY views DESC
-        """
-        
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(query, (date.strftime('%Y-%m-%d'),))
-            return cursor.fetchall()
+            # The date is matched through its day number, to use the performance_day index
+            with self.connections.reader() as conn:
+                return conn.execute(VIDEOS_BY_DATE_QUERY, (date.strftime('%Y-%m-%d'),)).fetchall()
         except sqlite3.Error as e:
             logging.error(f"Database error: {e}")
             return []
         
     # Virality metrics
-    def update_daily_table_virality_metrics(self, video_id, performance_date, metrics):
+    def update_daily_table_virality_metrics(self, cursor, records):
         """
-        Update daily performance virality metrics for a video in the daily_performance table.
+        Update the virality metrics of daily performance rows with batched UPDATEs.
+        The caller is responsible for committing.
 
         Args:
-            video_id (str): The video ID
-            performance_date (str): The date of performance
-            metrics (dict): Dictionary containing the metrics to update
+            cursor (sqlite3.Cursor): The cursor to execute on.
+            records (list): (dgr, er, egr, trending_score, momentum, video_id, performance_day) rows.
         """
         try:
-            cursor = self.conn.cursor()
-            
-            # Construct the UPDATE query dynamically based on provided metrics
-            set_clause = ", ".join([f"{key} = ?" for key in metrics.keys()])
-            values = list(metrics.values())
-            values.extend([video_id, performance_date])  # Add WHERE clause parameters
-            
-            query = f"""
+            self.executemany_in_chunks(cursor, """
                 UPDATE daily_performance 
-                SET {set_clause}
-                WHERE video_id = ? AND performance_date = ?
-            """
-            
-            cursor.execute(query, values)
-            self.conn.commit()
-            
+                SET dgr = ?, er = ?, egr = ?, trending_score = ?, momentum = ?
+                WHERE video_id = ? AND performance_day = ?
+            """, records)
         except sqlite3.Error as e:
             logging.error(f"Error updating daily metrics: {str(e)}")
             raise
 
-    def update_video_table_virality_metrics(self, video_id, metrics):
+    def update_video_table_virality_metrics(self, cursor, records):
         """
-        Update video virality metrics in the videos table.
+        Update the virality metrics of videos with batched UPDATEs.
+        The caller is responsible for committing.
 
         Args:
-            video_id (str): The video ID
-            metrics (dict): Dictionary containing the metrics to update
+            cursor (sqlite3.Cursor): The cursor to execute on.
+            records (list): (dgr, egr, trending_score, momentum, video_id) rows.
         """
         try:
-            cursor = self.conn.cursor()
-            
-            # Construct the UPDATE query dynamically based on provided metrics
-            set_clause = ", ".join([f"{key} = ?" for key in metrics.keys()])
-            values = list(metrics.values())
-            values.append(video_id)  # Add WHERE clause parameter
-            
-            query = f"""
+            self.executemany_in_chunks(cursor, """
                 UPDATE videos 
-                SET {set_clause}
+                SET dgr = ?, egr = ?, trending_score = ?, momentum = ?
                 WHERE video_id = ?
-            """
-            
-            cursor.execute(query, values)
-            self.conn.commit()
-            
+            """, records)
         except sqlite3.Error as e:
             logging.error(f"Error updating video metrics: {str(e)}")
             raise
 
-    def update_video_table_totals(self, video_id):
+    def refresh_video_totals(self, video_ids):
         """
-        Update total metrics for a specific video.
-        
+        Recompute total metrics and the dormant flag for a set of videos with grouped queries.
+
+        Only the given videos are recomputed, from their monthly rollup rows rather than every daily row,
+        so the cost depends on the batch and barely on the length of the history. The caller is responsible
+        for committing.
+
         Args:
-            video_id (str): The video ID to update totals for
+            video_ids (list): The video IDs touched by the current batch.
         """
         try:
             cursor = self.conn.cursor()
-            
-            update_query = """
-            UPDATE videos
-            SET 
-                total_vv = (
-                    SELECT SUM(vv)
-                    FROM daily_performance
-                    WHERE video_id = ?
-                ),
-                total_likes = (
-                    SELECT SUM(likes)
-                    FROM daily_performance
-                    WHERE video_id = ?
-                ),
-                total_shares = (
-                    SELECT SUM(shares)
-                    FROM daily_performance
-                    WHERE daily_performance.video_id = videos.video_id
-                ),
-                total_video_revenue = (
-                    SELECT SUM(video_revenue)
-                    FROM daily_performance
-                    WHERE video_id = ?
-                )
-            WHERE video_id = ?
-            """
-            
-            cursor.execute(update_query, (video_id, video_id, video_id, video_id))
-            self.conn.commit()
-            logging.info(f"Updated total metrics for video {video_id}")
+            self.stage_video_ids(cursor, video_ids)
+
+            # Videos without any remaining daily rows go back to zero
+            cursor.execute("""
+                UPDATE videos
+                SET total_vv = 0, total_likes = 0, total_shares = 0, total_video_revenue = 0
+                WHERE video_id IN (SELECT video_id FROM temp.staged_video_ids)
+            """)
+            # The rollups are brought up to date first, so the totals can be summed from the monthly periods
+            self.refresh_rollups(cursor)
+            cursor.execute(REFRESH_VIDEO_TOTALS_QUERY)
+            self.refresh_dormancy(cursor)
+            logging.info(f"Updated total metrics for {len(video_ids)} videos")
             
         except sqlite3.Error as e:
             logging.error(f"Error updating video totals: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    def refresh_dormancy(self, cursor):
+        """
+        Set the dormant flag of the staged videos. A video is dormant when its latest dormancy_days
+        rows cover consecutive days and are all below dormancy_vv. A dormancy_days of 0 disables dormancy
+        and clears the flag.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor to execute on, with the videos in temp.staged_video_ids.
+        """
+        if not self.dormancy_days:
+            cursor.execute("UPDATE videos SET dormant = 0 WHERE dormant AND video_id IN (SELECT video_id FROM temp.staged_video_ids)")
+            return
+        cursor.execute("""
+            UPDATE videos
+            SET dormant = (
+                SELECT COUNT(*) = ?1 AND COALESCE(MAX(vv), 0) < ?2
+                    AND MAX(performance_day) - MIN(performance_day) = ?1 - 1
+                FROM (
+                    SELECT performance_day, vv FROM daily_performance d
+                    WHERE d.video_id = videos.video_id
+                    ORDER BY performance_day DESC LIMIT ?1
+                )
+            )
+            WHERE video_id IN (SELECT video_id FROM temp.staged_video_ids)
+        """, (self.dormancy_days, self.dormancy_vv))
+
+    def track_changed_days(self, cursor, query, params=()):
+        """
+        Record the daily performance rows a write is about to change, so refresh_rollups recomputes their periods.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor to execute on.
+            query (str): A query selecting the video_id and performance_day of the rows.
+            params (tuple): The query parameters.
+        """
+        cursor.execute(CREATE_CHANGED_DAYS_QUERY)
+        cursor.execute(f"INSERT OR IGNORE INTO temp.changed_days (video_id, performance_day) {query}", params)
+
+    def refresh_rollups(self, cursor):
+        """
+        Recompute the rollup rows of every video and period with a changed day, from the daily rows of
+        those periods only, then clear the changed days. The caller is responsible for committing.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor to execute on.
+        """
+        cursor.execute(CREATE_CHANGED_DAYS_QUERY)
+        for table in ROLLUP_TABLES:
+            cursor.execute(rollup_query(DELETE_CHANGED_ROLLUP_QUERY, table))
+            cursor.execute(rollup_query(REFRESH_ROLLUP_QUERY, table))
+        cursor.execute("DELETE FROM temp.changed_days")
+
+    def stage_dates(self, cursor, dates):
+        """
+        Load a set of performance dates and their day numbers into the temp.staged_dates table so they can be
+        joined against.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor to execute on.
+            dates (list): Performance dates as 'YYYY-MM-DD' strings.
+        """
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS staged_dates (performance_day INTEGER PRIMARY KEY, performance_date TEXT)")
+        cursor.execute("DELETE FROM temp.staged_dates")
+        cursor.executemany(f"INSERT OR IGNORE INTO temp.staged_dates (performance_day, performance_date) VALUES ({day_from_date('?1')}, ?1)",
+                           [(date,) for date in dates])
+
+    def stage_video_ids(self, cursor, video_ids):
+        """
+        Load a set of video IDs into the temp.staged_video_ids table so they can be joined against.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor to execute on.
+            video_ids (list): The video IDs to stage.
+        """
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS staged_video_ids (video_id TEXT PRIMARY KEY)")
+        cursor.execute("DELETE FROM temp.staged_video_ids")
+        cursor.executemany("INSERT OR IGNORE INTO temp.staged_video_ids (video_id) VALUES (?)",
+                           [(video_id,) for video_id in video_ids])
@@ -0,0 +1,462 @@
+#export_reader.py is the file that handles reading TikTok export files into DataFrames.
+import csv
+import importlib.util
+import logging
+import os
+import re
+import time
+import pandas as pd
+from openpyxl import load_workbook
+
+# calamine is an optional, much faster Excel engine. It is used when installed.
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+# Parquet exports need pyarrow, which reads them straight into Arrow-backed columns.
+PARQUET_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+# logging configuration
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Bump whenever a change to this file alters the parsed output, so cached frames are re-parsed.
+PARSER_VERSION = 3
+
+# Row layout of a TikTok export: the date range is in A1 and the header is on the third row.
+DATE_RANGE_ROW = 0
+HEADER_ROW = 2
+
+# File extensions ExportReader accepts. Anything else is read as an Excel workbook.
+CSV_EXTENSIONS = ('.csv',)
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+EXPORT_EXTENSIONS = ('.xlsx',) + CSV_EXTENSIONS + PARQUET_EXTENSIONS
+
+# Rows per chunk when reading CSV exports, to keep peak memory flat on warehouse dumps
+CSV_CHUNK_ROWS = 50000
+
+# Columns that must be present in an export, after header normalisation.
+REQUIRED_COLUMNS = [
+    'Video ID', 'Video Info', 'Time', 'Creator name', 'Products', 'VV', 'Likes', 'Comments',
+    'Shares', 'New followers', 'V-to-L clicks', 'Product Impressions', 'Product Clicks',
+    'Customers', 'Orders', 'Unit Sales', 'Video Revenue ($)', 'GPM ($)',
+    'Shoppable video attributed GMV ($)', 'CTR', 'V-to-L rate', 'Video Finish Rate', 'CTOR'
+]
+
+# Typed ingestion schema: the kind of value each export column holds. Every column is converted
+# to a concrete dtype at read time, so the frame handed to the database writer has no object columns.
+COLUMN_TYPES = {
+    'Video ID': 'text',
+    'Video Info': 'text',
+    'Time': 'text',
+    'Creator name': 'text',
+    'Products': 'text',
+    'VV': 'integer',
+    'Likes': 'integer',
+    'Comments': 'integer',
+    'Shares': 'integer',
+    'New followers': 'integer',
+    'V-to-L clicks': 'integer',
+    'Product Impressions': 'integer',
+    'Product Clicks': 'integer',
+    'Customers': 'integer',
+    'Orders': 'integer',
+    'Unit Sales': 'integer',
+    'Video Revenue ($)': 'currency',
+    'GPM ($)': 'currency',
+    'Shoppable video attributed GMV ($)': 'currency',
+    'CTR': 'percentage',
+    'V-to-L rate': 'percentage',
+    'Video Finish Rate': 'percentage',
+    'CTOR': 'percentage',
+}
+
+# The dtype each kind of column is stored as. Integers use the nullable Int64 so missing
+# values don't turn counts into floats. Percentages keep their 0-100 scale.
+TYPE_DTYPES = {
+    'text': 'string',
+    'integer': 'Int64',
+    'currency': 'float64',
+    'percentage': 'float64',
+}
+
+# Text columns are declared when reading CSV so that Video IDs never turn into floats
+TEXT_DTYPES = {column: TYPE_DTYPES['text'] for column, kind in COLUMN_TYPES.items() if kind == 'text'}
+
+# Columns that give each row its own date in per-day breakdown exports, in order of preference
+PER_DAY_DATE_COLUMNS = ('performance_date', 'Date')
+
+# Values TikTok writes for a metric that has no data
+MISSING_VALUES = ('', '--', '-')
+
+
+def parse_date_range(date_range):
+    """
+    Parse the '[Date Range]: start ~ end' string found in cell A1 of an export.
+
+    Args:
+        date_range (str): The contents of cell A1.
+
+    Returns:
+        tuple: The start and end dates as 'YYYY-MM-DD' strings.
+    """
+    match = re.search(r'\[Date Range\]: (\d{4}-\d{2}-\d{2}) ~ (\d{4}-\d{2}-\d{2})', str(date_range))
+    if not match:
+        raise ValueError("Could not extract date from range string")
+    return match.groups()
+
+
+def extract_date_from_range(date_range):
+    """
+    Extract the single performance date from the date range in cell A1 of an export.
+
+    Args:
+        date_range (str): The contents of cell A1.
+
+    Returns:
+        str: The performance date as a 'YYYY-MM-DD' string.
+    """
+    start_date, end_date = parse_date_range(date_range)
+    if start_date != end_date:
+        raise ValueError("Data spans more than one day. Please provide data for a single day only.")
+    return start_date
+
+
+def convert_columns(df):
+    """
+    Convert the export columns to the dtypes of the typed ingestion schema.
+
+    Numeric columns that were read as text are parsed in one vectorised pass that strips '$',
+    '%', thousands separators and whitespace. Values that still cannot be converted become
+    missing, and the Video IDs of their rows are recorded in df.attrs['conversion_failures']
+    as a column name to Video ID list mapping. The time the conversion took is recorded in
+    df.attrs['conversion_seconds'].
+
+    Args:
+        df (DataFrame): The export data.
+
+    Returns:
+        DataFrame: The converted data.
+    """
+    start = time.perf_counter()
+    failures = {}
+    for column, kind in COLUMN_TYPES.items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if kind == 'text':
+            df[column] = values.astype(TYPE_DTYPES['text'])
+            continue
+
+        if not pd.api.types.is_numeric_dtype(values):
+            text = values.astype('string').str.strip()
+            text = text.mask(text.isin(MISSING_VALUES))
+            converted = pd.to_numeric(text.str.replace(r'[$%,\s]', '', regex=True), errors='coerce')
+            failed = text.notna() & converted.isna()
+        else:
+            converted = values.astype('float64')
+            failed = pd.Series(False, index=values.index)
+
+        if kind == 'integer':
+            fractional = converted.notna() & (converted % 1 != 0)
+            failed = failed | fractional
+            converted = converted.mask(fractional)
+        df[column] = converted.astype(TYPE_DTYPES[kind])
+
+        if failed.any():
+            failures[column] = df.loc[failed, 'Video ID'].astype(str).tolist() if 'Video ID' in df.columns else []
+            logging.warning(f"{int(failed.sum())} value(s) in column '{column}' could not be converted and were left empty")
+
+    df.attrs['conversion_failures'] = failures
+    df.attrs['conversion_seconds'] = time.perf_counter() - start
+    return df
+
+
+def iter_rows_openpyxl(file_path):
+    """Stream the rows of the first worksheet using openpyxl in read-only mode."""
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+
+def iter_rows_calamine(file_path):
+    """Stream the rows of the first worksheet using calamine."""
+    sheet = CalamineWorkbook.from_path(file_path).get_sheet_by_index(0)
+    for row in sheet.iter_rows():
+        # calamine returns empty strings for empty cells
+        yield tuple(None if value == '' else value for value in row)
+
+
+def preamble_rows(first_rows, rows):
+    """Yield the rows already read from a file, then the rest of its rows, as tuples."""
+    for row in first_rows:
+        yield tuple(row)
+    for row in rows:
+        yield tuple(row)
+
+
+# Available Excel engines, keyed by the name passed to ExportReader
+ENGINES = {
+    'openpyxl': iter_rows_openpyxl,
+    'calamine': iter_rows_calamine,
+}
+
+
+def default_engine():
+    """Return the fastest Excel engine available in this environment."""
+    return 'calamine' if CalamineWorkbook is not None else 'openpyxl'
+
+
+class ExportReader:
+    def __init__(self, column_mapping=None, engine=None):
+        """
+        Initialize the ExportReader.
+
+        Args:
+            column_mapping (dict): Export column name to database column name. Export columns
+                mapping to the same database column are renamed to the one in REQUIRED_COLUMNS.
+            engine (str): Name of the Excel engine to use. Defaults to the fastest one installed.
+        """
+        self.column_mapping = column_mapping or {}
+        self.engine = engine or default_engine()
+        if self.engine not in ENGINES:
+            raise ValueError(f"Unknown Excel engine '{self.engine}'. Available engines: {', '.join(ENGINES)}")
+        if self.engine == 'calamine' and CalamineWorkbook is None:
+            raise ValueError("The calamine engine requires the python-calamine package")
+
+    def read(self, file_path):
+        """
+        Read a TikTok export from an Excel, CSV or Parquet file.
+
+        Args:
+            file_path (str): The path to the export file.
+
+        Returns:
+            DataFrame: The export data with a performance_date column.
+        """
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension in CSV_EXTENSIONS:
+            return self.read_csv(file_path)
+        if extension in PARQUET_EXTENSIONS:
+            return self.read_parquet(file_path)
+        return self.read_excel(file_path)
+
+    def read_excel(self, file_path):
+        """
+        Read an Excel export in a single streaming pass.
+
+        The date range and header are validated before any body rows are materialised,
+        so a malformed file fails without reading its data.
+
+        Args:
+            file_path (str): The path to the export file.
+
+        Returns:
+            DataFrame: The export data with a performance_date column.
+        """
+        rows = ENGINES[self.engine](file_path)
+        try:
+            date_range, header = self.read_preamble(rows)
+            date_bounds = parse_date_range(date_range)
+            if date_bounds[0] != date_bounds[1] and not any(column in header for column in PER_DAY_DATE_COLUMNS):
+                raise ValueError("Data spans more than one day and has no per-day date column, so it cannot be split by day.")
+
+            width = len(header)
+            body = [row[:width] for row in rows if any(value is not None for value in row[:width])]
+        finally:
+            rows.close()
+
+        return self.with_performance_date(pd.DataFrame.from_records(body, columns=header), date_bounds)
+
+    def read_csv(self, file_path):
+        """
+        Read a CSV export in chunks with the declared column dtypes.
+
+        The file either has the Excel export layout, with the date range on the first line and the
+        header on the third, or a header on the first line and a performance_date column.
+
+        Args:
+            file_path (str): The path to the CSV file.
+
+        Returns:
+            DataFrame: The export data with a performance_date column.
+        """
+        with open(file_path, 'r', newline='', encoding='utf-8-sig') as f:
+            preamble = csv.reader(f)
+            first_row = next(preamble, None)
+            if first_row is None:
+                raise ValueError("File ended before the header row")
+            if first_row and '[Date Range]' in first_row[0]:
+                date_range, header = self.read_preamble(preamble_rows([first_row], preamble))
+                date_bounds = parse_date_range(date_range)
+                header_row = HEADER_ROW
+            else:
+                header = self.normalise_header(first_row, extra_columns=PER_DAY_DATE_COLUMNS)
+                date_bounds = None
+                header_row = 0
+
+        chunks = pd.read_csv(
+            file_path,
+            header=None,
+            names=header,
+            skiprows=header_row + 1,
+            usecols=range(len(header)),
+            dtype={column: dtype for column, dtype in TEXT_DTYPES.items() if column in header},
+            skip_blank_lines=True,
+            encoding='utf-8-sig',
+            chunksize=CSV_CHUNK_ROWS,
+        )
+        df = pd.concat(chunks, ignore_index=True)
+        return self.with_performance_date(df, date_bounds)
+
+    def read_parquet(self, file_path):
+        """
+        Read a Parquet export with pyarrow.
+
+        The performance date comes from a performance_date column, or from a 'date_range' entry
+        in the file's key-value metadata holding the same string as cell A1 of an Excel export.
+
+        Args:
+            file_path (str): The path to the Parquet file.
+
+        Returns:
+            DataFrame: The export data with a performance_date column.
+        """
+        if not PARQUET_AVAILABLE:
+            raise ValueError("Reading Parquet exports requires the pyarrow package")
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(file_path)
+        header = self.normalise_header(table.column_names, extra_columns=PER_DAY_DATE_COLUMNS)
+        table = table.rename_columns(header)
+
+        metadata = table.schema.metadata or {}
+        date_bounds = parse_date_range(metadata[b'date_range'].decode()) if b'date_range' in metadata else None
+
+        # One block per column lets pyarrow hand numeric buffers to pandas without consolidating copies,
+        # and self_destruct frees each Arrow column as soon as it is converted
+        df = table.to_pandas(split_blocks=True, self_destruct=True)
+        del table
+        return self.with_performance_date(df, date_bounds)
+
+    def with_performance_date(self, df, date_bounds=None):
+        """
+        Convert the columns to the typed schema and set the performance_date column.
+
+        Rows take their date from a per-day date column when the export has one, which must fall
+        inside the export's date range. Otherwise the export must cover a single day.
+
+        Args:
+            df (DataFrame): The export data.
+            date_bounds (tuple): The start and end of the export's date range, if it has one.
+
+        Returns:
+            DataFrame: The export data with a performance_date column.
+        """
+        df = convert_columns(df.dropna(how='all'))
+        date_column = next((column for column in PER_DAY_DATE_COLUMNS if column in df.columns), None)
+        if date_column is None:
+            if date_bounds is None:
+                raise ValueError("Missing expected columns: performance_date")
+            if date_bounds[0] != date_bounds[1]:
+                raise ValueError("Data spans more than one day and has no per-day date column, so it cannot be split by day.")
+            df['performance_date'] = date_bounds[0]
+            return df
+
+        dates = pd.to_datetime(df[date_column].astype(str)).dt.strftime('%Y-%m-%d')
+        if date_bounds is not None and ((dates < date_bounds[0]) | (dates > date_bounds[1])).any():
+            raise ValueError(f"Rows are dated outside the export's date range {date_bounds[0]} ~ {date_bounds[1]}")
+        if date_column != 'performance_date':
+            df = df.drop(columns=[date_column])
+        df['performance_date'] = dates.astype(object)
+        return df
+
+    def scan(self, file_path):
+        """
+        Read only the date range and header of an export, without reading its data.
+
+        Args:
+            file_path (str): The path to the export file.
+
+        Returns:
+            tuple: The start and end dates of the export's date range, or None if it has none,
+                and the normalised header. Required columns are not checked.
+        """
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension in CSV_EXTENSIONS:
+            with open(file_path, 'r', newline='', encoding='utf-8-sig') as f:
+                preamble = csv.reader(f)
+                first_row = next(preamble, None)
+                if first_row is None:
+                    raise ValueError("File ended before the header row")
+                if first_row and '[Date Range]' in first_row[0]:
+                    date_range, header = self.read_preamble(preamble_rows([first_row], preamble), check_required=False)
+                    return parse_date_range(date_range), header
+                return None, self.normalise_header(first_row, PER_DAY_DATE_COLUMNS, check_required=False)
+
+        if extension in PARQUET_EXTENSIONS:
+            if not PARQUET_AVAILABLE:
+                raise ValueError("Reading Parquet exports requires the pyarrow package")
+            import pyarrow.parquet as pq
+
+            schema = pq.read_schema(file_path)
+            metadata = schema.metadata or {}
+            date_bounds = parse_date_range(metadata[b'date_range'].decode()) if b'date_range' in metadata else None
+            return date_bounds, self.normalise_header(schema.names, PER_DAY_DATE_COLUMNS, check_required=False)
+
+        # openpyxl streams the worksheet in read-only mode, while calamine loads the whole sheet before
+        # returning any row, so only openpyxl reads just the first rows whatever the engine
+        rows = iter_rows_openpyxl(file_path)
+        try:
+            date_range, header = self.read_preamble(rows, check_required=False)
+        finally:
+            rows.close()
+        return parse_date_range(date_range), header
+
+    def read_preamble(self, rows, check_required=True):
+        """
+        Consume the date range and header rows from a row iterator.
+
+        Args:
+            rows (iterator): Row tuples of the export's first worksheet.
+            check_required (bool): Raise if the header is missing required columns.
+
+        Returns:
+            tuple: The date range string and the normalised header.
+        """
+        date_range = None
+        for index, row in enumerate(rows):
+            if index == DATE_RANGE_ROW:
+                date_range = row[0] if row else None
+            elif index == HEADER_ROW:
+                return date_range, self.normalise_header(row, check_required=check_required)
+        raise ValueError("File ended before the header row")
+
+    def normalise_header(self, header, extra_columns=(), check_required=True):
+        """
+        Clean the header row, apply the column mapping and check for required columns.
+
+        Args:
+            header (tuple): The raw header row.
+            extra_columns (list): Columns that are passed through unchanged when present.
+            check_required (bool): Raise if required columns are missing.
+
+        Returns:
+            list: The normalised column names.
+        """
+        names = [(str(name).strip() or None) if name is not None else None for name in header]
+        # Drop the empty trailing cells that read-only worksheets report
+        while names and names[-1] is None:
+            names.pop()
+
+        # Export columns mapping to the same database column are renamed to the current name
+        current_names = {db_column: name for name, db_column in self.column_mapping.items() if name in REQUIRED_COLUMNS}
+        names = [name if name in extra_columns else current_names.get(self.column_mapping.get(name), name) for name in names]
+
+        missing = [column for column in REQUIRED_COLUMNS if column not in names]
+        if missing and check_required:
+            raise ValueError(f"Missing expected columns: {', '.join(missing)}")
+        return names
@@ -1,56 +1,420 @@
 #file_handler.py is the file that handles the file ingestion and processing.
 
-import tkinter as tk
-from tkinter import filedialog, messagebox
 import logging
 import os
-from datetime import datetime
+import sqlite3
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
 from config import DB_BACKUP_DIR
+from .export_reader import ExportReader, REQUIRED_COLUMNS, PER_DAY_DATE_COLUMNS
+from .ingest_ledger import IngestLedger
+from .virality_calculator import ViralityCalculator
+
+# tkinter is only needed for the dialogs. Headless installs, such as the command-line ingestion, may not ship Tk.
+try:
+    import tkinter as tk
+    from tkinter import filedialog, messagebox, simpledialog
+except ImportError:
+    tk = filedialog = messagebox = simpledialog = None
+
+# Result statuses that count as a successfully ingested file
+PROCESSED_STATUSES = ('processed', 'replaced')
+
+# Threads used to read the date range and header of the selected files before parsing
+PREFLIGHT_WORKERS = 8
+
+
+def read_export_timed(parse_cache, file_path):
+    """
+    Parse an export file and time it. Defined at module level so it can run in a worker process.
+
+    Args:
+        parse_cache (ParseCache): The cache to read the file through.
+        file_path (str): The path to the export file.
+
+    Returns:
+        tuple: The parsed DataFrame and the parse time in seconds.
+    """
+    start = time.perf_counter()
+    df = parse_cache.read(file_path)
+    return df, time.perf_counter() - start
+
 
 class FileHandler:
     def __init__(self, data_manager):
         self.data_manager = data_manager
+        self.virality_calculator = ViralityCalculator(data_manager)
+        self.ingest_ledger = IngestLedger(data_manager)
 
-    def upload_video_performance_file(self, master):
+    def select_video_performance_files(self, master):
         """
-        Handle the uploading of one or more Excel files containing video performance data.
-        Creates a database backup before processing and updates the UI upon completion.
+        Ask the user to select one or more Excel, CSV or Parquet exports containing video performance data.
+
+        Args:
+            master (tk.Tk): The parent window for the file dialog.
+
+        Returns:
+            tuple: The selected file paths. Empty if the dialog was cancelled.
         """
-        try:
-            file_paths = filedialog.askopenfilenames(filetypes=[("Excel files", "*.xlsx")])
-            if not file_paths:
-                return
+        return filedialog.askopenfilenames(parent=master, filetypes=[
+            ("Export files", "*.xlsx *.csv *.parquet *.pq"),
+            ("Excel files", "*.xlsx"),
+            ("CSV files", "*.csv"),
+            ("Parquet files", "*.parquet *.pq"),
+        ])
 
-            # Create a backup before processing any files
+    def show_upload_result(self, results, master):
+        """
+        Show a summary of processed and skipped files once an upload has finished.
+
+        Args:
+            results (list): The per-file results returned by process_files.
+            master (tk.Tk): The parent window for the message box.
+        """
+        processed_files = [result['message'] for result in results if result['status'] in PROCESSED_STATUSES]
+        skipped_files = [result['message'] for result in results if result['status'] not in PROCESSED_STATUSES]
+
+        # Prepare the result message
+        result_message = "File processing complete.\n\n"
+        if processed_files:
+            result_message += "Processed files:\n" + "\n".join(processed_files) + "\n\n"
+        if skipped_files:
+            result_message += "Skipped files:\n" + "\n".join(skipped_files)
+
+        messagebox.showinfo("Upload Result", result_message, parent=master)
+
+    def ask_replace_existing_data(self, date):
+        """
+        Ask the user whether the existing data for a date should be replaced.
+
+        Args:
+            date (str): The performance date that already has data.
+
+        Returns:
+            bool: True if the data should be replaced.
+        """
+        return messagebox.askyesno("Data Already Exists",
+            f"Data for {date} already exists in the database. Do you want to replace it?")
+
+    def process_files(self, file_paths, confirm_replace=None, progress_callback=None, cancel_event=None, backfill=False,
+                      resolve_conflicts=None, backup=False, source='gui'):
+        """
+        Check, parse and write several export files.
+
+        A pre-flight stage first reads only the date range and header of every file, so files with
+        missing columns fail and date conflicts are found before any file is parsed. The remaining
+        files are parsed in parallel and written to the database one at a time in date order.
+        The batch and the time spent in each stage are recorded in the ingestion run ledger.
+
+        Args:
+            file_paths (list): The paths to the export files to process.
+            confirm_replace (callable): Called with a date that already has data. Returns True to replace it.
+                                        Defaults to asking the user with a message box.
+            progress_callback (callable): Called as progress_callback(stage, done, total, detail) where
+                                          stage is 'preflight', 'parse', 'file' or 'rows'.
+            cancel_event (threading.Event): When set, the remaining files are skipped.
+            backfill (bool): Accept exports covering several days, as described in process_parsed_file.
+            resolve_conflicts (callable): Called once with the conflicts found by find_conflicts, before
+                                          parsing. Returns a dictionary of file path to True to replace
+                                          the existing data or False to skip the file. Conflicts that only
+                                          show up while writing still go to confirm_replace.
+            backup (bool): Back up the database before anything is written.
+            source (str): What started the upload, recorded in the ledger: 'gui', 'cli' or 'watch'.
+
+        Returns:
+            list: A result dictionary per file, as described in make_result.
+        """
+        started_at = datetime.now()
+        start = time.perf_counter()
+        stage_seconds = {}
+        if backup:
             self.data_manager.backup_database()
+            stage_seconds['backup'] = time.perf_counter() - start
 
-            # Logic to be able to select multiple files and process them.
-            skipped_files = []
-            processed_files = []
+        if progress_callback:
+            progress_callback('preflight', 0, len(file_paths), '')
+        preflight_start = time.perf_counter()
+        preflights = self.preflight_files(file_paths, backfill)
+        stage_seconds['preflight'] = time.perf_counter() - preflight_start
 
-            for file_path in file_paths:
-                result = self.process_single_file(file_path)
-                if result.startswith("Error") or result.startswith("Data for"):
-                    skipped_files.append(result)
-                else:
-                    processed_files.append(result)
+        # Files that failed the pre-flight checks are reported first and never parsed
+        results = []
+        for preflight in preflights:
+            if preflight['error']:
+                result = self.make_result(preflight['file'])
+                result.update(status='error', message=f"Error processing file {os.path.basename(preflight['file'])}: {preflight['error']}")
+                results.append(result)
+        preflights = {preflight['file']: preflight for preflight in preflights if not preflight['error']}
+
+        decisions = {}
+        conflicts = self.find_conflicts(list(preflights.values()))
+        if conflicts and resolve_conflicts:
+            decisions = resolve_conflicts(conflicts)
 
-            # Prepare the result message
-            result_message = "File processing complete.\n\n"
-            if processed_files:
-                result_message += "Processed files:\n" + "\n".join(processed_files) + "\n\n"
-            if skipped_files:
-                result_message += "Skipped files:\n" + "\n".join(skipped_files)
+        # An upload cancelled while resolving the conflicts stops before any file is parsed
+        if cancel_event is not None and cancel_event.is_set():
+            for file_path in preflights:
+                result = self.make_result(file_path)
+                result.update(status='cancelled', message=f"Upload cancelled. File {os.path.basename(file_path)} was not processed.")
+                results.append(result)
+            preflights = {}
 
-            messagebox.showinfo("Upload Result", result_message)
+        if progress_callback:
+            progress_callback('parse', 0, len(preflights), '')
+        parsed_files = self.parse_files(list(preflights))
+
+        # Files that failed to parse are reported next, the rest are written oldest date first
+        results += [result for _, _, result in parsed_files if result['status'] == 'error']
+        # Exports with a header but no rows have no date to sort by and nothing to write
+        for file_path, df, result in parsed_files:
+            if result['status'] != 'error' and df.empty:
+                result.update(status='skipped', message=f"File {os.path.basename(file_path)} contains no rows. Nothing was written.")
+                results.append(result)
+        parsed_frames = sorted(
+            ((file_path, df, result) for file_path, df, result in parsed_files if result['status'] is None),
+            key=lambda parsed: parsed[1]['performance_date'].min()
+        )
+        for index, (file_path, df, result) in enumerate(parsed_frames):
+            # Cancelling only takes effect between files so that a file is never half written
+            if cancel_event is not None and cancel_event.is_set():
+                result.update(status='cancelled', message=f"Upload cancelled. File {os.path.basename(file_path)} was not processed.")
+                results.append(result)
+                continue
+            if progress_callback:
+                progress_callback('file', index, len(parsed_frames), os.path.basename(file_path))
+            result['unexpected_columns'] = preflights[file_path]['unexpected_columns']
+            file_confirm_replace = confirm_replace
+            if file_path in decisions:
+                file_confirm_replace = lambda description, replace=decisions[file_path]: replace
+            results.append(self.process_parsed_file(file_path, df, file_confirm_replace, progress_callback, result, backfill))
+        if progress_callback:
+            progress_callback('file', len(parsed_frames), len(parsed_frames), '')
+        virality_start = time.perf_counter()
+        self.refresh_virality_metrics(results)
+        stage_seconds['virality'] = time.perf_counter() - virality_start
 
-            return True
+        self.ingest_ledger.record_run(source, results, stage_seconds, time.perf_counter() - start, started_at)
+        return results
+
+    def preflight_files(self, file_paths, backfill=False):
+        """
+        Read only the date range and header of every file, in parallel, without parsing their data.
+
+        Args:
+            file_paths (list): The paths to the export files.
+            backfill (bool): Accept exports covering several days.
 
+        Returns:
+            list: A pre-flight dictionary per file, as described in preflight_file.
+        """
+        if not file_paths:
+            return []
+        parse_cache = self.data_manager.parse_cache
+        reader = ExportReader(parse_cache.column_mapping, parse_cache.engine)
+        with ThreadPoolExecutor(max_workers=min(len(file_paths), PREFLIGHT_WORKERS)) as executor:
+            return list(executor.map(lambda file_path: self.preflight_file(reader, file_path, backfill), file_paths))
+
+    def preflight_file(self, reader, file_path, backfill=False):
+        """
+        Check the date range and header of a single file.
+
+        Args:
+            reader (ExportReader): The reader to scan the file with.
+            file_path (str): The path to the export file.
+            backfill (bool): Accept exports covering several days.
+
+        Returns:
+            dict: The pre-flight result:
+                file: The file path.
+                dates: The days the file's date range covers, or None if only its data can tell.
+                missing_columns: Required columns the header lacks.
+                unexpected_columns: Header columns the tracker does not know, which are ignored.
+                error: Why the file cannot be ingested, or None.
+        """
+        preflight = {'file': file_path, 'dates': None, 'missing_columns': [], 'unexpected_columns': [], 'error': None}
+        try:
+            date_bounds, header = reader.scan(file_path)
         except Exception as e:
-            error_message = f"An unexpected error occurred: {str(e)}\n\nPlease check the log for more details."
-            messagebox.showerror("Error", error_message)
-            logging.error(f"Error in upload_file: {str(e)}", exc_info=True)
-            return False
+            logging.error(f"Error scanning file {file_path}: {str(e)}")
+            preflight['error'] = str(e)
+            return preflight
+
+        preflight['missing_columns'] = [column for column in REQUIRED_COLUMNS if column not in header]
+        preflight['unexpected_columns'] = [column for column in header
+                                           if column and column not in REQUIRED_COLUMNS and column not in PER_DAY_DATE_COLUMNS]
+        if preflight['unexpected_columns']:
+            logging.warning(f"Unexpected columns in {file_path}: {', '.join(preflight['unexpected_columns'])}")
+
+        if preflight['missing_columns']:
+            preflight['error'] = f"Missing expected columns: {', '.join(preflight['missing_columns'])}"
+        elif date_bounds is not None:
+            start = datetime.strptime(date_bounds[0], '%Y-%m-%d')
+            days = [(start + timedelta(days=offset)).strftime('%Y-%m-%d')
+                    for offset in range((datetime.strptime(date_bounds[1], '%Y-%m-%d') - start).days + 1)]
+            if len(days) > 1 and not any(column in header for column in PER_DAY_DATE_COLUMNS):
+                preflight['error'] = "Data spans more than one day and has no per-day date column, so it cannot be split by day."
+            elif len(days) > 1 and not backfill:
+                preflight['error'] = "Data spans more than one day. Please provide data for a single day only, or use backfill mode."
+            else:
+                preflight['dates'] = days
+        return preflight
+
+    def find_conflicts(self, preflights):
+        """
+        Find the files covering days that already have data or that another selected file also covers.
+
+        Args:
+            preflights (list): The pre-flight results of the files to write.
+
+        Returns:
+            list: A conflict dictionary per affected file, with the keys:
+                file: The file path.
+                existing_dates: The file's days that already have data in the database.
+                duplicate_files: The other selected files covering some of the same days.
+        """
+        files_by_day = {}
+        for preflight in preflights:
+            for day in preflight['dates'] or []:
+                files_by_day.setdefault(day, []).append(preflight['file'])
+        existing_dates = set(self.data_manager.get_existing_dates(sorted(files_by_day)))
+
+        conflicts = []
+        for preflight in preflights:
+            days = preflight['dates'] or []
+            conflict = {
+                'file': preflight['file'],
+                'existing_dates': [day for day in days if day in existing_dates],
+                'duplicate_files': sorted({other for day in days for other in files_by_day[day] if other != preflight['file']}),
+            }
+            if conflict['existing_dates'] or conflict['duplicate_files']:
+                conflicts.append(conflict)
+        return conflicts
+
+    def refresh_virality_metrics(self, results):
+        """
+        Refresh the virality metrics once for all the videos a batch of files wrote or replaced.
+
+        Args:
+            results (list): The per-file results of the batch.
+        """
+        video_ids = list(dict.fromkeys(video_id for result in results for video_id in result['video_ids']))
+        if not video_ids:
+            return
+        try:
+            self.virality_calculator.refresh_virality_metrics(video_ids)
+        except Exception as e:
+            # The data itself is already committed, so a failed refresh doesn't fail the upload
+            logging.error(f"Error refreshing virality metrics: {str(e)}", exc_info=True)
+
+    def parse_files(self, file_paths):
+        """
+        Parse Excel files in a process pool so that workbooks are read on all cores at once.
+        Files that were parsed before are loaded from the parse cache instead.
+
+        Args:
+            file_paths (list): The paths to the Excel files to parse.
+
+        Returns:
+            list: A (file_path, DataFrame, result) tuple per file. The DataFrame is None if parsing failed.
+        """
+        parse_cache = self.data_manager.parse_cache
+        if not file_paths:
+            return []
+        if len(file_paths) == 1:
+            # Not worth starting a process pool for a single file
+            return [self.collect_parse_result(file_paths[0], lambda: read_export_timed(parse_cache, file_paths[0]))]
+
+        max_workers = min(len(file_paths), os.cpu_count() or 1)
+        # Use spawn so workers do not inherit the GUI state or database connection
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = [executor.submit(read_export_timed, parse_cache, file_path) for file_path in file_paths]
+            return [self.collect_parse_result(file_path, future.result) for file_path, future in zip(file_paths, futures)]
+
+    def collect_parse_result(self, file_path, read):
+        """
+        Run a timed parse and turn its outcome into a (file_path, DataFrame, result) tuple.
+
+        Args:
+            file_path (str): The path to the Excel file being parsed.
+            read (callable): Returns the parsed DataFrame and the parse time, or raises.
+
+        Returns:
+            tuple: The file path, the DataFrame or None, and the result dictionary.
+        """
+        result = self.make_result(file_path)
+        try:
+            df, read_seconds = read()
+            # Converting the columns to the typed schema is timed separately from reading the file
+            result['clean_seconds'] = df.attrs.get('conversion_seconds', 0.0)
+            result['parse_seconds'] = read_seconds - result['clean_seconds']
+            result['rows_read'] = len(df)
+            logging.info(f"Successfully read Excel file: {file_path}")
+            return file_path, df, result
+        except ValueError as ve:
+            logging.error(f"Error processing Excel file: {str(ve)}")
+            result.update(status='error', message=f"Error processing file {os.path.basename(file_path)}: {str(ve)}")
+        except Exception as e:
+            logging.error(f"Error reading Excel file: {str(e)}")
+            result.update(status='error', message=f"Unexpected error processing file {os.path.basename(file_path)}: {str(e)}")
+        return file_path, None, result
+
+    def make_result(self, file_path):
+        """
+        Create the result dictionary reported for each processed file.
+
+        Keys:
+            file: The file path.
+            date: The performance date, once known.
+            status: 'processed', 'replaced', 'skipped', 'cancelled' or 'error'.
+            message: A human readable description of the outcome.
+            rows_read: Rows in the export.
+            rows_filtered: Rows kept by the VV threshold and dormancy filter.
+            rows_written: Rows inserted or updated in the database.
+            rows_inserted, rows_updated, rows_unchanged, rows_deleted: Daily performance rows by outcome.
+                Unchanged rows were already stored with the same values and were not rewritten.
+            rows_promoted: Earlier sub-threshold rows moved from the shadow store for newly tracked videos.
+            rows_dormant: Rows of dormant videos that were not ingested.
+            dormant_rows: The (video_id, performance_date) pairs of those rows.
+            parse_seconds, clean_seconds, filter_seconds, write_seconds, totals_seconds: Time spent reading
+                the file, converting its columns, filtering its rows, writing them and refreshing the totals.
+            conversion_failures: Column name to the Video IDs of the rows whose value could not be converted.
+            unexpected_columns: Columns in the file the tracker does not know, which were ignored.
+            video_ids: The IDs of the videos whose data changed.
+            retryable: The error may pass on its own, such as a locked database, so the unchanged file can be tried again.
+
+        Args:
+            file_path (str): The path to the Excel file.
+
+        Returns:
+            dict: The empty result.
+        """
+        return {
+            'file': file_path,
+            'date': None,
+            'status': None,
+            'message': '',
+            'rows_read': 0,
+            'rows_filtered': 0,
+            'rows_written': 0,
+            'rows_inserted': 0,
+            'rows_updated': 0,
+            'rows_unchanged': 0,
+            'rows_deleted': 0,
+            'rows_promoted': 0,
+            'rows_dormant': 0,
+            'dormant_rows': [],
+            'parse_seconds': 0.0,
+            'clean_seconds': 0.0,
+            'filter_seconds': 0.0,
+            'write_seconds': 0.0,
+            'totals_seconds': 0.0,
+            'conversion_failures': {},
+            'unexpected_columns': [],
+            'video_ids': [],
+            'retryable': False,
+        }
 
     def process_single_file(self, file_path):
         """
@@ -60,30 +424,170 @@ class FileHandler:
             file_path (str): The path to the Excel file to process.
 
         Returns:
-            str: A message indicating the result of the processing.
+            dict: The result of the processing, as described in make_result.
+        """
+        _, df, result = self.collect_parse_result(file_path, lambda: read_export_timed(self.data_manager.parse_cache, file_path))
+        if result['status'] == 'error':
+            return result
+        return self.process_parsed_file(file_path, df, result=result)
+
+    def process_parsed_file(self, file_path, df, confirm_replace=None, progress_callback=None, result=None, backfill=False):
         """
+        Filter already parsed video performance data and insert it into the database.
+
+        In backfill mode, exports covering several days are accepted and written with process_backfill.
+        Otherwise an export must cover a single day.
+
+        Args:
+            file_path (str): The path to the Excel file the data was read from.
+            df (DataFrame): The parsed data.
+            confirm_replace (callable): Called with a date that already has data. Returns True to replace it.
+            progress_callback (callable): Receives per-row write progress.
+            result (dict): The result started while parsing, if any.
+            backfill (bool): Accept exports covering several days.
+
+        Returns:
+            dict: The result of the processing, as described in make_result.
+        """
+        confirm_replace = confirm_replace or self.ask_replace_existing_data
+        result = result or self.make_result(file_path)
+        row_progress = None
+        if progress_callback:
+            row_progress = lambda done, total: progress_callback('rows', done, total, '')
+
+        start = time.perf_counter()
         try:
-            df = self.data_manager.read_video_performance_excel(file_path)
+            dates = sorted(df['performance_date'].unique())
+            if len(dates) > 1 and not backfill:
+                raise ValueError("Data spans more than one day. Please provide data for a single day only, or use backfill mode.")
+
             filtered_df = self.data_manager.filter_videos(df)
-            
+            result['filter_seconds'] = time.perf_counter() - start
+            result['rows_filtered'] = len(filtered_df)
+            # The rows left out are kept in the shadow store, in case their videos are tracked later
+            shadow_df = df.drop(filtered_df.index)
+            result['rows_dormant'] = filtered_df.attrs['dormant_rows_skipped']
+            result['dormant_rows'] = filtered_df.attrs['dormant_rows']
+            date = dates[0] if len(dates) == 1 else f"{dates[0]} ~ {dates[-1]}"
+            result['date'] = date
+            if len(dates) > 1:
+                self.process_backfill(filtered_df, shadow_df, dates, confirm_replace, row_progress, result)
             # Check if data already exists for this date
-            date = filtered_df['performance_date'].iloc[0]
-            if self.data_manager.check_existing_data(date):
-                response = messagebox.askyesno("Data Already Exists", 
-                    f"Data for {date} already exists in the database. Do you want to replace it?")
-                if response:
-                    self.data_manager.replace_data_for_date(filtered_df, date)
-                    messagebox.showinfo("Success", f"Data for {date} has been replaced successfully!")
-                    return f"File for {date} processed successfully."
+            elif self.data_manager.check_existing_data(date):
+                if confirm_replace(date):
+                    self.record_write_summary(result, self.data_manager.replace_data_for_date(filtered_df, date, progress_callback=row_progress,
+                                                                                               shadow_df=shadow_df))
+                    result.update(status='replaced', message=f"File for {date} replaced successfully.")
                 else:
-                    return f"Data for {date} already exists in the database. Skipped."        
+                    result.update(status='skipped', message=f"Data for {date} already exists in the database. Skipped.")
             else:
-                self.data_manager.insert_or_update_records(filtered_df)
-                return f"File for {date} processed successfully."
+                self.record_write_summary(result, self.data_manager.insert_or_update_records(filtered_df, progress_callback=row_progress,
+                                                                                                   shadow_df=shadow_df))
+                result.update(status='processed', message=f"File for {date} processed successfully.")
+            # Values that failed conversion were stored as empty, so point them out
+            result['conversion_failures'] = df.attrs.get('conversion_failures', {})
+            if result['conversion_failures'] and result['status'] in PROCESSED_STATUSES:
+                counts = ', '.join(f"{column} ({len(video_ids)})" for column, video_ids in result['conversion_failures'].items())
+                result['message'] += f" Some values could not be converted and were left empty: {counts}."
+            if result['unexpected_columns'] and result['status'] in PROCESSED_STATUSES:
+                result['message'] += f" Unexpected columns were ignored: {', '.join(result['unexpected_columns'])}."
         except ValueError as ve:
-            return f"Error processing file {os.path.basename(file_path)}: {str(ve)}"
+            result.update(status='error', message=f"Error processing file {os.path.basename(file_path)}: {str(ve)}")
+        except sqlite3.OperationalError as oe:
+            result.update(status='error', retryable=True,
+                          message=f"Database error processing file {os.path.basename(file_path)}: {str(oe)}")
+        except Exception as e:
+            result.update(status='error', message=f"Unexpected error processing file {os.path.basename(file_path)}: {str(e)}")
+        result['write_seconds'] = time.perf_counter() - start - result['filter_seconds'] - result['totals_seconds']
+        return result
+
+    def process_backfill(self, filtered_df, shadow_df, dates, confirm_replace, progress_callback, result):
+        """
+        Write an export covering several days in one transaction.
+
+        Days that already have data are all replaced or all skipped, with a single confirmation.
+
+        Args:
+            filtered_df (DataFrame): The filtered video performance data.
+            shadow_df (DataFrame): The rows left out by the filter, for the shadow store.
+            dates (list): The sorted performance dates in the export.
+            confirm_replace (callable): Called once with a description of the days that already have data.
+            progress_callback (callable): Receives per-row write progress.
+            result (dict): The result to update.
+        """
+        existing_dates = self.data_manager.get_existing_dates(dates)
+        replace_dates = []
+        if existing_dates:
+            if len(existing_dates) == 1:
+                description = existing_dates[0]
+            else:
+                description = f"{len(existing_dates)} days between {existing_dates[0]} and {existing_dates[-1]}"
+            if confirm_replace(description):
+                replace_dates = existing_dates
+            else:
+                filtered_df = filtered_df[~filtered_df['performance_date'].isin(existing_dates)]
+                shadow_df = shadow_df[~shadow_df['performance_date'].isin(existing_dates)]
+
+        written_days = len(dates) - len(existing_dates) + len(replace_dates)
+        if written_days == 0:
+            result.update(status='skipped', message=f"Data for all {len(dates)} days from {dates[0]} to {dates[-1]} already exists in the database. Skipped.")
+            return
+
+        self.record_write_summary(result, self.data_manager.backfill_records(filtered_df, replace_dates, progress_callback=progress_callback,
+                                                                             shadow_df=shadow_df))
+        days = lambda count: f"{count} day" if count == 1 else f"{count} days"
+        message = f"Backfilled {days(written_days)} from {dates[0]} to {dates[-1]}."
+        if existing_dates and not replace_dates:
+            message += f" Skipped {days(len(existing_dates))} that already had data."
+        elif replace_dates:
+            message += f" Replaced {days(len(replace_dates))} that already had data."
+        result.update(status='replaced' if replace_dates else 'processed', message=message)
+
+    def record_write_summary(self, result, summary):
+        """
+        Copy the row counts and changed videos from a DataManager write summary into a file result.
+
+        Args:
+            result (dict): The file result to update.
+            summary (dict): The write summary returned by the DataManager write methods.
+        """
+        result.update(
+            rows_written=summary['inserted'] + summary['updated'],
+            rows_inserted=summary['inserted'],
+            rows_updated=summary['updated'],
+            rows_unchanged=summary['unchanged'],
+            rows_deleted=summary['deleted'],
+            rows_promoted=summary['promoted'],
+            video_ids=summary['video_ids'],
+            totals_seconds=summary['totals_seconds'],
+        )
+
+    def clear_video_performance(self, master):
+        """
+        Clear video performance data for a specified date after user confirmation.
+        Ensures data integrity by creating a backup before deletion.
+        """
+        # Create a simple dialog to get the date, specifying the parent window
+        date = simpledialog.askstring("Clear Video Performance", "Enter date to clear (YYYY-MM-DD):", parent=master)
+        if not date:
+            return
+        try:
+            # Validate date format
+            datetime.strptime(date, "%Y-%m-%d")
+        except ValueError:
+            messagebox.showerror("Error", "Invalid date format. Please use YYYY-MM-DD.", parent=master)
+            return
+
+        try:
+            result = self.data_manager.clear_data_for_date(date)
+            if result:
+                messagebox.showinfo("Success", f"Data for {date} has been cleared. A backup was created before clearing.", parent=master)
+            else:
+                messagebox.showinfo("Info", f"No data found for {date}.", parent=master)
         except Exception as e:
-            return f"Unexpected error processing file {os.path.basename(file_path)}: {str(e)}"
+            error_message = f"An error occurred while clearing data: {str(e)}\n\nPlease check the log for more details."
+            messagebox.showerror("Error", error_message, parent=master)
+            logging.error(f"Error in clear_video_performance: {str(e)}", exc_info=True)
 
     def restore_database(self):
         """
@@ -96,7 +600,7 @@ class FileHandler:
         backup_path = filedialog.askopenfilename(
             initialdir=initial_dir,
             title="Select Database Backup",
-            filetypes=[("Database files", "*.db")]
+            filetypes=[("Database backups", "*.db *.gz *.zst")]
         )
         
         if backup_path:
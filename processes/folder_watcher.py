@@ -0,0 +1,160 @@
+#folder_watcher.py is the file that handles watching a folder and ingesting new or changed export files.
+import logging
+import os
+import time
+from .export_reader import EXPORT_EXTENSIONS
+from .file_handler import FileHandler
+
+# logging configuration
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Times an unchanged file is tried again after an error that may pass on its own, such as a locked database.
+# The wait before each retry doubles, starting at settle_seconds.
+MAX_RETRIES = 5
+
+class FolderWatcher:
+    def __init__(self, data_manager, folder, settle_seconds=5.0, on_conflict='replace'):
+        """
+        Initialize the FolderWatcher.
+
+        A file is only ingested once its size and modification time have stayed the same for
+        settle_seconds, so exports that are still being copied into the folder are left alone.
+        Ingested files are recorded in the ingested_files table with the size and modification time
+        they had, so a restart only picks up files that are new or changed since. Files that fail are
+        recorded too, with an 'error' status, and are only tried again once they change, except after
+        errors that may pass on their own, which are retried up to MAX_RETRIES times with a growing wait.
+
+        Args:
+            data_manager (DataManager): An instance of the DataManager class.
+            folder (str): The directory to watch.
+            settle_seconds (float): How long a file must stay unchanged before it is ingested.
+            on_conflict (str): 'replace' or 'skip' when data for a file's date already exists.
+        """
+        self.data_manager = data_manager
+        self.file_handler = FileHandler(data_manager)
+        self.folder = folder
+        self.settle_seconds = settle_seconds
+        self.on_conflict = on_conflict
+        # File path to ((size, mtime_ns), time the signature was first seen)
+        self.pending = {}
+        # File path to ((size, mtime_ns), retries so far, time of the next retry)
+        self.retries = {}
+
+    def scan(self):
+        """
+        List the export files in the watched folder with their current signature.
+
+        Returns:
+            dict: File path to a (size, mtime_ns) tuple.
+        """
+        signatures = {}
+        for name in os.listdir(self.folder):
+            # Skip the lock files Excel leaves next to open workbooks
+            if not name.lower().endswith(EXPORT_EXTENSIONS) or name.startswith('~$'):
+                continue
+            file_path = os.path.abspath(os.path.join(self.folder, name))
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            signatures[file_path] = (stat.st_size, stat.st_mtime_ns)
+        return signatures
+
+    def settled_files(self, now=None):
+        """
+        Return the new or changed files whose signature has not changed for settle_seconds.
+
+        Args:
+            now (float): The current monotonic time. Defaults to time.monotonic().
+
+        Returns:
+            list: The file paths ready to be ingested.
+        """
+        now = time.monotonic() if now is None else now
+        ingested = self.data_manager.get_ingested_files()
+        signatures = self.scan()
+
+        # Forget pending and retried files that were deleted
+        self.pending = {path: entry for path, entry in self.pending.items() if path in signatures}
+        self.retries = {path: entry for path, entry in self.retries.items() if path in signatures}
+
+        ready = []
+        for file_path, signature in signatures.items():
+            if ingested.get(file_path) == signature:
+                continue
+            retry = self.retries.get(file_path)
+            if retry is not None:
+                if retry[0] == signature:
+                    if now >= retry[2]:
+                        ready.append(file_path)
+                    continue
+                # A file that changed since it failed settles again like a new file
+                del self.retries[file_path]
+            previous = self.pending.get(file_path)
+            if previous is None or previous[0] != signature:
+                self.pending[file_path] = (signature, now)
+            elif now - previous[1] >= self.settle_seconds:
+                ready.append(file_path)
+        return ready
+
+    def poll_once(self):
+        """
+        Ingest the files that are ready as one batch, so the virality metrics are refreshed once for all of them.
+
+        Returns:
+            list: The per-file results from FileHandler.process_files.
+        """
+        file_paths = self.settled_files()
+        if not file_paths:
+            return []
+
+        # The attempt that failed already took a backup, so a poll that only retries files doesn't take another
+        retrying = [file_path for file_path in file_paths if file_path in self.retries]
+        logging.info(f"Ingesting {len(file_paths)} file(s) from {self.folder}, {len(retrying)} of them retried")
+        results = self.file_handler.process_files(
+            file_paths,
+            confirm_replace=lambda date: self.on_conflict == 'replace',
+            backup=len(retrying) < len(file_paths),
+            source='watch'
+        )
+
+        now = time.monotonic()
+        ledger = []
+        for result in results:
+            if result['status'] == 'cancelled':
+                continue
+            if result['file'] in self.retries:
+                signature, attempts, _ = self.retries.pop(result['file'])
+            else:
+                (signature, _), attempts = self.pending.pop(result['file']), 0
+            if result['status'] == 'error' and result['retryable'] and attempts < MAX_RETRIES:
+                delay = self.settle_seconds * 2 ** attempts
+                self.retries[result['file']] = (signature, attempts + 1, now + delay)
+                logging.warning(f"Will retry {result['file']} in {delay:.0f}s")
+                continue
+            if result['status'] == 'error':
+                logging.warning(f"Will not retry {result['file']} until it changes")
+            # Files are recorded with the signature they had when they settled, so a file that
+            # changed while it was being ingested is picked up again on a later poll
+            ledger.append((result['file'], signature[0], signature[1], result['date'], result['status']))
+        self.data_manager.record_ingested_files(ledger)
+        return results
+
+    def run_forever(self, interval=10.0, on_results=None):
+        """
+        Poll the folder until interrupted.
+
+        Args:
+            interval (float): Seconds between polls.
+            on_results (callable): Called with the results of every poll that ingested files.
+        """
+        logging.info(f"Watching {self.folder} for export files every {interval}s")
+        while True:
+            try:
+                results = self.poll_once()
+                if results and on_results:
+                    on_results(results)
+            except Exception as e:
+                # A failed poll is logged and retried on the next interval instead of stopping the watcher
+                logging.error(f"Error while watching {self.folder}: {str(e)}", exc_info=True)
+            time.sleep(interval)
@@ -0,0 +1,174 @@
+#ingest_ledger.py is the file that handles recording ingestion runs and querying their throughput over time.
+import logging
+import os
+from datetime import datetime
+import pandas as pd
+
+# logging configuration
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Stages timed once per upload batch
+RUN_STAGES = ['backup', 'preflight', 'virality']
+# Stages timed for every file in a batch
+FILE_STAGES = ['parse', 'clean', 'filter', 'write', 'totals']
+
+class IngestLedger:
+    def __init__(self, data_manager):
+        """
+        Initialize the IngestLedger, which stores every upload batch in the ingest_runs table,
+        every file in it in the ingest_run_files table and the rows each file skipped as dormant
+        in the ingest_run_dormant_rows table.
+
+        Args:
+            data_manager (DataManager): An instance of the DataManager class.
+        """
+        self.data_manager = data_manager
+
+    def record_run(self, source, results, stage_seconds, total_seconds, started_at=None):
+        """
+        Record an upload batch and its files.
+
+        Args:
+            source (str): What started the upload, such as 'gui', 'cli' or 'watch'.
+            results (list): The per-file results from FileHandler.process_files.
+            stage_seconds (dict): Seconds spent in each of RUN_STAGES for the whole batch.
+            total_seconds (float): The wall time of the batch.
+            started_at (datetime): When the batch started. Defaults to now.
+
+        Returns:
+            int: The run_id of the recorded run.
+        """
+        started_at = started_at or datetime.now()
+        conn = self.data_manager.conn
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO ingest_runs (started_at, source, files, files_processed, files_failed, rows_read, rows_written,
+                                         backup_seconds, preflight_seconds, virality_seconds, total_seconds)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                started_at.isoformat(timespec='seconds'), source, len(results),
+                sum(result['status'] in ('processed', 'replaced') for result in results),
+                sum(result['status'] == 'error' for result in results),
+                sum(result['rows_read'] for result in results),
+                sum(result['rows_written'] for result in results),
+                *(stage_seconds.get(stage, 0.0) for stage in RUN_STAGES), total_seconds
+            ))
+            run_id = cursor.lastrowid
+            cursor.executemany('''
+                INSERT OR REPLACE INTO ingest_run_files (run_id, file_path, file_size, file_mtime_ns, file_sha256, performance_date,
+                    status, rows_read, rows_filtered, rows_inserted, rows_updated, rows_unchanged, rows_deleted, rows_dormant,
+                    parse_seconds, clean_seconds, filter_seconds, write_seconds, totals_seconds)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (run_id, result['file'], *self.fingerprint(result['file']), result['date'], result['status'],
+                 result['rows_read'], result['rows_filtered'], result['rows_inserted'], result['rows_updated'],
+                 result['rows_unchanged'], result['rows_deleted'], result['rows_dormant'],
+                 *(result[f'{stage}_seconds'] for stage in FILE_STAGES))
+                for result in results
+            ])
+            cursor.executemany(
+                "INSERT OR IGNORE INTO ingest_run_dormant_rows (run_id, file_path, video_id, performance_date) VALUES (?, ?, ?, ?)",
+                [(run_id, result['file'], video_id, performance_date)
+                 for result in results for video_id, performance_date in result['dormant_rows']]
+            )
+            conn.commit()
+            logging.info(f"Recorded ingestion run {run_id}: {len(results)} file(s) in {total_seconds:.2f}s")
+            return run_id
+        except Exception as e:
+            # The ledger is diagnostic only, so failing to record a run doesn't fail the upload
+            logging.error(f"Error recording ingestion run: {str(e)}")
+            conn.rollback()
+            return None
+
+    def fingerprint(self, file_path):
+        """
+        Return the size, modification time and content hash of an ingested file.
+
+        Args:
+            file_path (str): The path to the file.
+
+        Returns:
+            tuple: The size, mtime_ns and sha256, or Nones if the file can no longer be read.
+        """
+        try:
+            record = self.data_manager.parse_cache.fingerprint(file_path)
+            return record['size'], record['mtime'], record['sha256']
+        except OSError:
+            return None, None, None
+
+    def get_runs(self, limit=50):
+        """
+        Return the most recent runs, newest first, with their per-file stage times summed.
+
+        Args:
+            limit (int): The maximum number of runs to return.
+
+        Returns:
+            DataFrame: One row per run, with the ingest_runs columns, a <stage>_seconds column per
+                       stage, rows_per_second and slowest_stage.
+        """
+        with self.data_manager.connections.reader() as conn:
+            df = pd.read_sql_query(f'''
+                SELECT r.*, {', '.join(f'COALESCE(SUM(f.{stage}_seconds), 0) AS {stage}_seconds' for stage in FILE_STAGES)}
+                FROM ingest_runs r
+                LEFT JOIN ingest_run_files f ON f.run_id = r.run_id
+                GROUP BY r.run_id
+                ORDER BY r.run_id DESC
+                LIMIT ?
+            ''', conn, params=(limit,))
+        stage_columns = [f'{stage}_seconds' for stage in RUN_STAGES + FILE_STAGES]
+        df['rows_per_second'] = (df['rows_read'] / df['total_seconds'].where(df['total_seconds'] > 0)).fillna(0.0)
+        df['slowest_stage'] = None
+        if not df.empty:
+            df['slowest_stage'] = df[stage_columns].fillna(0.0).idxmax(axis=1).str.replace('_seconds', '')
+        return df
+
+    def get_run_files(self, run_id):
+        """
+        Return the files of a run.
+
+        Args:
+            run_id (int): The run to look up.
+
+        Returns:
+            DataFrame: The ingest_run_files rows of the run, with a file_name column.
+        """
+        with self.data_manager.connections.reader() as conn:
+            df = pd.read_sql_query("SELECT * FROM ingest_run_files WHERE run_id = ? ORDER BY performance_date",
+                                   conn, params=(run_id,))
+        df['file_name'] = df['file_path'].map(os.path.basename)
+        return df
+
+    def get_daily_trends(self, days=90):
+        """
+        Summarise the runs of each day, to show how ingestion throughput changes as the database grows.
+
+        Args:
+            days (int): How many days back to include.
+
+        Returns:
+            DataFrame: One row per day with the runs, files, rows read and written, the seconds spent
+                       in each stage, the total seconds and rows_per_second.
+        """
+        with self.data_manager.connections.reader() as conn:
+            df = pd.read_sql_query(f'''
+                SELECT date(r.started_at) AS day,
+                    COUNT(*) AS runs,
+                    SUM(r.files) AS files,
+                    SUM(r.rows_read) AS rows_read,
+                    SUM(r.rows_written) AS rows_written,
+                    {', '.join(f'SUM(r.{stage}_seconds) AS {stage}_seconds' for stage in RUN_STAGES)},
+                    {', '.join(f'SUM(COALESCE(f.{stage}_seconds, 0)) AS {stage}_seconds' for stage in FILE_STAGES)},
+                    SUM(r.total_seconds) AS total_seconds
+                FROM ingest_runs r
+                LEFT JOIN (
+                    SELECT run_id, {', '.join(f'SUM({stage}_seconds) AS {stage}_seconds' for stage in FILE_STAGES)}
+                    FROM ingest_run_files GROUP BY run_id
+                ) f ON f.run_id = r.run_id
+                WHERE r.started_at >= date('now', 'localtime', ?)
+                GROUP BY day
+                ORDER BY day
+            ''', conn, params=(f'-{days} days',))
+        df['rows_per_second'] = (df['rows_read'] / df['total_seconds'].where(df['total_seconds'] > 0)).fillna(0.0)
+        return df
@@ -0,0 +1,97 @@
+#ingestion_worker.py is the file that handles running file uploads in the background.
+import logging
+import queue
+import threading
+from .data_manager import DataManager
+from .file_handler import FileHandler
+
+# logging configuration
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class IngestionWorker(threading.Thread):
+    def __init__(self, file_paths):
+        """
+        Initialize the IngestionWorker, which parses and writes export files off the Tk main thread.
+
+        The worker communicates only through the events queue, which the GUI polls:
+            ('progress', stage, done, total, detail): Progress of the 'parse', 'file' or 'rows' stage.
+            ('conflicts', conflicts): The pre-flight check found date conflicts. Answer through answer_confirmation
+                with a dictionary of file path to True to replace or False to skip.
+            ('confirm', date): Existing data was found while writing. Answer through answer_confirmation.
+            ('done', results): Finished, with the per-file results from FileHandler.process_files.
+            ('error', message): The upload failed.
+
+        Args:
+            file_paths (list): The paths to the Excel files to upload.
+        """
+        super().__init__(daemon=True)
+        self.file_paths = file_paths
+        self.events = queue.Queue()
+        self.confirmations = queue.Queue()
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        """
+        Process the files, backing up the database first, and report the results through the events queue.
+        """
+        data_manager = None
+        try:
+            # The writer connection is bound to the thread that created it, so the worker opens its own.
+            # In WAL mode the GUI keeps reading while the worker writes.
+            data_manager = DataManager()
+            file_handler = FileHandler(data_manager)
+
+            # The database is backed up before processing any files
+            results = file_handler.process_files(
+                self.file_paths,
+                confirm_replace=self.request_confirmation,
+                resolve_conflicts=self.request_conflict_resolution,
+                progress_callback=self.report_progress,
+                cancel_event=self.cancel_event,
+                backup=True
+            )
+            self.events.put(('done', results))
+        except Exception as e:
+            logging.error(f"Error in ingestion worker: {str(e)}", exc_info=True)
+            self.events.put(('error', str(e)))
+        finally:
+            if data_manager:
+                data_manager.close()
+
+    def report_progress(self, stage, done, total, detail):
+        """Forward a progress update to the GUI."""
+        self.events.put(('progress', stage, done, total, detail))
+
+    def request_confirmation(self, date):
+        """
+        Ask the GUI whether existing data for a date should be replaced and wait for the answer.
+
+        Args:
+            date (str): The performance date that already has data.
+
+        Returns:
+            bool: True if the data should be replaced.
+        """
+        self.events.put(('confirm', date))
+        return self.confirmations.get()
+
+    def request_conflict_resolution(self, conflicts):
+        """
+        Ask the GUI once how all the conflicts found before parsing should be handled, and wait for the answer.
+
+        Args:
+            conflicts (list): The conflicts found by FileHandler.find_conflicts.
+
+        Returns:
+            dict: File path to True to replace the existing data or False to skip the file.
+        """
+        self.events.put(('conflicts', conflicts))
+        return self.confirmations.get()
+
+    def answer_confirmation(self, replace):
+        """Answer a pending confirmation or conflict resolution request from the GUI thread."""
+        self.confirmations.put(replace)
+
+    def cancel(self):
+        """Stop the upload before the next file is written."""
+        self.cancel_event.set()
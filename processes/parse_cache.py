@@ -0,0 +1,145 @@
+#parse_cache.py is the file that handles caching parsed export files so they are only parsed from Excel once.
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import pandas as pd
+from .export_reader import ExportReader, PARSER_VERSION
+
+# logging configuration
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Parquet needs pyarrow. Without it, cached frames are stored as pickles.
+PARQUET_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+class ParseCache:
+    def __init__(self, cache_dir, column_mapping=None, engine=None):
+        """
+        Initialize the ParseCache.
+
+        Cached frames are keyed by the content hash of the export file plus a version tag made from
+        PARSER_VERSION and the column mapping, so changing either invalidates every entry.
+
+        Args:
+            cache_dir (str): The directory the cached frames are stored in.
+            column_mapping (dict): Export column name to database column name, passed to ExportReader.
+            engine (str): Name of the Excel engine to use on a cache miss.
+        """
+        self.cache_dir = cache_dir
+        self.column_mapping = column_mapping or {}
+        self.engine = engine
+        self.fingerprint_dir = os.path.join(cache_dir, 'fingerprints')
+        os.makedirs(self.fingerprint_dir, exist_ok=True)
+
+        version_source = json.dumps({'parser': PARSER_VERSION, 'column_mapping': self.column_mapping}, sort_keys=True)
+        self.version_tag = hashlib.sha256(version_source.encode()).hexdigest()[:12]
+        self.prune_stale_entries()
+
+    def read(self, file_path):
+        """
+        Return the parsed frame for an export file, parsing it only if it is not cached yet.
+
+        Args:
+            file_path (str): The path to the export file.
+
+        Returns:
+            DataFrame: The export data with a performance_date column.
+        """
+        entry_path = self.entry_path(self.fingerprint(file_path)['sha256'])
+        cached = self.load_entry(entry_path)
+        if cached is not None:
+            logging.info(f"Loaded parsed data for {file_path} from cache")
+            # The stored attrs describe the original parse, and nothing was converted this time
+            cached.attrs['conversion_seconds'] = 0.0
+            return cached
+
+        df = ExportReader(self.column_mapping, self.engine).read(file_path)
+        self.store_entry(entry_path, df)
+        return df
+
+    def fingerprint(self, file_path):
+        """
+        Return the size, modification time and content hash of a file.
+
+        The content hash is only recomputed when the size or modification time changed since
+        the file was last seen.
+
+        Args:
+            file_path (str): The path to the file.
+
+        Returns:
+            dict: The file's size, mtime and sha256.
+        """
+        stat = os.stat(file_path)
+        path_key = hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()
+        record_path = os.path.join(self.fingerprint_dir, f"{path_key}.json")
+        try:
+            with open(record_path, 'r') as f:
+                record = json.load(f)
+            if record['size'] == stat.st_size and record['mtime'] == stat.st_mtime_ns:
+                return record
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            pass
+
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        record = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+        with open(record_path, 'w') as f:
+            json.dump(record, f)
+        return record
+
+    def entry_path(self, content_hash):
+        """Return the cache file path for a content hash, without extension."""
+        return os.path.join(self.cache_dir, f"{content_hash}-{self.version_tag}")
+
+    def load_entry(self, entry_path):
+        """
+        Load a cached frame.
+
+        Args:
+            entry_path (str): The cache file path without extension.
+
+        Returns:
+            DataFrame: The cached frame, or None on a cache miss.
+        """
+        try:
+            if os.path.exists(entry_path + '.parquet'):
+                return pd.read_parquet(entry_path + '.parquet')
+            if os.path.exists(entry_path + '.pkl'):
+                return pd.read_pickle(entry_path + '.pkl')
+        except Exception as e:
+            # A corrupt entry is treated as a miss and overwritten
+            logging.warning(f"Could not read cache entry {entry_path}: {str(e)}")
+        return None
+
+    def store_entry(self, entry_path, df):
+        """
+        Store a parsed frame, as Parquet when possible and as a pickle otherwise.
+
+        Args:
+            entry_path (str): The cache file path without extension.
+            df (DataFrame): The parsed frame.
+        """
+        if PARQUET_AVAILABLE:
+            try:
+                df.to_parquet(entry_path + '.parquet', index=False)
+                return
+            except Exception as e:
+                # Mixed-type object columns cannot always be written to Parquet
+                logging.debug(f"Falling back to pickle for cache entry {entry_path}: {str(e)}")
+                if os.path.exists(entry_path + '.parquet'):
+                    os.remove(entry_path + '.parquet')
+        df.to_pickle(entry_path + '.pkl')
+
+    def prune_stale_entries(self):
+        """
+        Delete cached frames written by another parser version or column mapping.
+        """
+        for name in os.listdir(self.cache_dir):
+            stem, extension = os.path.splitext(name)
+            if extension in ('.parquet', '.pkl') and not stem.endswith(f"-{self.version_tag}"):
+                os.remove(os.path.join(self.cache_dir, name))
+                logging.info(f"Deleted stale cache entry {name}")
@@ -0,0 +1,150 @@
+#query_plans.py is the file that handles checking that the frequent database queries keep using indexes.
+import logging
+import re
+import sqlite3
+from datetime import date, timedelta
+from . import data_manager as dm
+from .virality_calculator import video_metrics_query
+
+# logging configuration
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Size of the synthetic database the plans are checked against
+SYNTHETIC_VIDEOS = 2000
+SYNTHETIC_DAYS = 180
+
+# Each check is (name, query, parameters, allowed scans, sorted by index). The parameters are built from
+# the sample values of the synthetic database. Allowed scans name the tables or aliases the query may read
+# in full, such as the video listing. Queries sorted by index must not sort their results in a temp b-tree.
+PLAN_CHECKS = [
+    ('check_existing_data', dm.CHECK_EXISTING_DATA_QUERY, lambda sample: (sample['date'],), (), False),
+    ('get_existing_dates', dm.EXISTING_DATES_QUERY, lambda sample: (), ('s',), False),
+    ('clear_data_for_date', dm.DATE_VIDEO_IDS_QUERY, lambda sample: (sample['date'],), (), False),
+    ('get_latest_performance_date', dm.LATEST_PERFORMANCE_DATE_QUERY, lambda sample: (), (), False),
+    ('get_videos_by_date', dm.VIDEOS_BY_DATE_QUERY, lambda sample: (sample['date'],), (), False),
+    ('get_all_videos', dm.ALL_VIDEOS_QUERY, lambda sample: (), ('v',), True),
+    ('search_videos', dm.SEARCH_VIDEOS_QUERY, lambda sample: (dm.search_expression(sample['search']),), (), False),
+    ('get_video_details', dm.VIDEO_DETAILS_QUERY, lambda sample: (sample['video_id'],), (), False),
+    ('get_time_series_data (daily)', dm.time_series_query('vv'), lambda sample: (sample['video_id'],), (), True),
+    ('get_time_series_data (weekly)', dm.time_series_query('ctr', 'Weekly', 'Sunday'), lambda sample: (sample['video_id'],), (), True),
+    ('get_time_series_data (monthly)', dm.time_series_query('video_finish_rate', 'Monthly'), lambda sample: (sample['video_id'],), (), True),
+    ('filter_videos', dm.TRACKED_VIDEOS_QUERY, lambda sample: (), ('s',), False),
+    ('write_video_metadata', dm.UNCHANGED_VIDEOS_QUERY, lambda sample: (), ('s',), False),
+    ('apply_staged_daily_performance (outcomes)', dm.STAGED_ROW_OUTCOMES_QUERY, lambda sample: (), ('s',), False),
+    ('get_video_metrics', video_metrics_query(date_range=True), lambda sample: (sample['week_start'], sample['date']), (), False),
+    ('get_video_metrics (videos)', video_metrics_query(date_range=True, staged_video_ids=True),
+     lambda sample: (sample['week_start'], sample['date']), ('staged_video_ids',), False),
+    ('apply_staged_daily_performance', dm.UPSERT_STAGED_DAILY_PERFORMANCE_QUERY, lambda sample: (), ('s',), False),
+    ('drop_unchanged_staged_rows', dm.DROP_UNCHANGED_STAGED_ROWS_QUERY, lambda sample: (), ('staged_daily_performance',), False),
+    ('promote_shadow_history', dm.PROMOTE_SHADOW_HISTORY_QUERY, lambda sample: (), ('staged_video_ids',), False),
+    ('refresh_video_totals', dm.REFRESH_VIDEO_TOTALS_QUERY, lambda sample: (), ('totals',), False),
+    *((f'refresh_rollups ({table}, {step})', dm.rollup_query(query, table), lambda sample: (), ('changed_days', 'c'), False)
+      for table in dm.ROLLUP_TABLES
+      for step, query in (('delete', dm.DELETE_CHANGED_ROLLUP_QUERY), ('insert', dm.REFRESH_ROLLUP_QUERY))),
+]
+
+def build_synthetic_database(database_file, videos=SYNTHETIC_VIDEOS, days=SYNTHETIC_DAYS):
+    """
+    Create a database with the app's schema and indexes, filled with synthetic videos and daily rows.
+
+    Args:
+        database_file (str): The path of the database to create.
+        videos (int): The number of videos.
+        days (int): The number of days of performance data per video.
+
+    Returns:
+        tuple: The DataManager connected to the database, and the sample values used as query parameters.
+    """
+    data_manager = dm.DataManager(database_file)
+    cursor = data_manager.conn.cursor()
+    first_day = date(2024, 1, 1)
+    dates = [(first_day + timedelta(days=offset)).isoformat() for offset in range(days)]
+    video_ids = [f"{7000000000000000000 + index}" for index in range(videos)]
+
+    cursor.executemany(
+        "INSERT INTO videos (video_id, video_info, time, creator_name, products) VALUES (?, ?, ?, ?, ?)",
+        [(video_id, f"Video {index}", f"{dates[index % days]} 10:00", f"creator{index % 50}", f"product{index % 20}")
+         for index, video_id in enumerate(video_ids)]
+    )
+    cursor.executemany(
+        "INSERT INTO daily_performance (video_id, performance_day, performance_date, vv, likes, comments, shares, video_revenue, row_hash) "
+        f"VALUES (?1, {dm.day_from_date('?2')}, ?2, ?3, ?4, ?5, ?6, ?7, ?8)",
+        ((video_id, day, (index * 37 + offset) % 9000, offset % 50, offset % 7, offset % 5, float(offset % 13), index * days + offset)
+         for index, video_id in enumerate(video_ids) for offset, day in enumerate(dates))
+    )
+    for table in dm.ROLLUP_TABLES:
+        cursor.execute(dm.rollup_query(dm.FILL_ROLLUP_QUERY, table))
+    cursor.execute("ANALYZE")
+    data_manager.conn.commit()
+
+    # The batch queries read from the temp tables an upload stages
+    data_manager.stage_video_ids(cursor, video_ids[:100])
+    data_manager.stage_dates(cursor, dates[-7:])
+    cursor.execute(dm.CREATE_STAGED_DAILY_PERFORMANCE_QUERY)
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS staged_video_hashes (video_id TEXT PRIMARY KEY, meta_hash INTEGER)")
+    data_manager.track_changed_days(cursor, f"SELECT video_id, performance_day FROM daily_performance "
+                                            f"WHERE performance_day = {dm.day_from_date('?')}", (dates[-1],))
+    # The week before the last day, or the whole history when it is shorter
+    sample = {'date': dates[-1], 'week_start': dates[max(-7, -len(dates))], 'video_id': video_ids[0], 'search': 'creator1 "Video 12"'}
+    return data_manager, sample
+
+def explain(conn, query, params):
+    """
+    Return the detail lines of a query's plan.
+
+    Args:
+        conn (sqlite3.Connection): The connection to plan the query on.
+        query (str): The SQL query.
+        params (tuple): The query parameters.
+
+    Returns:
+        list: The plan's detail strings, in plan order.
+    """
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()]
+
+def plan_problems(plan, allowed_scans=(), sorted_by_index=False):
+    """
+    Find the steps of a plan that read a whole table or sort in a temp b-tree when they should not.
+
+    Args:
+        plan (list): The plan's detail strings.
+        allowed_scans (tuple): Tables or aliases the query may read in full. Single-row steps and constrained
+                               virtual table lookups are always allowed.
+        sorted_by_index (bool): The query's ORDER BY must be satisfied by an index.
+
+    Returns:
+        list: A description of each problem. Empty if the plan is fine.
+    """
+    problems = []
+    for detail in plan:
+        scan = re.match(r'SCAN (?:temp\.)?(\w+)', detail)
+        # A virtual table step with constraints, such as a full-text MATCH, is a lookup rather than a scan
+        lookup = re.search(r'VIRTUAL TABLE INDEX \d+:\S', detail)
+        if scan and not lookup and not detail.startswith('SCAN CONSTANT ROW') and scan.group(1) not in allowed_scans:
+            problems.append(f"full scan: {detail}")
+        if sorted_by_index and detail.startswith('USE TEMP B-TREE FOR ORDER BY'):
+            problems.append(f"sort without index: {detail}")
+    return problems
+
+def check_query_plans(data_manager, sample):
+    """
+    Run EXPLAIN QUERY PLAN on every query in PLAN_CHECKS.
+
+    Args:
+        data_manager (DataManager): The DataManager connected to the database to check against.
+        sample (dict): The sample values used as query parameters.
+
+    Returns:
+        list: A dictionary per check with its name, plan and problems.
+    """
+    results = []
+    for name, query, params, allowed_scans, sorted_by_index in PLAN_CHECKS:
+        try:
+            plan = explain(data_manager.conn, query, params(sample))
+            problems = plan_problems(plan, allowed_scans, sorted_by_index)
+        except sqlite3.Error as e:
+            plan, problems = [], [f"could not plan the query: {str(e)}"]
+        if problems:
+            logging.warning(f"Query plan regression in {name}: {'; '.join(problems)}")
+        results.append({'name': name, 'plan': plan, 'problems': problems})
+    return results
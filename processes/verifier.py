@@ -0,0 +1,222 @@
+#verifier.py is the file that handles checking the stored performance data against the source export files.
+import logging
+import os
+import numpy as np
+import pandas as pd
+from .data_manager import DAILY_PERFORMANCE_COLUMNS, day_from_date
+
+# logging configuration
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# daily_performance columns compared between the exports and the database
+METRIC_COLUMNS = [column for column, _ in DAILY_PERFORMANCE_COLUMNS[2:]]
+
+# Sums of REAL columns can differ in the last digits depending on the order they were added in
+RELATIVE_TOLERANCE = 1e-9
+ABSOLUTE_TOLERANCE = 1e-6
+
+class DataVerifier:
+    def __init__(self, data_manager):
+        """
+        Initialize the DataVerifier.
+
+        Exports are checked one at a time. The row count and column sums of every date in an export are
+        compared with the same aggregates computed in SQL, and only the dates that differ are compared
+        row by row, so checking a year of unchanged data costs one grouped query per file.
+
+        Args:
+            data_manager (DataManager): An instance of the DataManager class.
+        """
+        self.data_manager = data_manager
+
+    def verify_files(self, file_paths, progress_callback=None):
+        """
+        Verify the stored data against a set of export files.
+
+        When several files cover the same date, each is compared with the database on its own, so an
+        export that was later replaced by a newer one shows up as mismatching.
+
+        Args:
+            file_paths (list): The paths to the export files.
+            progress_callback (callable): Called as progress_callback(done, total, file_name) before each file.
+
+        Returns:
+            dict: The verification report:
+                files: A dictionary per file with its dates, rows, mismatched_dates and error.
+                dates_checked, rows_checked: Totals over all files.
+                mismatched_dates: A dictionary per date whose aggregates differ, with the file, date,
+                    export_rows, database_rows and the columns whose sums differ.
+                mismatches: A dictionary per differing row, with the video_id, performance_date, kind
+                    ('missing_in_database', 'missing_in_export' or 'different') and the differing columns.
+        """
+        report = {'files': [], 'dates_checked': 0, 'rows_checked': 0, 'mismatched_dates': [], 'mismatches': []}
+        for index, file_path in enumerate(file_paths):
+            if progress_callback:
+                progress_callback(index, len(file_paths), os.path.basename(file_path))
+            try:
+                # Files that were uploaded before are loaded from the parse cache
+                df = self.data_manager.parse_cache.read(file_path)
+            except Exception as e:
+                logging.error(f"Error reading {file_path} for verification: {str(e)}")
+                report['files'].append({'file': file_path, 'dates': 0, 'rows': 0, 'mismatched_dates': 0, 'error': str(e)})
+                continue
+            self.verify_frame(df, file_path, report)
+        logging.info(f"Verified {report['dates_checked']} dates and {report['rows_checked']} rows: "
+                     f"{len(report['mismatched_dates'])} dates and {len(report['mismatches'])} rows differ")
+        return report
+
+    def verify_frame(self, df, file_path, report):
+        """
+        Verify the data of a single export and add the outcome to the report.
+
+        Args:
+            df (DataFrame): The parsed export.
+            file_path (str): The path to the export file.
+            report (dict): The report being built by verify_files.
+        """
+        rows = self.expected_rows(df, file_path)
+        dates = sorted(df['performance_date'].unique())
+        expected = self.aggregate_rows(rows).reindex(dates)
+        stored = self.stored_aggregates(dates).reindex(dates)
+        expected['rows'] = expected['rows'].fillna(0)
+        stored['rows'] = stored['rows'].fillna(0)
+
+        columns = ['rows'] + METRIC_COLUMNS
+        differs = pd.DataFrame(
+            ~np.isclose(expected[columns].to_numpy(dtype='float64'), stored[columns].to_numpy(dtype='float64'),
+                        rtol=RELATIVE_TOLERANCE, atol=ABSOLUTE_TOLERANCE, equal_nan=True),
+            index=dates, columns=columns
+        )
+        mismatched_dates = [date for date in dates if differs.loc[date].any()]
+        for date in mismatched_dates:
+            report['mismatched_dates'].append({
+                'file': file_path,
+                'date': date,
+                'export_rows': int(expected.at[date, 'rows']),
+                'database_rows': int(stored.at[date, 'rows']),
+                'columns': [column for column in METRIC_COLUMNS if differs.at[date, column]],
+            })
+            report['mismatches'].extend(self.compare_rows(rows[rows['performance_date'] == date], date))
+
+        report['dates_checked'] += len(dates)
+        report['rows_checked'] += len(rows)
+        report['files'].append({'file': file_path, 'dates': len(dates), 'rows': len(rows),
+                                'mismatched_dates': len(mismatched_dates), 'error': None})
+
+    def expected_rows(self, df, file_path):
+        """
+        Return the export rows the database is expected to hold: the rows of tracked videos, except those
+        the file's last ingestion skipped as dormant, with the last row kept for each video and date as on
+        ingestion. The skipped rows are read from the ingestion ledger rather than from the current dormant
+        flags, which may have changed since.
+
+        Args:
+            df (DataFrame): The parsed export.
+            file_path (str): The path to the export file.
+
+        Returns:
+            DataFrame: The rows under their daily_performance column names, with float metric columns.
+        """
+        rows = df[self.data_manager.daily_performance_export_columns(df)].copy()
+        rows.columns = [column for column, _ in DAILY_PERFORMANCE_COLUMNS]
+        rows['video_id'] = rows['video_id'].astype(str).str.strip()
+        rows = rows.drop_duplicates(['video_id', 'performance_date'], keep='last')
+        for column in METRIC_COLUMNS:
+            rows[column] = rows[column].astype('float64')
+
+        cursor = self.data_manager.conn.cursor()
+        self.data_manager.stage_video_ids(cursor, rows['video_id'].unique().tolist())
+        cursor.execute("SELECT video_id FROM videos WHERE video_id IN (SELECT video_id FROM temp.staged_video_ids)")
+        tracked = rows['video_id'].isin([row[0] for row in cursor.fetchall()])
+
+        skipped = pd.MultiIndex.from_tuples(self.dormant_rows(file_path), names=['video_id', 'performance_date'])
+        skipped_as_dormant = pd.MultiIndex.from_frame(rows[['video_id', 'performance_date']]).isin(skipped)
+        return rows[tracked & ~skipped_as_dormant]
+
+    def dormant_rows(self, file_path):
+        """
+        Return the rows the last ingestion of a file that wrote data skipped as dormant.
+
+        Args:
+            file_path (str): The path to the export file, as it was uploaded.
+
+        Returns:
+            list: (video_id, performance_date) pairs. Empty if the file was never ingested.
+        """
+        cursor = self.data_manager.conn.cursor()
+        cursor.execute('''
+            SELECT video_id, performance_date FROM ingest_run_dormant_rows
+            WHERE file_path = ?1 AND run_id = (
+                SELECT MAX(run_id) FROM ingest_run_files WHERE file_path = ?1 AND status IN ('processed', 'replaced')
+            )
+        ''', (file_path,))
+        return cursor.fetchall()
+
+    def aggregate_rows(self, rows):
+        """
+        Compute the row count and column sums of each date of the expected rows.
+
+        Args:
+            rows (DataFrame): The rows returned by expected_rows.
+
+        Returns:
+            DataFrame: Indexed by performance_date, with a rows column and a sum per metric column.
+        """
+        grouped = rows.groupby('performance_date')
+        aggregates = grouped[METRIC_COLUMNS].sum(min_count=1)
+        aggregates.insert(0, 'rows', grouped.size())
+        return aggregates
+
+    def stored_aggregates(self, dates):
+        """
+        Compute the same aggregates as aggregate_rows over the stored rows of a set of dates.
+
+        Args:
+            dates (list): Performance dates as 'YYYY-MM-DD' strings.
+
+        Returns:
+            DataFrame: Indexed by performance_date, with a rows column and a sum per metric column.
+        """
+        cursor = self.data_manager.conn.cursor()
+        self.data_manager.stage_dates(cursor, dates)
+        return pd.read_sql_query(f'''
+            SELECT performance_date, COUNT(*) AS rows, {', '.join(f'SUM({column}) AS {column}' for column in METRIC_COLUMNS)}
+            FROM daily_performance
+            WHERE performance_day IN (SELECT performance_day FROM temp.staged_dates)
+            GROUP BY performance_day
+        ''', self.data_manager.conn, index_col='performance_date')
+
+    def compare_rows(self, rows, date):
+        """
+        Compare the expected rows of a date with the stored rows and return the ones that differ.
+
+        Args:
+            rows (DataFrame): The expected rows of the date.
+            date (str): The performance date.
+
+        Returns:
+            list: A mismatch dictionary per differing row, as described in verify_files.
+        """
+        stored = pd.read_sql_query(f"SELECT video_id, {', '.join(METRIC_COLUMNS)} FROM daily_performance "
+                                   f"WHERE performance_day = {day_from_date('?')}", self.data_manager.conn, params=(date,))
+        merged = rows.drop(columns=['performance_date']).merge(stored, on='video_id', how='outer',
+                                                               suffixes=('_export', '_database'), indicator=True)
+
+        differs = pd.DataFrame({
+            column: ~np.isclose(merged[f'{column}_export'].to_numpy(dtype='float64'),
+                                merged[f'{column}_database'].to_numpy(dtype='float64'),
+                                rtol=RELATIVE_TOLERANCE, atol=ABSOLUTE_TOLERANCE, equal_nan=True)
+            for column in METRIC_COLUMNS
+        })
+        kinds = merged['_merge'].map({'left_only': 'missing_in_database', 'right_only': 'missing_in_export', 'both': 'different'})
+        mismatching = (merged['_merge'] != 'both') | differs.any(axis=1)
+
+        return [
+            {
+                'video_id': merged.at[index, 'video_id'],
+                'performance_date': date,
+                'kind': kinds.at[index],
+                'columns': [column for column in METRIC_COLUMNS if differs.at[index, column]] if kinds.at[index] == 'different' else [],
+            }
+            for index in merged.index[mismatching.to_numpy()]
+        ]
@@ -1,10 +1,60 @@
 import pandas as pd
 import numpy as np
 import logging
+from .data_manager import day_from_date
 
 # logging configuration
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
+def video_metrics_query(date_range=False, staged_video_ids=False):
+    """
+    Build the query that reads the daily metrics used by the virality calculations.
+
+    Args:
+        date_range (bool): Filter on the days BETWEEN two 'YYYY-MM-DD' parameters.
+        staged_video_ids (bool): Filter on the video IDs in temp.staged_video_ids.
+
+    Returns:
+        str: The SQL query.
+    """
+    query = '''
+        SELECT 
+            dp.video_id,
+            dp.performance_day,
+            dp.vv AS daily_views,
+            dp.likes,
+            dp.comments,
+            dp.shares
+        FROM daily_performance dp
+    '''
+    conditions = []
+    if date_range:
+        conditions.append(f"dp.performance_day BETWEEN {day_from_date('?')} AND {day_from_date('?')}")
+    if staged_video_ids:
+        conditions.append('dp.video_id IN (SELECT video_id FROM temp.staged_video_ids)')
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    return query + ' ORDER BY dp.video_id, dp.performance_day'
+
+# Bounds of the normalized metrics over every stored row, computed the same way as calculate_metrics:
+# total views are a running sum per video, and a missing previous day gives a growth rate of 0
+METRIC_BOUNDS_QUERY = '''
+    SELECT
+        MIN(total_views), MAX(total_views),
+        MIN(daily_views), MAX(daily_views),
+        MIN(dgr), MAX(dgr),
+        MIN(er), MAX(er)
+    FROM (
+        SELECT
+            SUM(vv) OVER w AS total_views,
+            COALESCE(vv, 0) AS daily_views,
+            COALESCE((vv - LAG(vv) OVER w) / (LAG(vv) OVER w + 1e-6) * 100, 0) AS dgr,
+            COALESCE((likes + comments + shares) / (vv + 1e-6) * 100, 0) AS er
+        FROM daily_performance
+        WINDOW w AS (PARTITION BY video_id ORDER BY performance_day)
+    )
+'''
+
 class ViralityCalculator:
     def __init__(self, data_manager):
         """
@@ -15,42 +65,31 @@ class ViralityCalculator:
         """
         self.data_manager = data_manager
 
-    def get_video_metrics(self, start_date=None, end_date=None):
+    def get_video_metrics(self, start_date=None, end_date=None, video_ids=None):
         """
         Retrieve necessary metrics for all videos within the specified date range.
 
         Args:
             start_date (str): Optional start date in 'YYYY-MM-DD' format.
             end_date (str): Optional end date in 'YYYY-MM-DD' format.
+            video_ids (list): Optional video IDs to restrict the metrics to.
 
         Returns:
             DataFrame: Contains video_id, performance_date, daily views, likes, comments, shares.
         """
-        # SQL query to retrieve daily metrics
-        query = '''
-            SELECT 
-                dp.video_id,
-                dp.performance_date,
-                dp.vv AS daily_views,
-                dp.likes,
-                dp.comments,
-                dp.shares
-            FROM daily_performance dp
-        '''
-        params = ()
-        if start_date and end_date:
-            query += ' WHERE dp.performance_date BETWEEN ? AND ?'
-            params = (start_date, end_date)
-        query += ' ORDER BY dp.video_id, dp.performance_date'
+        params = (start_date, end_date) if start_date and end_date else ()
 
         # Fetch data using DataManager's connection
         cursor = self.data_manager.conn.cursor()
-        cursor.execute(query, params)
+        if video_ids is not None:
+            self.data_manager.stage_video_ids(cursor, video_ids)
+        cursor.execute(video_metrics_query(bool(params), video_ids is not None), params)
         rows = cursor.fetchall()
 
         # Create DataFrame from fetched data
         df = pd.DataFrame(rows, columns=['video_id', 'performance_date', 'daily_views', 'likes', 'comments', 'shares'])
-        df['performance_date'] = pd.to_datetime(df['performance_date'])
+        # Day numbers convert to timestamps without parsing date strings
+        df['performance_date'] = pd.to_datetime(df['performance_date'], unit='D')
 
         return df
 
@@ -68,6 +107,9 @@ class ViralityCalculator:
             df['dgr'] = ((df['daily_views'] - df['previous_daily_views']) / 
                         (df['previous_daily_views'] + epsilon)) * 100
             
+            # Calculate Total Views up to each day
+            df['total_views'] = df.groupby('video_id')['daily_views'].cumsum()
+            
             # Calculate Engagement Rate (ER)
             df['total_engagements'] = df['likes'] + df['comments'] + df['shares']
             df['er'] = (df['total_engagements'] / (df['daily_views'] + epsilon)) * 100
@@ -95,20 +137,36 @@ class ViralityCalculator:
             logging.error(f"Error calculating metrics: {str(e)}")
             raise
 
-    def normalize_metrics(self, df):
+    def get_metric_bounds(self):
+        """
+        Retrieve the minimum and maximum of each normalized metric over all the stored data, with one aggregate query.
+
+        Returns:
+            dict: Metric name to a (min, max) tuple.
+        """
+        row = self.data_manager.conn.execute(METRIC_BOUNDS_QUERY).fetchone()
+        metrics = ['total_views', 'daily_views', 'dgr', 'er']
+        return {metric: (row[2 * i] or 0, row[2 * i + 1] or 0) for i, metric in enumerate(metrics)}
+
+    def normalize_metrics(self, df, bounds=None):
         """
         Normalize metrics to a 0-1 scale for comparability.
 
         Args:
             df (DataFrame): DataFrame with calculated metrics.
+            bounds (dict): Optional metric name to (min, max) tuples to scale against.
+                           The minimum and maximum of df are used if omitted.
 
         Returns:
             DataFrame: DataFrame with normalized metrics.
         """
         metrics_to_normalize = ['total_views', 'daily_views', 'dgr', 'er']
         for metric in metrics_to_normalize:
-            min_value = df[metric].min()
-            max_value = df[metric].max()
+            if bounds is not None:
+                min_value, max_value = bounds[metric]
+            else:
+                min_value = df[metric].min()
+                max_value = df[metric].max()
             df[f'norm_{metric}'] = (df[metric] - min_value) / (max_value - min_value + 1e-6)
         return df
 
@@ -152,41 +210,24 @@ class ViralityCalculator:
             if missing_columns:
                 raise ValueError(f"Missing required columns: {missing_columns}")
 
-            # Create backup before storing new metrics
-            self.data_manager.backup_database()
-            logging.info("Database backup created before storing new metrics")
-            
-            # Start a transaction
-            self.data_manager.conn.execute('BEGIN TRANSACTION')
+            # Start a transaction, unless staging the video IDs to refresh already opened one
+            if not self.data_manager.conn.in_transaction:
+                self.data_manager.conn.execute('BEGIN TRANSACTION')
             
             try:
+                cursor = self.data_manager.conn.cursor()
+
                 # Group by video_id to get latest metrics for videos table
-                latest_metrics = df.sort_values('performance_date').groupby('video_id').last()
-                
-                # Update metrics for each video in the video table
-                for video_id, row in latest_metrics.iterrows():
-                    video_metrics = {
-                        'dgr': float(row['dgr']),
-                        'egr': float(row['egr']),
-                        'trending_score': float(row['trending_score']),
-                        'momentum': float(row['momentum'])
-                    }
-                    self.data_manager.update_video_table_virality_metrics(video_id, video_metrics)
-                
-                # Update daily_performance table
-                for _, row in df.iterrows():
-                    daily_metrics = {
-                        'dgr': float(row['dgr']),
-                        'er': float(row['er']),
-                        'egr': float(row['egr']),
-                        'trending_score': float(row['trending_score']),
-                        'momentum': float(row['momentum'])
-                    }
-                    self.data_manager.update_daily_table_virality_metrics(
-                        row['video_id'],
-                        row['performance_date'].strftime('%Y-%m-%d'),
-                        daily_metrics
-                    )
+                latest_metrics = df.sort_values('performance_date').groupby('video_id', as_index=False).last()
+                video_records = self.data_manager.frame_to_records(
+                    latest_metrics, ['dgr', 'egr', 'trending_score', 'momentum', 'video_id'])
+                self.data_manager.update_video_table_virality_metrics(cursor, video_records)
+
+                # Update daily_performance table, matching the rows by day number
+                daily = df.assign(performance_day=(df['performance_date'] - pd.Timestamp(0)).dt.days)
+                daily_records = self.data_manager.frame_to_records(
+                    daily, ['dgr', 'er', 'egr', 'trending_score', 'momentum', 'video_id', 'performance_day'])
+                self.data_manager.update_daily_table_virality_metrics(cursor, daily_records)
                 
                 # Commit the transaction
                 self.data_manager.conn.commit()
@@ -202,6 +243,25 @@ class ViralityCalculator:
             logging.error(f"Error in store_calculated_metrics: {str(e)}")
             raise
 
+    def refresh_virality_metrics(self, video_ids=None):
+        """
+        Recalculate and store the virality metrics once after a batch of uploads.
+
+        Only the given videos are read and written, but their metrics are normalized against the
+        bounds of all the stored data, so the scores match those of a full refresh.
+
+        Args:
+            video_ids (list): Optional video IDs to refresh. All videos are refreshed if omitted.
+        """
+        df = self.get_video_metrics(video_ids=video_ids)
+        if df.empty:
+            return
+        df = self.calculate_metrics(df)
+        df = self.normalize_metrics(df, self.get_metric_bounds() if video_ids is not None else None)
+        df = self.calculate_trending_score(df)
+        self.store_calculated_metrics(df)
+        logging.info(f"Refreshed virality metrics for {df['video_id'].nunique()} videos")
+
     def identify_trending_videos(self, df, ts_threshold=0.7):
         """
         Identify videos exceeding the trending score threshold.
@@ -0,0 +1,44 @@
+#conftest.py makes the app's packages importable when the tests are run with pytest from any directory,
+#and provides a temporary database and export files for the ingestion tests.
+import csv
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processes.data_manager import DataManager
+from processes.export_reader import REQUIRED_COLUMNS
+from processes.parse_cache import ParseCache
+
+@pytest.fixture
+def data_manager(tmp_path):
+    """A DataManager on an empty database, with its parse cache in the test's temporary folder."""
+    manager = DataManager(str(tmp_path / 'tracker.db'))
+    manager.parse_cache = ParseCache(str(tmp_path / 'parse_cache'), manager.column_mapping)
+    manager.vv_threshold = 1000
+    manager.dormancy_vv = 1000
+    manager.dormancy_days = 3
+    yield manager
+    manager.close()
+
+@pytest.fixture
+def write_export(tmp_path):
+    """
+    Return a function writing a one-day CSV export in the Excel layout, with the date range on the first
+    line and the header on the third. Rows are (video ID, VV) pairs; the other columns get fixed values.
+    """
+    def write(name, date, rows):
+        file_path = str(tmp_path / name)
+        with open(file_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow([f"[Date Range]: {date} ~ {date}"])
+            writer.writerow(["Video performance"])
+            writer.writerow(REQUIRED_COLUMNS)
+            for video_id, vv in rows:
+                values = {'Video ID': video_id, 'Video Info': f"Video {video_id}", 'Time': f"{date} 10:00",
+                          'Creator name': 'creator', 'Products': 'product', 'VV': vv}
+                writer.writerow([values.get(column, 1) for column in REQUIRED_COLUMNS])
+        return file_path
+    return write
@@ -0,0 +1,13 @@
+#test_data_manager.py checks how DataManager manages its connections.
+
+def test_reopening_closes_the_old_connections(data_manager):
+    old_connections = data_manager.connections
+    with old_connections.reader():
+        pass
+    data_manager.conn.close()
+
+    data_manager.ensure_connection()
+    assert data_manager.connections is not old_connections
+    assert old_connections.reader_count == 0
+    assert old_connections.readers.empty()
+    assert data_manager.conn.execute("SELECT 1").fetchone() == (1,)
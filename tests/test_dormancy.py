@@ -0,0 +1,36 @@
+#test_dormancy.py checks that videos go dormant after dormancy_days quiet days and that disabling dormancy takes effect.
+from processes.file_handler import FileHandler
+
+def ingest_quiet_days(data_manager, write_export):
+    """Ingest one day above the thresholds followed by three days below them for video v1."""
+    files = [write_export('day1.csv', '2024-05-01', [('v1', 5000)])]
+    files += [write_export(f'day{day}.csv', f'2024-05-0{day}', [('v1', 100)]) for day in (2, 3, 4)]
+    FileHandler(data_manager).process_files(files, source='cli')
+
+def dormant_flag(data_manager):
+    return data_manager.conn.execute("SELECT dormant FROM videos WHERE video_id = 'v1'").fetchone()[0]
+
+def test_quiet_video_goes_dormant_and_is_skipped(data_manager, write_export):
+    ingest_quiet_days(data_manager, write_export)
+    assert dormant_flag(data_manager) == 1
+
+    results = FileHandler(data_manager).process_files([write_export('day5.csv', '2024-05-05', [('v1', 100)])], source='cli')
+    assert results[0]['rows_dormant'] == 1
+
+def test_disabling_dormancy_clears_flags_and_ingests_again(data_manager, write_export):
+    ingest_quiet_days(data_manager, write_export)
+    data_manager.dormancy_days = 0
+    data_manager.ensure_dormancy()
+    assert dormant_flag(data_manager) == 0
+
+    results = FileHandler(data_manager).process_files([write_export('day5.csv', '2024-05-05', [('v1', 100)])], source='cli')
+    assert results[0]['rows_dormant'] == 0
+    assert results[0]['rows_inserted'] == 1
+
+def test_disabled_dormancy_ignores_stored_flags(data_manager, write_export):
+    ingest_quiet_days(data_manager, write_export)
+    data_manager.dormancy_days = 0
+
+    results = FileHandler(data_manager).process_files([write_export('day5.csv', '2024-05-05', [('v1', 100)])], source='cli')
+    assert results[0]['rows_dormant'] == 0
+    assert dormant_flag(data_manager) == 0
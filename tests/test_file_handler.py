@@ -0,0 +1,27 @@
+#test_file_handler.py checks how FileHandler.process_files handles batches of export files.
+from processes.file_handler import FileHandler
+
+def test_empty_export_is_skipped_without_failing_the_batch(data_manager, write_export):
+    files = [
+        write_export('day2.csv', '2024-05-02', [('v1', 5000), ('v2', 6000)]),
+        write_export('empty.csv', '2024-05-03', []),
+        write_export('day1.csv', '2024-05-01', [('v1', 4000)]),
+    ]
+    results = {result['file']: result for result in FileHandler(data_manager).process_files(files, source='cli')}
+
+    assert results[files[1]]['status'] == 'skipped'
+    assert results[files[0]]['status'] == results[files[2]]['status'] == 'processed'
+    assert data_manager.conn.execute("SELECT COUNT(*) FROM daily_performance").fetchone()[0] == 3
+    assert data_manager.conn.execute("SELECT files FROM ingest_runs").fetchone()[0] == 3
+
+def test_promoted_shadow_rows_are_unchanged_on_reingest(data_manager, write_export):
+    # v2 is below the VV threshold on the first day, so that row is shadowed and promoted on the second day
+    day1 = write_export('day1.csv', '2024-05-01', [('v1', 5000), ('v2', 500)])
+    day2 = write_export('day2.csv', '2024-05-02', [('v1', 5000), ('v2', 5000)])
+    file_handler = FileHandler(data_manager)
+    results = file_handler.process_files([day1, day2], source='cli')
+    assert results[1]['rows_promoted'] == 1
+
+    results = file_handler.process_files([day1], confirm_replace=lambda date: True, source='cli')
+    assert results[0]['status'] == 'replaced'
+    assert (results[0]['rows_unchanged'], results[0]['rows_updated'], results[0]['rows_inserted']) == (2, 0, 0)
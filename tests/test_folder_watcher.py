@@ -0,0 +1,43 @@
+#test_folder_watcher.py checks that the folder watcher doesn't keep retrying files that fail.
+import os
+import sqlite3
+
+from processes.backup_manager import BackupManager
+from processes.folder_watcher import FolderWatcher, MAX_RETRIES
+
+def make_watcher(data_manager, tmp_path):
+    data_manager.backup_manager = BackupManager(str(tmp_path), compression='none')
+    return FolderWatcher(data_manager, str(tmp_path), settle_seconds=0)
+
+def run_count(data_manager):
+    return data_manager.conn.execute("SELECT COUNT(*) FROM ingest_runs").fetchone()[0]
+
+def test_failed_file_is_retried_only_once_changed(data_manager, write_export, tmp_path):
+    watcher = make_watcher(data_manager, tmp_path)
+    file_path = write_export('day1.csv', '2024-05-01', [('v1', 5000)])
+    with open(file_path, 'w') as f:
+        f.write("not an export\n")
+
+    polls = [watcher.poll_once() for _ in range(5)]
+    assert [len(results) for results in polls] == [0, 1, 0, 0, 0]
+    assert polls[1][0]['status'] == 'error'
+    assert run_count(data_manager) == 1
+
+    write_export('day1.csv', '2024-05-01', [('v1', 5000)])
+    os.utime(file_path, ns=(0, os.stat(file_path).st_mtime_ns + 1))
+    polls = [watcher.poll_once() for _ in range(2)]
+    assert polls[1][0]['status'] == 'processed'
+
+def test_database_errors_are_retried_a_limited_number_of_times(data_manager, write_export, tmp_path, monkeypatch):
+    watcher = make_watcher(data_manager, tmp_path)
+    write_export('day1.csv', '2024-05-01', [('v1', 5000)])
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(data_manager, 'insert_or_update_records', locked)
+
+    polls = [watcher.poll_once() for _ in range(MAX_RETRIES + 4)]
+    assert sum(len(results) for results in polls) == MAX_RETRIES + 1
+    assert all(result['retryable'] for results in polls for result in results)
+    assert run_count(data_manager) == MAX_RETRIES + 1
+    # Only the first attempt backs up the database
+    assert len(data_manager.backup_manager.list_backups()) == 1
@@ -0,0 +1,33 @@
+#test_query_plans.py checks that the frequent database queries keep using indexes, like cli.py check-plans.
+import pytest
+from processes.query_plans import PLAN_CHECKS, build_synthetic_database, explain, plan_problems
+
+# Smaller than the check-plans default so the suite stays quick, but large enough for the planner to prefer indexes
+TEST_VIDEOS = 500
+TEST_DAYS = 90
+
+@pytest.fixture(scope='module')
+def synthetic_database(tmp_path_factory):
+    """Build one synthetic database for every plan check in the module."""
+    data_manager, sample = build_synthetic_database(str(tmp_path_factory.mktemp('plans') / 'query_plans.db'), TEST_VIDEOS, TEST_DAYS)
+    yield data_manager, sample
+    data_manager.close()
+
+@pytest.mark.parametrize('name, query, params, allowed_scans, sorted_by_index', PLAN_CHECKS, ids=[check[0] for check in PLAN_CHECKS])
+def test_query_uses_indexes(synthetic_database, name, query, params, allowed_scans, sorted_by_index):
+    data_manager, sample = synthetic_database
+    plan = explain(data_manager.conn, query, params(sample))
+    assert plan_problems(plan, allowed_scans, sorted_by_index) == [], '\n'.join(plan)
+
+def test_plan_problems_reports_scans_and_sorts():
+    plan = ['SCAN daily_performance', 'USE TEMP B-TREE FOR ORDER BY']
+    assert len(plan_problems(plan, sorted_by_index=True)) == 2
+    assert plan_problems(plan, allowed_scans=('daily_performance',)) == []
+
+def test_synthetic_database_with_a_short_history(tmp_path):
+    data_manager, sample = build_synthetic_database(str(tmp_path / 'short.db'), videos=5, days=1)
+    try:
+        assert sample['week_start'] == sample['date']
+        assert data_manager.conn.execute("SELECT COUNT(*) FROM daily_performance").fetchone()[0] == 5
+    finally:
+        data_manager.close()
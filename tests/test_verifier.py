@@ -0,0 +1,19 @@
+#test_verifier.py checks that verification compares the stored data with what each file's ingestion skipped as dormant.
+from processes.file_handler import FileHandler
+from processes.verifier import DataVerifier
+
+def test_verification_uses_the_rows_skipped_at_ingestion(data_manager, write_export):
+    # v1 goes dormant after three quiet days, so its row on the fifth day is skipped
+    files = [write_export('day1.csv', '2024-05-01', [('v1', 5000)])]
+    files += [write_export(f'day{day}.csv', f'2024-05-0{day}', [('v1', 100)]) for day in (2, 3, 4, 5)]
+    results = FileHandler(data_manager).process_files(files, source='cli')
+    assert [result['rows_dormant'] for result in results] == [0, 0, 0, 0, 1]
+
+    # Rows written before the video went dormant are expected, and the skipped row is not,
+    # even once the dormant flag is cleared
+    for dormancy_days in (3, 0):
+        data_manager.dormancy_days = dormancy_days
+        data_manager.ensure_dormancy()
+        report = DataVerifier(data_manager).verify_files(files)
+        assert report['mismatched_dates'] == []
+        assert report['rows_checked'] == 4